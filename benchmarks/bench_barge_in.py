@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+打断(barge-in)基准测试
+助手朗读一段长回答时,按实时速度输入一句用户语音,测量从用户开口到朗读停止的耗时
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.harness import SAMPLE_RATE, NullTextToSpeech, PcmSource
+from src.metrics import LatencyRecorder
+from src.speech_recognition_module import SpeechRecognizer
+from src.tts_worker import SpeechWorker
+
+
+class EchoRecognizer(SpeechRecognizer):
+    """不请求识别服务,只返回固定文本"""
+
+    def recognize(self, audio):
+        return "停"
+
+
+def user_speech(delay: float, seconds: float = 0.8) -> bytes:
+    """背景噪音中间夹一句“用户语音”"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    speech = 6000 * np.sin(2 * np.pi * 300 * t) * (1 + 0.3 * np.sin(2 * np.pi * 4 * t))
+    pcm = np.concatenate(
+        [rng.normal(0, 50, int(SAMPLE_RATE * delay)), speech, rng.normal(0, 50, SAMPLE_RATE)]
+    )
+    return pcm.astype(np.int16).tobytes()
+
+
+def run(iterations: int, delay: float):
+    """运行基准测试"""
+    metrics = LatencyRecorder()
+    for _ in range(iterations):
+        recognizer = EchoRecognizer(
+            microphone=PcmSource(user_speech(delay), realtime=True), calibrate=False
+        )
+        worker = SpeechWorker(NullTextToSpeech(speak_delay=30))
+        worker.say("这是一段很长的回答" * 20)
+        worker.say("后面还有排队的句子")
+
+        def interrupt():
+            worker.cancel()
+            worker.wait(timeout=1)
+
+        started = time.perf_counter()
+        text = recognizer.barge_in(lambda: worker.speaking, interrupt)
+        metrics.record("recognized", time.perf_counter() - started - delay)
+        if text is not None:
+            metrics.record("barge_in", recognizer.last_barge_in)
+        worker.close(wait=False)
+
+    print("=" * 60)
+    print(f"打断基准 ({iterations} 次, 用户在朗读开始 {delay:.1f}s 后开口)")
+    print("=" * 60)
+    print(metrics.report())
+    print("barge_in: 从开口到朗读停止; recognized: 从开口到拿到识别结果(含说完这句话的时间)")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="打断(barge-in)基准测试")
+    parser.add_argument("--iterations", type=int, default=5, help="测试次数")
+    parser.add_argument("--delay", type=float, default=0.5, help="朗读开始后多久开口(秒)")
+    args = parser.parse_args()
+
+    run(args.iterations, args.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+模糊搜索基准测试
+生成大量中文曲目名(默认10万),测量索引构建耗时、索引内存和查询延迟
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fuzzy_search import FuzzyIndex, lazy_pinyin
+from src.metrics import LatencyRecorder
+
+CHARACTERS = "晴天稻香七里香青花瓷夜曲彩虹告白气球简单爱海阔天空光辉岁月喜欢你真的爱你东风破发如雪菊花台千里之外"
+
+# (说法, 类型): 同音错字、全拼、首字母、英文
+QUERIES = [
+    ("青花词", "同音字"),
+    ("东风迫", "同音字"),
+    ("qinghuaci", "全拼"),
+    ("dongfengpo", "全拼"),
+    ("qhc", "首字母"),
+    ("hktk", "首字母"),
+    ("amani live", "英文"),
+    ("不存在的歌", "无结果"),
+]
+
+
+def generate_names(count: int, seed: int = 0) -> list:
+    """随机组合的曲目名,再混入几首真实歌名"""
+    rng = random.Random(seed)
+    names = ["".join(rng.sample(CHARACTERS, rng.randint(3, 7))) + f" {i}" for i in range(count)]
+    for i, name in enumerate(["青花瓷", "东风破", "海阔天空", "Amani (Live)"]):
+        names[i * (count // 4)] = name
+    return names
+
+
+def run(count: int, repeat: int):
+    """运行基准测试"""
+    names = generate_names(count)
+
+    started = time.perf_counter()
+    index = FuzzyIndex(enumerate(names))
+    build_seconds = time.perf_counter() - started
+
+    # 内存单独测量(tracemalloc 会显著拖慢构建)
+    tracemalloc.start()
+    measured = FuzzyIndex(enumerate(names))
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+
+    metrics = LatencyRecorder()
+    top = {}
+    for _ in range(repeat):
+        for query, kind in QUERIES:
+            with metrics.time(kind):
+                results = index.search(query)
+            top[query] = names[results[0][0]] if results else "-"
+
+    print("=" * 60)
+    print(f"模糊搜索基准 ({count} 首, pypinyin {'已安装' if lazy_pinyin else '未安装'})")
+    print("=" * 60)
+    print(f"索引构建:      {build_seconds:8.2f} s")
+    print(f"倒排表内存:    {index.memory_bytes / 1e6:8.1f} MB")
+    print(f"索引总内存:    {traced / 1e6:8.1f} MB (含名称的三种形式)")
+    print(metrics.report())
+    print("-" * 60)
+    for query, kind in QUERIES:
+        print(f"{kind:6} {query:12} -> {top[query]}")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="模糊搜索基准测试")
+    parser.add_argument("--tracks", type=int, default=100_000, help="曲目数")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的重复次数")
+    args = parser.parse_args()
+
+    run(args.tracks, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
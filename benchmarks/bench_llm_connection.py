@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+大模型连接基准测试
+对比共享连接池客户端与每次新建客户端的首字节时间(TTFB),使用本地模拟服务
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI
+
+from src.openai_client import get_openai_client, reset_openai_client, warm_up
+from tests.mock_openai_server import MockOpenAIServer
+
+
+def measure_ttfb(client: OpenAI) -> float:
+    """发送一次流式请求,返回收到第一个分片的耗时(秒)"""
+    started = time.perf_counter()
+    stream = client.chat.completions.create(
+        model="mock-model", messages=[{"role": "user", "content": "你好"}], stream=True
+    )
+    next(iter(stream))
+    elapsed = time.perf_counter() - started
+    for _ in stream:
+        pass
+    return elapsed
+
+
+def run(requests: int, delay: float, warmup: bool):
+    """运行基准测试"""
+    with MockOpenAIServer(delay=delay) as server:
+        os.environ["OPENAI_BASE_URL"] = server.url
+        os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+        # 每次请求新建客户端: 每次都要重新建立连接
+        fresh = [measure_ttfb(OpenAI()) for _ in range(requests)]
+
+        # 共享客户端: 只有首个请求需要建立连接
+        reset_openai_client()
+        client = get_openai_client()
+        warmup_seconds = warm_up(client) if warmup else None
+        shared = [measure_ttfb(client) for _ in range(requests)]
+        reset_openai_client()
+
+    print("=" * 60)
+    print(f"TTFB 基准 (请求数 {requests}, 模拟推理延迟 {delay * 1000:.0f}ms)")
+    print("=" * 60)
+    if warmup_seconds is not None:
+        print(f"预热耗时:           {warmup_seconds * 1000:8.2f} ms")
+    for name, samples in [("每次新建客户端", fresh), ("共享连接池客户端", shared)]:
+        print(
+            f"{name}: 首次 {samples[0] * 1000:8.2f} ms | "
+            f"后续中位数 {statistics.median(samples[1:]) * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="大模型连接 TTFB 基准测试")
+    parser.add_argument("--requests", type=int, default=20, help="每种方式的请求次数")
+    parser.add_argument("--delay", type=float, default=0.0, help="模拟推理延迟(秒)")
+    parser.add_argument("--no-warmup", action="store_true", help="共享客户端不做预热")
+    args = parser.parse_args()
+    run(args.requests, args.delay, not args.no_warmup)
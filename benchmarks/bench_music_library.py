@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+音乐库索引基准测试
+生成一个大型音乐目录(默认10万个文件),对比逐个扩展名递归 glob 与 SQLite 索引的扫描和查询耗时
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.controllers.music_controller import MusicController
+from src.music_library import MusicLibrary
+
+SYLLABLES = "晴天稻香七里香青花瓷夜曲彩虹告白气球简单爱海阔天空光辉岁月喜欢你真的爱你"
+
+
+def generate_tree(root: Path, files: int, per_album: int = 12, seed: int = 0):
+    """生成 歌手/专辑/曲目 结构的空音乐文件"""
+    rng = random.Random(seed)
+    for i in range(files):
+        artist, album = i // (per_album * 10), i // per_album
+        directory = root / f"歌手{artist:04d}" / f"专辑{album:05d}"
+        if i % per_album == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        name = "".join(rng.sample(SYLLABLES, 4)) + f" {i}"
+        ext = config.MUSIC_EXTENSIONS[i % len(config.MUSIC_EXTENSIONS)]
+        (directory / f"{name}{ext}").touch()
+
+
+def timed(func, *args):
+    """返回 (结果, 耗时秒)"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def run(files: int, queries: int, workdir: str):
+    """运行基准测试"""
+    root = Path(workdir) / "music"
+    print(f"生成 {files} 个文件到 {root} ...")
+    _, generated = timed(generate_tree, root, files)
+    rng = random.Random(1)
+    choices = ["晴天", "稻香", "七里香", "海阔天空", "光辉岁月", "彩虹"]
+    keywords = [rng.choice(choices) for _ in range(queries)]
+
+    glob_times = []
+    for keyword in keywords[: max(1, min(queries, 3))]:
+        _, seconds = timed(MusicController._glob_music, root, keyword)
+        glob_times.append(seconds)
+
+    library = MusicLibrary(str(root), path=os.path.join(workdir, "library.db"))
+    build, build_seconds = timed(library.refresh)
+    idle, idle_seconds = timed(library.refresh)
+
+    (root / "歌手0000" / "专辑00000" / "新歌 晴天.mp3").touch()
+    changed, changed_seconds = timed(library.refresh)
+
+    query_times = []
+    for keyword in keywords:
+        _, seconds = timed(library.search, keyword, 5)
+        _, count_seconds = timed(library.count, keyword)
+        query_times.append(seconds + count_seconds)
+    library.close()
+
+    def ms(values):
+        return sum(values) / len(values) * 1000
+
+    print("=" * 60)
+    print(f"音乐库基准 ({files} 个文件, {build['dirs']} 个目录)")
+    print("=" * 60)
+    print(f"生成目录树:            {generated:8.2f} s")
+    print(f"glob 搜索(每次):       {ms(glob_times):8.1f} ms")
+    print(f"索引首次构建:          {build_seconds * 1000:8.1f} ms")
+    print(
+        f"增量刷新(无变化):      {idle_seconds * 1000:8.1f} ms (重新列出 {idle['listed']} 个目录)"
+    )
+    print(
+        f"增量刷新(新增1首):     {changed_seconds * 1000:8.1f} ms (重新列出 {changed['listed']} 个目录)"
+    )
+    print(f"索引查询(每次):        {ms(query_times):8.2f} ms")
+    print(f"加速比(glob/查询):     {ms(glob_times) / ms(query_times):8.0f} x")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="音乐库索引基准测试")
+    parser.add_argument("--files", type=int, default=100_000, help="生成的文件数")
+    parser.add_argument("--queries", type=int, default=20, help="查询次数")
+    parser.add_argument("--workdir", default="", help="工作目录,默认使用临时目录")
+    args = parser.parse_args()
+
+    if args.workdir:
+        run(args.files, args.queries, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            run(args.files, args.queries, workdir)
+
+
+if __name__ == "__main__":
+    main()
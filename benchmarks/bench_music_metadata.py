@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+音乐标签读取基准测试
+生成一批带 ID3 标签的 mp3 文件(默认2万个),对比单进程与进程池读取标签的吞吐量(首/秒),
+以及文件未修改时再次更新的耗时
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mutagen.easyid3 import EasyID3
+
+from src.music_library import MusicLibrary
+from src.music_metadata import MetadataExtractor
+
+# 约1秒的最小 MPEG 音频帧序列
+FRAMES = (bytes.fromhex("fffb9064") + b"\x00" * 413) * 40
+
+
+def generate_tree(root: Path, files: int, per_album: int = 12):
+    """生成 歌手/专辑/曲目 结构的带标签 mp3 文件(标签只生成一次,之后复制字节)"""
+    template = root / "template.mp3"
+    root.mkdir(parents=True, exist_ok=True)
+    template.write_bytes(FRAMES)
+    id3 = EasyID3()
+    id3["artist"], id3["album"], id3["title"] = "歌手", "专辑", "曲目"
+    id3.save(str(template))
+    data = template.read_bytes()
+    template.unlink()
+
+    for i in range(files):
+        directory = root / f"歌手{i // (per_album * 10):04d}" / f"专辑{i // per_album:05d}"
+        if i % per_album == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"曲目 {i}.mp3").write_bytes(data)
+
+
+def measure(root: Path, index: str, workers: int, chunk_size: int) -> dict:
+    """在新的索引上读取全部标签,返回统计"""
+    library = MusicLibrary(str(root), path=index)
+    library.refresh()
+    extractor = MetadataExtractor(workers=workers, chunk_size=chunk_size)
+    stats = library.update_metadata(extractor)
+
+    started = time.perf_counter()
+    library.update_metadata(extractor)
+    stats["idle_seconds"] = time.perf_counter() - started
+    library.close()
+    return stats
+
+
+def run(files: int, workers: int, chunk_size: int, workdir: str):
+    """运行基准测试"""
+    root = Path(workdir) / "music"
+    print(f"生成 {files} 个带标签的 mp3 文件到 {root} ...")
+    generate_tree(root, files)
+
+    serial = measure(root, os.path.join(workdir, "serial.db"), 1, chunk_size)
+    pooled = measure(root, os.path.join(workdir, "pooled.db"), workers, chunk_size)
+
+    print("=" * 60)
+    print(f"音乐标签读取基准 ({files} 个文件, 每块 {chunk_size} 个)")
+    print("=" * 60)
+    print(
+        f"单进程:                {serial['seconds']:8.2f} s  "
+        f"({serial['files_per_second']:8.0f} 首/秒)"
+    )
+    print(
+        f"进程池({workers} 个进程):     {pooled['seconds']:8.2f} s  "
+        f"({pooled['files_per_second']:8.0f} 首/秒)"
+    )
+    print(f"加速比:                {serial['seconds'] / pooled['seconds']:8.2f} x")
+    print(f"再次更新(无变化):      {pooled['idle_seconds'] * 1000:8.1f} ms")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="音乐标签读取基准测试")
+    parser.add_argument("--files", type=int, default=20_000, help="生成的文件数")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="进程池的工作进程数"
+    )
+    parser.add_argument("--chunk-size", type=int, default=256, help="每块的文件数")
+    parser.add_argument("--workdir", default="", help="工作目录,默认使用临时目录")
+    args = parser.parse_args()
+
+    if args.workdir:
+        run(args.files, args.workers, args.chunk_size, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            run(args.files, args.workers, args.chunk_size, workdir)
+
+
+if __name__ == "__main__":
+    main()
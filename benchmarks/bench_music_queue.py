@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+播放列表基准测试
+依次播放一组曲目,对比"上一首结束后再加载下一首"与播放列表预载的切换间隙。
+虚拟音频驱动的播放速度与真实时长略有出入,因此以预载方式(连续播放)的总耗时为基准,
+旧做法多出的时间除以切换次数即为每次切换的间隙
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import config
+from src.controllers.music_controller import MusicController
+
+
+def make_wav(path: str, seconds: float) -> str:
+    """生成一段静音 wav"""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(b"\x00\x00\x00\x00" * int(44100 * seconds))
+    return path
+
+
+def play_cold(tracks, check_interval: float) -> float:
+    """每首结束后再加载下一首(原来的做法: 定时检查是否播完),返回总耗时"""
+    started = time.perf_counter()
+    for path in tracks:
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            time.sleep(check_interval)
+    return time.perf_counter() - started
+
+
+def play_queued(controller: MusicController, tracks) -> float:
+    """通过播放列表播放,返回总耗时"""
+    started = time.perf_counter()
+    controller.play_queue(tracks)
+    while controller.is_playing:
+        time.sleep(0.005)
+    return time.perf_counter() - started
+
+
+def run(tracks: int, seconds: float, check_interval: float, workdir: str):
+    """运行基准测试"""
+    paths = [make_wav(os.path.join(workdir, f"{i}.wav"), seconds) for i in range(tracks)]
+    config.MUSIC_LIBRARY_ENABLED = False
+    controller = MusicController()
+
+    cold = play_cold(paths, check_interval)
+    queued = play_queued(controller, paths)
+    controller.close()
+
+    started = time.perf_counter()
+    for path in paths:
+        pygame.mixer.music.load(path)
+    load_ms = (time.perf_counter() - started) / tracks * 1000
+
+    print("=" * 60)
+    print(f"播放列表基准 ({tracks} 首, 每首 {seconds}s)")
+    print("=" * 60)
+    print(f"播放列表预载总耗时:            {queued:8.2f} s")
+    print(f"结束后再加载总耗时:            {cold:8.2f} s (每 {check_interval * 1000:.0f}ms 检查)")
+    print(f"旧做法每次切换的间隙:          {(cold - queued) / (tracks - 1) * 1000:8.1f} ms")
+    print(f"加载一首的耗时:                {load_ms:8.1f} ms (预载时在上一首播放期间完成)")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="播放列表基准测试")
+    parser.add_argument("--tracks", type=int, default=5, help="曲目数")
+    parser.add_argument("--seconds", type=float, default=1.0, help="每首时长(秒)")
+    parser.add_argument("--check-interval", type=float, default=0.1, help="旧做法的检查间隔(秒)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        run(args.tracks, args.seconds, args.check_interval, workdir)
+
+
+if __name__ == "__main__":
+    main()
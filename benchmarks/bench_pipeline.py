@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+端到端流水线基准测试
+用 WAV 文件代替麦克风、本地模拟服务代替 OpenAI API、空语音合成代替扬声器,
+驱动 VoiceAssistant 完整运行若干轮对话,输出各阶段 p50/p95/p99 延迟
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+import config
+from benchmarks.harness import (
+    NullTextToSpeech,
+    TranscriptRecognizer,
+    WavPlaylistSource,
+    generate_wav,
+)
+from main import VoiceAssistant
+from src.openai_client import reset_openai_client
+from tests.mock_openai_server import MockOpenAIServer
+
+
+def script_turn(server: MockOpenAIServer, kind: str, workdir: str) -> str:
+    """
+    为一轮对话准备模拟服务的脚本回复
+
+    Args:
+        server: 模拟服务
+        kind: 对话类型: chat(纯对话)、tool(单次函数调用)、multi(一次回复中多个函数调用)
+        workdir: 临时目录
+
+    Returns:
+        该轮的用户输入
+    """
+    if kind == "chat":
+        server.add_reply(content="今天天气晴朗,适合出门散步。祝你有愉快的一天!")
+        return "今天天气怎么样"
+
+    if kind == "tool":
+        server.add_reply(tool_calls=[{"name": "search_music", "arguments": {"keyword": "晴天"}}])
+        server.add_reply(content="已经帮你搜索了相关的歌曲。")
+        return "帮我找一下晴天这首歌"
+
+    note = os.path.join(workdir, "note.txt")
+    server.add_reply(
+        tool_calls=[
+            {"name": "search_music", "arguments": {"keyword": "稻香"}},
+            {"name": "file_operation", "arguments": {"operation": "read", "file_path": note}},
+        ]
+    )
+    server.add_reply(content="歌曲已搜索,笔记内容也读取好了。")
+    return "搜索稻香并读一下我的笔记"
+
+
+def run(iterations: int, delay: float, chunk_delay: float, recognize_delay: float, streaming: bool):
+    """运行基准测试"""
+    # 基准需要每轮都真正请求模拟服务
+    config.PLAN_CACHE_ENABLED = False
+    config.LOCAL_INTENT_ENABLED = False
+    config.LLM_WARMUP = False
+    config.LLM_KEEPALIVE_INTERVAL = 0
+    config.LLM_STREAMING = streaming
+
+    with (
+        tempfile.TemporaryDirectory() as workdir,
+        MockOpenAIServer(delay=delay, chunk_delay=chunk_delay) as server,
+    ):
+        os.environ["OPENAI_BASE_URL"] = server.url
+        reset_openai_client()
+
+        # 工具调用在临时目录中真实执行
+        config.SAFE_DIRECTORIES.append(workdir)
+        config.DEFAULT_MUSIC_DIR = workdir
+        for name in ["晴天.mp3", "稻香.mp3", "七里香.mp3"]:
+            open(os.path.join(workdir, name), "wb").close()
+        with open(os.path.join(workdir, "note.txt"), "w", encoding="utf-8") as f:
+            f.write("明天上午十点开会。")
+        wav = generate_wav(os.path.join(workdir, "utterance.wav"))
+
+        utterances = []
+        for i in range(iterations):
+            kind = ("chat", "tool", "multi")[i % 3]
+            utterances.append((wav, script_turn(server, kind, workdir)))
+
+        source = WavPlaylistSource(utterances)
+        tts = NullTextToSpeech()
+        assistant = VoiceAssistant(
+            speech_recognizer=TranscriptRecognizer(source, recognize_delay=recognize_delay),
+            tts=tts,
+        )
+
+        started = time.perf_counter()
+        assistant.run()
+        elapsed = time.perf_counter() - started
+
+        assistant.task_executor.shutdown()
+        reset_openai_client()
+
+    print("=" * 60)
+    print(
+        f"端到端基准 (对话 {iterations} 轮, 模拟推理延迟 {delay * 1000:.0f}ms, "
+        f"流式 {'开' if streaming else '关'})"
+    )
+    print("=" * 60)
+    print(assistant.metrics.report())
+    if assistant.speech_recognizer.vad is not None:
+        print(assistant.speech_recognizer.vad.metrics.report())
+    print("-" * 60)
+    print(f"语音识别: {assistant.speech_recognizer.stats}")
+    print(
+        f"总耗时 {elapsed:.2f}s | 吞吐 {iterations / elapsed:.2f} 轮/秒 | 请求 {len(server.requests)}"
+    )
+    return assistant.metrics
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="端到端流水线基准测试")
+    parser.add_argument("--iterations", type=int, default=30, help="对话轮数")
+    parser.add_argument("--delay", type=float, default=0.05, help="模拟推理延迟(秒)")
+    parser.add_argument("--chunk-delay", type=float, default=0.005, help="流式分片间隔(秒)")
+    parser.add_argument("--recognize-delay", type=float, default=0.0, help="模拟识别耗时(秒)")
+    parser.add_argument("--no-streaming", action="store_true", help="关闭流式回复")
+    args = parser.parse_args()
+
+    run(args.iterations, args.delay, args.chunk_delay, args.recognize_delay, not args.no_streaming)
+
+
+if __name__ == "__main__":
+    main()
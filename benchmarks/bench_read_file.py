@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+文件读取基准测试
+生成一个大日志文件(默认 200MB),对比原来整个读入再截断的做法与按窗口读取
+(开头、结尾、字节范围、逐行过滤)的耗时和内存峰值
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.file_reader import read_window
+
+
+def generate_log(path: str, megabytes: int):
+    """生成日志文件,每1000行有一行 ERROR"""
+    line = "2024-01-01 12:00:00 INFO 请求处理完成 status=200 耗时=12ms\n".encode("utf-8")
+    error = "2024-01-01 12:00:00 ERROR 数据库连接失败 重试中\n".encode("utf-8")
+    block = line * 999 + error
+    with open(path, "wb") as f:
+        for _ in range(megabytes * 1024 * 1024 // len(block) + 1):
+            f.write(block)
+
+
+def read_whole(path: str) -> str:
+    """原来的做法: 整个文件读入后只保留前1000个字符"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return content[:1000]
+
+
+def measure(func, *args, **kwargs):
+    """返回 (耗时毫秒, 内存峰值MB);耗时与内存分两次测量,避免 tracemalloc 拖慢计时"""
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def run(megabytes: int, workdir: str):
+    """运行基准测试"""
+    path = os.path.join(workdir, "app.log")
+    print(f"生成 {megabytes}MB 日志文件 ...")
+    generate_log(path, megabytes)
+    size = os.path.getsize(path)
+
+    cases = [
+        ("整个读入再截断(原做法)", read_whole, (path,), {}),
+        ("开头 4KB", read_window, (path,), {}),
+        ("结尾 4KB", read_window, (path,), {"offset": -4096}),
+        ("中间 64KB", read_window, (path,), {"offset": size // 2, "length": 65536}),
+        ("逐行过滤 ERROR(前50行)", read_window, (path,), {"grep": "ERROR"}),
+        ("逐行过滤 全文无匹配", read_window, (path,), {"grep": "FATAL"}),
+    ]
+
+    print("=" * 60)
+    print(f"文件读取基准 ({size / 1024 / 1024:.0f}MB)")
+    print("=" * 60)
+    for name, func, args, kwargs in cases:
+        elapsed, peak = measure(func, *args, **kwargs)
+        print(f"{name:<24} {elapsed:10.1f} ms  内存峰值 {peak:8.2f} MB")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="文件读取基准测试")
+    parser.add_argument("--megabytes", type=int, default=200, help="生成的文件大小(MB)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        run(args.megabytes, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+语音识别后端基准测试
+在同一批 WAV 录音上对比各识别后端(在线/本地)的识别延迟和成功率
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+
+from benchmarks.harness import generate_wav
+from src.metrics import LatencyRecorder
+from src.stt_backends import create_backends
+
+
+def load_audio(path: str) -> sr.AudioData:
+    """读取 WAV 文件"""
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        return recognizer.record(source)
+
+
+def run(wav_files, backend_names, repeat: int):
+    """运行基准测试"""
+    with tempfile.TemporaryDirectory() as workdir:
+        if not wav_files:
+            # 没有提供录音时用合成音频,只能测量延迟,识别结果没有意义
+            print("未提供 WAV 文件,使用合成音频")
+            wav_files = [generate_wav(os.path.join(workdir, "tone.wav"))]
+        clips = [(path, load_audio(path)) for path in wav_files]
+
+        backends = create_backends(backend_names)
+        metrics = LatencyRecorder()
+        failures = {backend.name: 0 for backend in backends}
+
+        for backend in backends:
+            for path, audio in clips:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    try:
+                        text = backend.recognize(audio)
+                    except (sr.UnknownValueError, sr.RequestError) as e:
+                        failures[backend.name] += 1
+                        text = f"<{type(e).__name__}>"
+                    metrics.record(backend.name, time.perf_counter() - started)
+                print(f"[{backend.name}] {os.path.basename(path)}: {text}")
+
+    print("=" * 60)
+    print(f"识别后端基准 (录音 {len(clips)} 段, 每段 {repeat} 次)")
+    print("=" * 60)
+    print(metrics.report())
+    print("-" * 60)
+    for name, count in failures.items():
+        print(f"{name}: 失败 {count} 次")
+    return metrics
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="语音识别后端基准测试")
+    parser.add_argument("wav_files", nargs="*", help="录音文件(WAV)")
+    parser.add_argument("--backends", nargs="+", default=["vosk", "google"], help="参与对比的后端")
+    parser.add_argument("--repeat", type=int, default=3, help="每段录音识别次数")
+    args = parser.parse_args()
+
+    run(args.wav_files, args.backends, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+唤醒词检测基准测试
+按实时速度输入音频,测量空闲(只有背景噪音)时检测器的 CPU 占用,
+并与每个 hop 都做特征匹配(不按能量门控)的方式对比;同时测量唤醒延迟
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import speech_recognition as sr
+
+from benchmarks.harness import SAMPLE_RATE, PcmSource
+from src.wake_word import WakeWordSpotter
+
+
+def tones(frequencies, seconds: float = 0.25, seed: int = 0) -> np.ndarray:
+    """合成的“唤醒词”: 若干段正弦音,叠加少量噪声"""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    signal = np.concatenate([8000 * np.sin(2 * np.pi * f * t) for f in frequencies])
+    noise = np.random.default_rng(seed).normal(0, 100, len(signal))
+    return (signal + noise).astype(np.int16)
+
+
+def background(seconds: float, level: float) -> np.ndarray:
+    """背景噪音"""
+    rng = np.random.default_rng(42)
+    return rng.normal(0, level, int(SAMPLE_RATE * seconds)).astype(np.int16)
+
+
+def measure_idle(spotter: WakeWordSpotter, seconds: float, level: float) -> float:
+    """实时输入背景噪音,返回检测器的 CPU 占用率(单核百分比)"""
+    source = PcmSource(background(seconds, level).tobytes(), realtime=True)
+    wall, cpu = time.perf_counter(), time.process_time()
+    spotter.wait(source)
+    return (time.process_time() - cpu) / (time.perf_counter() - wall) * 100
+
+
+def run(seconds: float, level: float, templates: str):
+    """运行基准测试"""
+    wake = [400, 900, 600]
+    if templates:
+        spotter = WakeWordSpotter.load(templates)
+    else:
+        spotter = WakeWordSpotter()
+        spotter.enroll(sr.AudioData(tones(wake, seed=1).tobytes(), SAMPLE_RATE, 2))
+
+    gated = measure_idle(spotter, seconds, level)
+
+    # 对照: 能量阈值为0,每个 hop 都计算 MFCC 并做 DTW 匹配
+    threshold = spotter.energy_threshold
+    spotter.energy_threshold = 0
+    ungated = measure_idle(spotter, seconds, level)
+    spotter.energy_threshold = threshold
+
+    # 唤醒延迟: 唤醒词结束到检测器返回
+    pcm = np.concatenate([background(1.0, level), tones(wake, seed=2), background(2.0, level)])
+    source = PcmSource(pcm.tobytes(), realtime=True)
+    started = time.perf_counter()
+    detected = spotter.wait(source) is not None
+    latency = time.perf_counter() - started - (1.0 + 0.75)
+
+    print("=" * 60)
+    print(f"唤醒词基准 (空闲 {seconds:.0f}s, 背景噪音 RMS {level:.0f}, hop {spotter.hop_ms}ms)")
+    print("=" * 60)
+    print(f"空闲 CPU 占用 (能量门控):   {gated:6.2f}%")
+    print(f"空闲 CPU 占用 (持续匹配):   {ungated:6.2f}%")
+    if detected:
+        print(
+            f"唤醒延迟:                  {latency * 1000:6.0f} ms (距离 {spotter.last_score:.2f})"
+        )
+    else:
+        print("未检测到唤醒词")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="唤醒词检测基准测试")
+    parser.add_argument("--seconds", type=float, default=10, help="空闲测量时长(秒)")
+    parser.add_argument("--level", type=float, default=60, help="背景噪音 RMS")
+    parser.add_argument("--templates", default="", help="唤醒词模板文件,默认使用合成模板")
+    args = parser.parse_args()
+
+    run(args.seconds, args.level, args.templates)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+离线基准测试组件
+用 WAV 文件代替麦克风、用空语音合成代替扬声器,配合 tests/mock_openai_server.py
+即可在没有声卡和 OpenAI API 的环境中端到端驱动 VoiceAssistant
+"""
+
+import math
+import os
+import struct
+import threading
+import time
+import wave
+from collections import deque
+from typing import List, Optional, Tuple
+
+import speech_recognition as sr
+
+from src.speech_recognition_module import SpeechRecognizer
+
+# 生成测试音频的默认参数: 16kHz 单声道 16bit
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+def generate_wav(
+    path: str,
+    speech_seconds: float = 0.6,
+    silence_seconds: float = 0.3,
+    frequency: float = 440.0,
+    amplitude: float = 0.3,
+    phrases: int = 1,
+) -> str:
+    """
+    生成 “静音 + 正弦音 + 静音” 的 WAV 文件,每个正弦音段充当一句话
+
+    Args:
+        path: 输出路径
+        speech_seconds: 正弦音时长(秒)
+        silence_seconds: 前后静音时长(秒)
+        frequency: 正弦音频率(Hz)
+        amplitude: 振幅(0-1)
+        phrases: 句数,句与句之间以静音分隔
+
+    Returns:
+        输出路径
+    """
+    peak = int(amplitude * (2 ** (8 * SAMPLE_WIDTH - 1) - 1))
+    silence = b"\x00\x00" * int(SAMPLE_RATE * silence_seconds)
+    tone = b"".join(
+        struct.pack("<h", int(peak * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)))
+        for i in range(int(SAMPLE_RATE * speech_seconds))
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(SAMPLE_WIDTH)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(silence + (tone + silence) * phrases)
+    return path
+
+
+class PcmSource(sr.AudioSource):
+    """
+    内存中 PCM 数据的音频源,可选按实时速度读取(模拟麦克风的节奏)
+    """
+
+    def __init__(
+        self,
+        pcm: bytes,
+        sample_rate: int = SAMPLE_RATE,
+        sample_width: int = SAMPLE_WIDTH,
+        realtime: bool = False,
+    ):
+        """
+        初始化音频源
+
+        Args:
+            pcm: 单声道 PCM 数据
+            sample_rate: 采样率
+            sample_width: 采样宽度(字节)
+            realtime: 是否按音频时长限速读取
+        """
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = sample_width
+        self.CHUNK = 1024
+        self.stream = _PcmStream(pcm, sample_rate, sample_width, realtime)
+
+    def __enter__(self) -> "PcmSource":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class _PcmStream:
+    """PcmSource 的数据流"""
+
+    def __init__(self, pcm: bytes, sample_rate: int, sample_width: int, realtime: bool):
+        self._pcm = pcm
+        self._position = 0
+        self._sample_rate = sample_rate
+        self._sample_width = sample_width
+        self._realtime = realtime
+        self._started: Optional[float] = None
+
+    def read(self, size: int) -> bytes:
+        data = self._pcm[self._position : self._position + size * self._sample_width]
+        self._position += len(data)
+
+        if self._realtime:
+            if self._started is None:
+                self._started = time.perf_counter()
+            due = self._started + self._position / self._sample_width / self._sample_rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+
+class WavPlaylistSource(sr.AudioSource):
+    """
+    按顺序播放 WAV 文件的音频源,可替代 sr.Microphone
+
+    每次进入 with 语句打开下一个文件;文件播放完后返回退出指令,让主循环结束
+    """
+
+    def __init__(self, utterances: List[Tuple[str, str]], exit_command: str = "退出"):
+        """
+        初始化音频源
+
+        Args:
+            utterances: (WAV 路径, 对应文本) 列表,文本作为该段音频的识别结果
+            exit_command: 播放完毕后返回的文本
+        """
+        if not utterances:
+            raise ValueError("至少需要一段音频")
+
+        self._pending = deque(utterances)
+        self._last_path = utterances[-1][0]
+        self._exit_command = exit_command
+        self._file: Optional[sr.AudioFile] = None
+        self.transcript: Optional[str] = None
+        self.stream = None
+
+    def __enter__(self) -> "WavPlaylistSource":
+        if self._pending:
+            path, self.transcript = self._pending.popleft()
+        else:
+            path, self.transcript = self._last_path, self._exit_command
+
+        self._file = sr.AudioFile(path).__enter__()
+        self.stream = self._file.stream
+        self.SAMPLE_RATE = self._file.SAMPLE_RATE
+        self.SAMPLE_WIDTH = self._file.SAMPLE_WIDTH
+        self.CHUNK = self._file.CHUNK
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.__exit__(exc_type, exc_value, traceback)
+        self._file = None
+        self.stream = None
+
+
+class TranscriptRecognizer(SpeechRecognizer):
+    """
+    离线识别器: 录音流程与 SpeechRecognizer 相同,识别结果直接取音频对应的文本
+
+    识别阶段的耗时由 recognize_delay 模拟
+    """
+
+    def __init__(self, source: WavPlaylistSource, recognize_delay: float = 0.0):
+        """
+        初始化识别器
+
+        Args:
+            source: WAV 音频源
+            recognize_delay: 模拟识别服务的耗时(秒)
+        """
+        super().__init__(microphone=source, calibrate=False)
+        self.recognize_delay = recognize_delay
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """返回当前音频对应的文本"""
+        if self.recognize_delay:
+            time.sleep(self.recognize_delay)
+        return self.microphone.transcript
+
+
+class NullTextToSpeech:
+    """空语音合成: 不发声,只记录朗读内容"""
+
+    def __init__(self, speak_delay: float = 0.0):
+        """
+        初始化
+
+        Args:
+            speak_delay: 模拟每次朗读的耗时(秒)
+        """
+        self.speak_delay = speak_delay
+        self.spoken: List[str] = []
+        self._stopped = threading.Event()
+
+    def speak(self, text: str):
+        """记录朗读内容"""
+        if not text:
+            return
+        self.spoken.append(text)
+        self._stopped.clear()
+        if self.speak_delay:
+            self._stopped.wait(self.speak_delay)
+
+    def stop(self):
+        """停止朗读(打断模拟的朗读耗时)"""
+        self._stopped.set()
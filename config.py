@@ -11,14 +11,87 @@ PROJECT_ROOT = Path(__file__).parent
 # OpenAI配置
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = "gpt-4.1-mini"  # 可选: gpt-4.1-mini, gpt-4.1-nano, gemini-2.5-flash
+LLM_STREAMING = True  # 流式读取大模型回复,逐句送入语音合成
+LOCAL_INTENT_ENABLED = True  # 常见指令(暂停音乐、调音量、截图等)走本地匹配,不请求大模型
+ASYNC_PIPELINE = False  # 使用 asyncio 流水线: 播报回复、执行工具的同时继续监听下一句
+
+# 大模型连接配置(所有组件共享同一个客户端和连接池)
+LLM_TIMEOUT = 30  # 请求超时(秒)
+LLM_CONNECT_TIMEOUT = 5  # 建立连接超时(秒)
+LLM_MAX_RETRIES = 2  # 失败重试次数
+LLM_MAX_CONNECTIONS = 10  # 连接池最大连接数
+LLM_KEEPALIVE_EXPIRY = 120  # 空闲连接在池中保留的时间(秒)
+LLM_WARMUP = True  # 启动时预热连接,提前完成DNS解析和TCP/TLS握手
+LLM_KEEPALIVE_INTERVAL = 60  # 会话空闲多久(秒)后发送保活请求,0 表示关闭
 
 # 语音识别配置
 SPEECH_RECOGNITION_LANGUAGE = "zh-CN"
 SPEECH_RECOGNITION_TIMEOUT = 5  # 秒
+SPEECH_PHRASE_TIME_LIMIT = 10  # 单句最长录音时长(秒)
+# 持续监听: 后台线程保持麦克风常开并切分语句,处理和播报期间说的话也不会丢失
+# 没有回声消除时扬声器的声音也会被录进去,建议配合耳机使用
+SPEECH_CONTINUOUS_LISTENING = False
+SPEECH_CAPTURE_QUEUE_SIZE = 8  # 待识别语句队列长度,满了丢弃最早的一句
+# 识别后端: google(在线) / vosk(本地离线,需要 pip install vosk 并下载模型)
+STT_BACKEND = os.getenv("STT_BACKEND", "google")
+STT_FALLBACK_BACKENDS = []  # 主后端出错(如断网)时逐句尝试的备用后端,如 ["vosk"]
+# 语音端点检测(VAD): 按帧判断是否有人说话,说完立即结束录音并裁掉首尾静音
+VAD_ENABLED = True
+VAD_FRAME_MS = 30  # 帧长(毫秒)
+VAD_HANGOVER_MS = 500  # 语音后连续静音超过该时长即判定说完(毫秒)
+VAD_SPEECH_START_MS = 90  # 连续语音超过该时长才算开始说话(毫秒)
+VAD_PADDING_MS = 150  # 语音前后保留的静音(毫秒)
+VAD_ZCR_THRESHOLD = 0.25  # 过零率阈值,用于识别能量较低的清辅音
+VAD_UNVOICED_MS = 150  # 清辅音只在浊音之后该时长内算作语音,避免宽带噪音被一直当作语音(毫秒)
+# 环境噪音校准: 结果按输入设备保存,启动时直接复用,运行中随环境噪音自适应调整
+CALIBRATION_FILE = str(PROJECT_ROOT / ".cache" / "calibration.json")
+CALIBRATION_MAX_AGE = 7 * 24 * 3600  # 校准结果有效期(秒),过期后重新校准
+CALIBRATION_DURATION = 1  # 重新校准时采集环境噪音的时长(秒)
+NOISE_ADAPTIVE = True  # 用等待说话期间的静音帧持续更新能量阈值(需开启 VAD)
+NOISE_ADAPT_RATE = 0.02  # 每帧向当前噪音靠拢的比例
+NOISE_THRESHOLD_RATIO = 1.5  # 能量阈值 = 噪音基线 × 该倍数
+NOISE_MIN_THRESHOLD = 50  # 能量阈值下限
+# 唤醒词: 本地检测到唤醒词后才进行完整识别(先运行 examples/enroll_wake_word.py 录制模板)
+WAKE_WORD_ENABLED = False
+WAKE_WORD_TEMPLATES = str(PROJECT_ROOT / "models" / "wake_word.npz")
+WAKE_WORD_THRESHOLD = 8.0  # DTW 距离阈值,越小越严格
+WAKE_WORD_HOP_MS = 150  # 有声音时每隔多久匹配一次(毫秒)
+WAKE_WORD_RING_SECONDS = 3  # 环形缓冲区时长(秒),保留唤醒词之后的音频
+WAKE_WORD_COMMAND_TIMEOUT = 5  # 唤醒后等待指令的时长(秒)
+VOSK_MODEL_PATH = os.getenv(
+    "VOSK_MODEL_PATH", str(PROJECT_ROOT / "models" / "vosk-model-small-cn-0.22")
+)
 
 # 语音合成配置
 TTS_RATE = 150  # 语速
 TTS_VOLUME = 0.9  # 音量
+# 朗读期间是否继续监听(需要耳机,否则扬声器的声音会被录进去);关闭时先等回复播完再监听,
+# 但大模型请求和工具执行仍可与朗读同时进行
+TTS_LISTEN_WHILE_SPEAKING = False
+# 打断(barge-in): 朗读期间用轻量的能量检测监听麦克风,用户一开口就停止朗读并识别这句话
+BARGE_IN_ENABLED = True
+BARGE_IN_THRESHOLD_RATIO = 3.0  # 朗读期间能量阈值的倍数,避免把扬声器的声音当成用户说话
+BARGE_IN_SPEECH_MS = 150  # 连续多长的语音才算打断(毫秒)
+
+# 语音合成缓存: 短语合成为音频文件保存在磁盘上(LRU),再次朗读时直接播放,不经过合成引擎
+TTS_CACHE_ENABLED = True
+TTS_CACHE_DIR = str(PROJECT_ROOT / ".cache" / "tts")
+TTS_CACHE_MAX_ENTRIES = 200  # 最大缓存条目数
+TTS_CACHE_RENDER_IDLE = 1.0  # 朗读空闲多久(秒)后再合成未缓存的短语,不占用朗读的时间
+# 只缓存这些固定短语和控制器的固定结果(启动后在朗读空闲时预先合成);其他文本(如大模型的回复)直接朗读
+TTS_CACHE_PHRASES = [
+    "你好,我是你的语音助手,有什么可以帮你的吗?",
+    "再见!",
+    "对话历史已清空",
+    "抱歉,处理时出现了错误",
+    "音乐已暂停",
+    "继续播放音乐",
+    "音乐已停止",
+    "当前没有正在播放的音乐",
+    "播放列表为空",
+    "已开启随机播放",
+    "已关闭随机播放",
+]
 
 # 系统控制配置
 ALLOWED_APPLICATIONS = {
@@ -37,20 +110,77 @@ SAFE_DIRECTORIES = [
     str(Path.home() / "Music"),
 ]
 
+# 读取文件配置: 只读取并解码需要的字节,大文件通过 mmap 访问
+# 未指定长度时读取的字节数(原来截断为前1000个字符;4096字节约为1300个汉字或4096个英文字符)
+FILE_READ_DEFAULT_BYTES = 4096
+FILE_READ_MAX_BYTES = 65536  # 一次最多读取的字节数
+FILE_MMAP_THRESHOLD = 1024 * 1024  # 超过该大小(字节)的文件使用 mmap
+FILE_ENCODING_PROBE_BYTES = 4096  # 识别编码时读取的开头字节数
+FILE_GREP_MAX_MATCHES = 50  # 逐行过滤时最多返回的行数
+FILE_GREP_MAX_LINE_CHARS = 300  # 过滤结果中每行最多保留的字符数
+
 # 日志配置
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = "pc_voice_assist.log"
 
+# 任务执行配置
+TOOL_EXECUTOR_MAX_WORKERS = 4  # 并发执行工具调用的最大线程数
+MAX_TOOL_STEPS = 5  # 一次对话中最多连续执行的工具调用轮数
+TOOL_LOOP_DEADLINE = 60  # 一次对话的最长耗时(秒),超时后不再发起新的工具调用
+
+# 规划缓存配置(重复或相近的指令直接复用上次的函数调用计划)
+PLAN_CACHE_ENABLED = True
+PLAN_CACHE_FILE = str(PROJECT_ROOT / ".cache" / "plan_cache.json")
+PLAN_CACHE_MAX_ENTRIES = 500  # 最大缓存条目数(LRU淘汰)
+PLAN_CACHE_TTL = 7 * 24 * 3600  # 条目有效期(秒)
+PLAN_CACHE_SIMILARITY = 0.8  # 相近说法的字符n-gram相似度阈值
+PLAN_CACHE_FUNCTIONS = [
+    "play_music",
+    "system_control",
+    "open_application",
+    "music_queue",
+    "find_and_play",
+]
+# 依赖上一轮结果的参数(如搜索结果序号),含这些参数的计划换个时间重放会指向别的目标,不缓存
+PLAN_CACHE_CONTEXT_ARGUMENTS = {"play_music": ["index"]}
+# 文件路径参数: 文件名没有出现在用户的话里时(如“播放它”),路径来自上下文,不缓存
+PLAN_CACHE_PATH_ARGUMENTS = ["file_path", "file_paths"]
+# 执行结果包含这些内容时视为失败,不缓存
+PLAN_CACHE_FAILURE_MARKERS = ["错误", "出错", "失败", "未找到", "不存在", "没有"]
+
 # 音乐文件配置
 MUSIC_EXTENSIONS = [".mp3", ".wav", ".ogg", ".flac", ".m4a"]
 DEFAULT_MUSIC_DIR = str(Path.home() / "Music")
+MUSIC_SEARCH_RESULT_LIMIT = 5  # 搜索结果最多返回给大模型的条数
+
+# 音乐库索引: 音乐目录索引到 SQLite,按目录和文件的修改时间增量刷新,搜索不再遍历目录树
+MUSIC_LIBRARY_ENABLED = True
+MUSIC_LIBRARY_DIR = str(PROJECT_ROOT / ".cache" / "music_library")  # 每个音乐目录一个索引文件
+MUSIC_LIBRARY_REFRESH_INTERVAL = 30  # 未监视目录时,搜索前距离上次刷新超过该时长(秒)则增量刷新
+# 监视音乐目录的变化(需要 pip install watchdog),事件合并后批量写入索引,不再定时刷新
+MUSIC_LIBRARY_WATCH = True
+MUSIC_WATCH_DEBOUNCE = 1.0  # 最后一个事件之后等待多久再写入(秒)
+MUSIC_WATCH_POLL_INTERVAL = 60  # 无法监视时的增量刷新间隔(秒)
+# 模糊搜索: 按汉字、拼音和首字母匹配,容忍同音错字(安装 pypinyin 后支持拼音)
+MUSIC_FUZZY_SEARCH = True
+MUSIC_FUZZY_MAX_DISTANCE = 0.25  # 最大相对编辑距离(编辑距离 / 查询长度)
+# 音乐标签: 建立索引后在进程池中读取歌手、专辑、标题和时长(需要 pip install mutagen),搜索时一并匹配
+MUSIC_METADATA_ENABLED = True
+MUSIC_METADATA_WORKERS = 0  # 工作进程数,0 表示按 CPU 核数
+MUSIC_METADATA_CHUNK_SIZE = 256  # 每个工作进程一次读取的文件数
+# 播放列表: 预载下一首,当前一首结束时无缝切换
+MUSIC_QUEUE_MAX_TRACKS = 100  # 按关键词生成播放列表时最多加入的音乐数
+MUSIC_QUEUE_LIST_LIMIT = 10  # 查看播放列表时最多列出的音乐数
+MUSIC_QUEUE_POLL_INTERVAL = 0.2  # 检查一首是否播放结束的间隔(秒)
 
 # 写作配置
 DEFAULT_ARTICLE_DIR = str(Path.home() / "Documents")
 ARTICLE_LENGTHS = {"short": "300-500字", "medium": "800-1200字", "long": "2000-3000字"}
 
 # 对话配置
-MAX_CONVERSATION_HISTORY = 10  # 保留的对话轮数
+MAX_CONVERSATION_HISTORY = 10  # 完整保留的对话轮数,更早的对话折叠为摘要
+MAX_PROMPT_TOKENS = 4000  # 对话历史的token上限,超出时最早的对话整轮折叠为摘要
+HISTORY_SUMMARY_MAX_TOKENS = 500  # 滚动摘要的token上限
 SYSTEM_PROMPT = """你是一个智能PC语音助手,可以帮助用户通过自然语言控制电脑。
 你可以执行以下操作:
 1. 播放音乐、暂停音乐、停止音乐
@@ -61,6 +61,7 @@ def demo_complex_tasks():
 
         # 执行函数调用
         if function_calls:
+            results = []
             for func_call in function_calls:
                 print(f"\n⚙️ 执行函数: {func_call['name']}")
                 print(f"📋 参数: {func_call['arguments']}")
@@ -69,14 +70,13 @@ def demo_complex_tasks():
                 result = task_executor.execute(func_call["name"], func_call["arguments"])
 
                 print(f"✅ 执行结果: {result}")
+                results.append({"id": func_call["id"], "name": func_call["name"], "result": result})
 
-                # 返回结果给大模型
-                final_response = llm_client.add_function_result(
-                    func_call["id"], func_call["name"], result
-                )
+            # 一次性返回全部结果给大模型
+            final_response, _ = llm_client.add_function_results(results)
 
-                if final_response:
-                    print(f"🤖 助手: {final_response}")
+            if final_response:
+                print(f"🤖 助手: {final_response}")
 
         print()
         input("按回车继续下一个示例...")
@@ -109,16 +109,16 @@ def demo_conversation_context():
             print(f"🤖 助手: {response_text}")
 
         if function_calls:
+            results = []
             for func_call in function_calls:
                 result = task_executor.execute(func_call["name"], func_call["arguments"])
                 print(f"✅ 执行: {result}")
+                results.append({"id": func_call["id"], "name": func_call["name"], "result": result})
 
-                final_response = llm_client.add_function_result(
-                    func_call["id"], func_call["name"], result
-                )
+            final_response, _ = llm_client.add_function_results(results)
 
-                if final_response:
-                    print(f"🤖 助手: {final_response}")
+            if final_response:
+                print(f"🤖 助手: {final_response}")
 
         input("按回车继续...")
 
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+唤醒词录制脚本
+录制几遍唤醒词,生成本地唤醒词检测使用的模板
+"""
+
+import argparse
+import os
+import sys
+
+# isort: skip_file
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.speech_recognition_module import SpeechRecognizer
+from src.vad import VoiceActivityDetector
+from src.wake_word import WakeWordSpotter
+
+
+def enroll(samples: int, path: str):
+    """录制唤醒词模板"""
+    print("=" * 60)
+    print("PC Voice Assist - 唤醒词录制")
+    print("=" * 60)
+
+    # 录制时不需要唤醒词
+    config.WAKE_WORD_ENABLED = False
+    recognizer = SpeechRecognizer()
+    vad = recognizer.vad or VoiceActivityDetector(recognizer.recognizer.energy_threshold)
+    spotter = WakeWordSpotter()
+
+    while len(spotter.templates) < samples:
+        print(f"\n请说唤醒词 ({len(spotter.templates) + 1}/{samples})...")
+        try:
+            audio = vad.trim(recognizer.capture())
+        except Exception as e:
+            print(f"❌ 录制失败: {e}")
+            continue
+
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        if not 0.3 <= seconds <= 2.5:
+            print(f"❌ 录音时长 {seconds:.1f}s 不合适,请重新说一遍")
+            continue
+
+        spotter.enroll(audio)
+        print(f"✅ 已录制 ({seconds:.1f}s)")
+
+    spotter.save(path)
+    print(f"\n模板已保存到 {path}")
+    print("在 config.py 中设置 WAKE_WORD_ENABLED = True 即可启用唤醒词")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="录制唤醒词模板")
+    parser.add_argument("--samples", type=int, default=3, help="录制遍数")
+    parser.add_argument("--output", default=config.WAKE_WORD_TEMPLATES, help="模板文件")
+    args = parser.parse_args()
+
+    enroll(args.samples, args.output)
@@ -3,26 +3,48 @@
 PC Voice Assist - 主程序
 基于大模型的语音控制PC应用
 """
+import asyncio
 import os
 import sys
+import threading
+import time
+from typing import Optional
 
 # isort: skip_file
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
+from src.async_llm_client import AsyncLLMClient
+from src.async_pipeline import AsyncSpeechRecognizer, AsyncTaskExecutor, AsyncTextToSpeech
+from src.intent_matcher import IntentMatcher
 from src.llm_client import LLMClient
+from src.metrics import LatencyRecorder
+from src.openai_client import KeepAlivePinger, async_warm_up, warm_up
+from src.plan_cache import PlanCache
 from src.speech_recognition_module import SpeechRecognizer
 from src.task_executor import TaskExecutor
 from src.text_to_speech import TextToSpeech
+from src.tts_worker import SpeechWorker
+from src.tool_loop import AsyncToolLoop, ToolLoop
 from src.logger import logger
 
 
 class VoiceAssistant:
     """语音助手主类"""
 
-    def __init__(self):
-        """初始化语音助手"""
+    def __init__(
+        self,
+        speech_recognizer: Optional[SpeechRecognizer] = None,
+        tts: Optional[TextToSpeech] = None,
+    ):
+        """
+        初始化语音助手
+
+        Args:
+            speech_recognizer: 语音识别器,默认使用麦克风输入(基准测试中可替换)
+            tts: 语音合成器,默认使用 pyttsx3(基准测试中可替换)
+        """
         print("=" * 60)
         print("PC Voice Assist - 语音控制PC应用")
         print("=" * 60)
@@ -30,71 +52,228 @@ class VoiceAssistant:
         print("\n正在初始化组件...")
 
         # 初始化各个模块
-        self.speech_recognizer = SpeechRecognizer()
-        self.tts = TextToSpeech()
+        self.speech_recognizer = speech_recognizer or SpeechRecognizer()
         self.llm_client = LLMClient()
         self.task_executor = TaskExecutor()
+        self.plan_cache = PlanCache() if config.PLAN_CACHE_ENABLED else None
+        self.tool_loop = ToolLoop(self.llm_client, self.task_executor, plan_cache=self.plan_cache)
+        self.intent_matcher = (
+            IntentMatcher(has_music=self.task_executor.music_controller.has_music)
+            if config.LOCAL_INTENT_ENABLED
+            else None
+        )
+
+        # 后台预热大模型连接,会话空闲时发送保活请求
+        if config.LLM_WARMUP:
+            threading.Thread(target=warm_up, name="llm-warmup", daemon=True).start()
+        self.keepalive = KeepAlivePinger()
+        self.keepalive.start()
+
+        # 分阶段延迟统计
+        self.metrics = LatencyRecorder()
+        self._turn_started: Optional[float] = None
+
+        # 朗读在专用线程上进行,处理下一步时不必等待播完;未替换时 pyttsx3 引擎也在该线程上创建
+        self.speaker = SpeechWorker(tts, metrics=self.metrics)
+        self.tts = self.speaker.tts
 
         print("✅ 初始化完成!\n")
 
     def run(self):
         """运行主循环"""
-        self.tts.speak("你好,我是你的语音助手,有什么可以帮你的吗?")
+        self.speaker.say("你好,我是你的语音助手,有什么可以帮你的吗?").result()
+
+        # 问候语播完后再打开麦克风,避免把助手自己的声音录进去
+        if config.SPEECH_CONTINUOUS_LISTENING:
+            self.speech_recognizer.start_background()
 
         while True:
             try:
-                # 监听用户语音
-                user_input = self.speech_recognizer.listen()
+                # 朗读期间监听用户是否开口,开口即打断朗读并识别这句话
+                user_input = None
+                if config.BARGE_IN_ENABLED and self.speaker.speaking:
+                    user_input = self.speech_recognizer.barge_in(
+                        lambda: self.speaker.speaking, self._interrupt
+                    )
+                    if user_input is not None:
+                        self.metrics.record("barge_in", self.speech_recognizer.last_barge_in)
+
+                if user_input is None:
+                    # 没有耳机时扬声器的声音会被录进去,先等回复播完再监听
+                    if not config.TTS_LISTEN_WHILE_SPEAKING:
+                        self.speaker.wait()
+
+                    # 监听用户语音
+                    with self.metrics.time("stt"):
+                        user_input = self.speech_recognizer.listen()
 
                 if not user_input:
                     continue
 
                 # 检查退出命令
                 if user_input in ["退出", "再见", "结束", "关闭"]:
-                    self.tts.speak("再见!")
+                    self.speaker.say("再见!").result()
                     break
 
                 # 检查重置命令
                 if user_input in ["重置对话", "清空历史", "重新开始"]:
                     self.llm_client.reset_conversation()
-                    self.tts.speak("对话历史已清空")
+                    self.speaker.say("对话历史已清空")
                     continue
 
-                # 发送给大模型处理
-                response_text, function_calls = self.llm_client.chat(user_input)
-
-                # 如果有函数调用,执行它们
-                if function_calls:
-                    for func_call in function_calls:
-                        # 执行函数
-                        result = self.task_executor.execute(
-                            func_call["name"], func_call["arguments"]
-                        )
-
-                        print(f"✅ 执行结果: {result}")
-
-                        # 将结果返回给大模型
-                        final_response = self.llm_client.add_function_result(
-                            func_call["id"], func_call["name"], result
-                        )
-
-                        # 如果有最终回复,播放给用户
-                        if final_response:
-                            self.tts.speak(final_response)
-
-                # 如果没有函数调用,直接回复
-                elif response_text:
-                    self.tts.speak(response_text)
+                self._turn_started = time.perf_counter()
+                with self.metrics.time("turn"):
+                    self._handle(user_input)
 
             except KeyboardInterrupt:
                 print("\n\n收到中断信号,正在退出...")
-                self.tts.speak("再见!")
+                self.speaker.cancel()
+                self.speaker.say("再见!").result()
                 break
 
             except Exception as e:
                 error_msg = f"发生错误: {str(e)}"
                 logger.error(error_msg)
-                self.tts.speak("抱歉,处理时出现了错误")
+                self.speaker.say("抱歉,处理时出现了错误")
+
+        self.speaker.close()
+        self.speech_recognizer.stop_background()
+        self.speech_recognizer.save_calibration()
+        self.keepalive.stop()
+
+    def _handle(self, user_input: str):
+        """处理一句用户输入"""
+        # 常见指令走本地快速路径,直接执行,不请求大模型
+        intent = self.intent_matcher.match(user_input) if self.intent_matcher else None
+        if intent:
+            with self.metrics.time("tools"):
+                result = self.task_executor.execute(intent["name"], intent["arguments"])
+            print(f"✅ 执行结果: {result}")
+            self.llm_client.record_exchange(user_input, result)
+            self._speak(result)
+            return
+
+        # 流式模式下回复逐句送入语音合成,不必等待完整回复
+        on_sentence = self._speak if config.LLM_STREAMING else None
+
+        # 交给大模型处理,循环执行函数调用直到得到最终回复
+        result = self.tool_loop.run(user_input, on_sentence=on_sentence)
+        for timing in result.timings:
+            self.metrics.record(timing.stage, timing.seconds)
+
+        # 播放最终回复(流式模式下已逐句播放)
+        if result.text and not on_sentence:
+            self._speak(result.text)
+
+    def _interrupt(self):
+        """打断朗读: 停止当前一句并清空排队的内容,等到真正静音才返回"""
+        self.speaker.cancel()
+        self.speaker.wait(timeout=1)
+
+    def _speak(self, text: str):
+        """排队朗读回复,并记录首次发声延迟(合成耗时由朗读线程记录)"""
+        if self._turn_started is not None:
+            self.metrics.record("first_audio", time.perf_counter() - self._turn_started)
+            self._turn_started = None
+
+        self.speaker.say(text)
+
+
+class AsyncVoiceAssistant:
+    """基于 asyncio 的语音助手: 监听下一句、大模型请求、工具执行和语音播报可以同时进行"""
+
+    def __init__(self):
+        """初始化语音助手"""
+        print("=" * 60)
+        print("PC Voice Assist - 语音控制PC应用 (异步模式)")
+        print("=" * 60)
+
+        print("\n正在初始化组件...")
+
+        # 同步组件包装为异步接口
+        self.speech_recognizer = AsyncSpeechRecognizer(SpeechRecognizer())
+        self.tts = AsyncTextToSpeech()
+        self.llm_client = AsyncLLMClient()
+        self.task_executor = AsyncTaskExecutor(TaskExecutor())
+        self.plan_cache = PlanCache() if config.PLAN_CACHE_ENABLED else None
+        self.tool_loop = AsyncToolLoop(
+            self.llm_client, self.task_executor, plan_cache=self.plan_cache
+        )
+        self.intent_matcher = (
+            IntentMatcher(has_music=self.task_executor.task_executor.music_controller.has_music)
+            if config.LOCAL_INTENT_ENABLED
+            else None
+        )
+
+        print("✅ 初始化完成!\n")
+
+    async def run(self):
+        """运行主循环"""
+        if config.LLM_WARMUP:
+            self._warmup = asyncio.create_task(async_warm_up())
+
+        greeting = self.tts.speak_nowait("你好,我是你的语音助手,有什么可以帮你的吗?")
+
+        # 识别结果进入队列,处理上一句和播报回复的同时继续监听
+        utterances: "asyncio.Queue[str]" = asyncio.Queue()
+        listener = asyncio.create_task(self._listen_forever(utterances, greeting))
+
+        try:
+            while True:
+                user_input = await utterances.get()
+
+                # 用户说了新的一句,之前没播完的回复不再播放
+                if config.BARGE_IN_ENABLED and self.tts.worker.speaking:
+                    self.tts.stop()
+
+                # 检查退出命令
+                if user_input in ["退出", "再见", "结束", "关闭"]:
+                    await self.tts.speak("再见!")
+                    break
+
+                # 检查重置命令
+                if user_input in ["重置对话", "清空历史", "重新开始"]:
+                    self.llm_client.reset_conversation()
+                    self.tts.speak_nowait("对话历史已清空")
+                    continue
+
+                try:
+                    await self._handle(user_input)
+                except Exception as e:
+                    logger.error(f"发生错误: {str(e)}")
+                    self.tts.speak_nowait("抱歉,处理时出现了错误")
+        finally:
+            listener.cancel()
+            self.speech_recognizer.close()
+            self.tts.close()
+
+    async def _listen_forever(self, utterances: "asyncio.Queue[str]", greeting: asyncio.Future):
+        """持续监听,把识别出的文本放入队列"""
+        # 先等问候语播完,避免把助手自己的声音录进去
+        await greeting
+        if config.SPEECH_CONTINUOUS_LISTENING:
+            self.speech_recognizer.speech_recognizer.start_background()
+        while True:
+            user_input = await self.speech_recognizer.listen()
+            if user_input:
+                await utterances.put(user_input)
+
+    async def _handle(self, user_input: str):
+        """处理一句用户输入,回复排队播报,不等待播完"""
+        # 常见指令走本地快速路径
+        intent = self.intent_matcher.match(user_input) if self.intent_matcher else None
+        if intent:
+            result = await self.task_executor.execute(intent["name"], intent["arguments"])
+            print(f"✅ 执行结果: {result}")
+            self.llm_client.record_exchange(user_input, result)
+            self.tts.speak_nowait(result)
+            return
+
+        on_sentence = self.tts.speak_nowait if config.LLM_STREAMING else None
+        result = await self.tool_loop.run(user_input, on_sentence=on_sentence)
+
+        if result.text and not on_sentence:
+            self.tts.speak_nowait(result.text)
 
 
 def main():
@@ -108,8 +287,14 @@ def main():
 
     try:
         # 创建并运行助手
-        assistant = VoiceAssistant()
-        assistant.run()
+        if config.ASYNC_PIPELINE:
+            asyncio.run(AsyncVoiceAssistant().run())
+        else:
+            assistant = VoiceAssistant()
+            assistant.run()
+
+    except KeyboardInterrupt:
+        print("\n\n收到中断信号,正在退出...")
 
     except Exception as e:
         logger.critical(f"启动失败: {str(e)}")
@@ -0,0 +1,84 @@
+"""
+异步大模型客户端模块
+基于 AsyncOpenAI 发送请求,对话和 Function Calling 的处理逻辑与 LLMClient 共用
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from src.llm_client import BaseLLMClient, ChatReply, Steps
+from src.openai_client import get_async_openai_client
+from src.streaming import StreamAccumulator
+
+
+async def run_steps_async(steps: Steps) -> Any:
+    """
+    异步执行处理步骤(与 run_steps 相同,只是 await 每个 I/O 调用的结果)
+
+    Args:
+        steps: 处理步骤
+
+    Returns:
+        处理结果
+    """
+    try:
+        call = next(steps)
+        while True:
+            try:
+                value = await call()
+            except Exception as e:
+                call = steps.throw(e)
+            else:
+                call = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+class AsyncLLMClient(BaseLLMClient):
+    """异步大模型客户端"""
+
+    def __init__(self):
+        """初始化客户端"""
+        super().__init__()
+        self.client = get_async_openai_client()
+
+    async def chat(
+        self, user_message: str, on_sentence: Optional[Callable[[str], None]] = None
+    ) -> ChatReply:
+        """
+        发送消息并获取响应
+
+        Args:
+            user_message: 用户消息
+            on_sentence: 可选的句子回调,提供时以流式方式读取回复,每凑满一句就回调一次
+
+        Returns:
+            (回复文本, 函数调用列表) 的元组
+        """
+        return await run_steps_async(self._chat_steps(user_message, on_sentence))
+
+    async def add_function_results(
+        self,
+        results: List[Dict[str, Any]],
+        on_sentence: Optional[Callable[[str], None]] = None,
+    ) -> ChatReply:
+        """
+        批量添加同一条助手消息的全部函数执行结果,并只请求一次后续响应
+
+        Args:
+            results: 执行结果列表,每项包含 id(工具调用ID)、name(函数名称)、result(执行结果)
+            on_sentence: 可选的句子回调,提供时以流式方式读取回复
+
+        Returns:
+            (回复文本, 函数调用列表) 的元组
+        """
+        return await run_steps_async(self._results_steps(results, on_sentence))
+
+    async def _send(self, request: Dict[str, Any]) -> Any:
+        """发送非流式补全请求,返回响应中的消息"""
+        response = await self.client.chat.completions.create(**request)
+        return response.choices[0].message
+
+    async def _send_stream(self, request: Dict[str, Any], accumulator: StreamAccumulator):
+        """发送流式补全请求,把每个数据块交给 accumulator"""
+        async for chunk in await self.client.chat.completions.create(stream=True, **request):
+            accumulator.add_chunk(chunk)
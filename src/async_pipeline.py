@@ -0,0 +1,143 @@
+"""
+异步流水线适配器
+把同步的语音识别、语音合成和任务执行包装为可在 asyncio 事件循环中等待的接口
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.speech_recognition_module import SpeechRecognizer
+from src.task_executor import TaskExecutor
+from src.text_to_speech import TextToSpeech
+from src.tts_worker import SpeechWorker
+
+
+class AsyncTaskExecutor:
+    """任务执行引擎的异步包装"""
+
+    def __init__(self, task_executor: TaskExecutor):
+        """
+        初始化
+
+        Args:
+            task_executor: 同步任务执行引擎
+        """
+        self.task_executor = task_executor
+        self._background: set = set()
+
+    async def execute(self, function_name: str, arguments: Dict[str, Any]) -> str:
+        """
+        在线程中执行单个函数调用
+
+        Args:
+            function_name: 函数名称
+            arguments: 函数参数
+
+        Returns:
+            执行结果描述
+        """
+        return await asyncio.to_thread(self.task_executor.execute, function_name, arguments)
+
+    async def execute_batch(self, function_calls: List[Dict[str, Any]]) -> List[str]:
+        """
+        在线程中批量执行函数调用,并发规则与 TaskExecutor.execute_batch 一致
+
+        Args:
+            function_calls: 函数调用列表
+
+        Returns:
+            与输入顺序一致的执行结果列表
+        """
+        return await asyncio.to_thread(self.task_executor.execute_batch, function_calls)
+
+    def run_in_background(self, function_calls: List[Dict[str, Any]]) -> "asyncio.Task[List[str]]":
+        """
+        后台执行函数调用,不阻塞当前对话
+
+        Args:
+            function_calls: 函数调用列表
+
+        Returns:
+            可等待的后台任务
+        """
+        task = asyncio.create_task(self.execute_batch(function_calls))
+        # 保留引用,避免任务在完成前被回收
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+
+class AsyncSpeechRecognizer:
+    """语音识别的异步包装,阻塞监听在专用线程上进行"""
+
+    def __init__(self, speech_recognizer: SpeechRecognizer):
+        """
+        初始化
+
+        Args:
+            speech_recognizer: 同步语音识别器
+        """
+        self.speech_recognizer = speech_recognizer
+        # 麦克风同一时间只能被一个线程使用
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt")
+
+    async def listen(self) -> str:
+        """
+        监听并识别一句话
+
+        Returns:
+            识别出的文本,识别失败返回空字符串
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.speech_recognizer.listen)
+
+    def close(self):
+        """关闭监听线程"""
+        self.speech_recognizer.stop_background()
+        self.speech_recognizer.save_calibration()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncTextToSpeech:
+    """语音合成的异步包装,所有朗读在同一后台线程上按顺序执行"""
+
+    def __init__(self, tts: Optional[TextToSpeech] = None):
+        """
+        初始化
+
+        Args:
+            tts: 同步语音合成器,默认由工作线程创建
+        """
+        # pyttsx3 引擎不是线程安全的,在工作线程上创建并只在该线程上使用
+        self.worker = SpeechWorker(tts)
+        self.tts = self.worker.tts
+
+    def speak_nowait(self, text: str) -> "asyncio.Future[None]":
+        """
+        排队朗读文本,立即返回(需在事件循环线程中调用)
+
+        Args:
+            text: 要朗读的文本
+
+        Returns:
+            朗读结束时完成的 Future,结果为是否完整播完
+        """
+        return asyncio.wrap_future(self.worker.say(text))
+
+    async def speak(self, text: str):
+        """
+        朗读文本并等待完成
+
+        Args:
+            text: 要朗读的文本
+        """
+        await self.speak_nowait(text)
+
+    def stop(self):
+        """停止当前朗读,并取消排队的内容"""
+        self.worker.cancel()
+
+    def close(self):
+        """关闭朗读线程"""
+        self.worker.close(wait=False)
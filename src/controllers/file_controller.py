@@ -5,9 +5,10 @@
 
 import os
 from pathlib import Path
-
+from typing import Optional
 
 import config
+from src.file_reader import read_window
 from src.logger import logger
 
 
@@ -70,12 +71,21 @@ class FileController:
             logger.error(f"创建文件时出错: {str(e)}")
             return f"创建文件时出错: {str(e)}"
 
-    def read_file(self, file_path: str) -> str:
+    def read_file(
+        self,
+        file_path: str,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        grep: Optional[str] = None,
+    ) -> str:
         """
-        读取文件
+        读取文件的一段内容(只读取需要的字节,大文件也不会整个读入内存)
 
         Args:
             file_path: 文件路径
+            offset: 起始字节,负数表示从文件末尾倒数,默认从头开始
+            length: 读取的字节数,默认取配置(4096字节,原来为前1000个字符)
+            grep: 只返回匹配的行(正则表达式,不区分大小写)
 
         Returns:
             文件内容或错误信息
@@ -90,14 +100,31 @@ class FileController:
                 return f"错误: 不允许读取此路径的文件 - {file_path}"
 
             # 读取文件
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # 限制返回内容长度
-            if len(content) > 1000:
-                content = content[:1000] + "\n... (内容过长,已截断)"
-
-            return f"文件内容 ({file_path}):\n{content}"
+            window = read_window(file_path, offset=offset, length=length, grep=grep)
+            span = f"第 {window.start}-{window.end} 字节, 共 {window.size} 字节"
+
+            if grep:
+                if not window.matches:
+                    return f"未在 {file_path} ({span}) 中找到匹配 '{grep}' 的行"
+                result = (
+                    f"在 {file_path} 中找到 {window.matches} 行匹配 '{grep}' "
+                    f"({span}):\n{window.text}"
+                )
+                if window.truncated:
+                    result += f"\n... (匹配的行过多,可用 offset={window.end} 继续搜索)"
+                return result
+
+            # 整个文件都读到时保持原来的格式
+            if window.start == 0 and window.end == window.size:
+                return f"文件内容 ({file_path}):\n{window.text}"
+
+            result = f"文件内容 ({file_path}, {span}, 编码 {window.encoding}):\n{window.text}"
+            if window.end < window.size:
+                result += (
+                    f"\n... (后面还有 {window.size - window.end} 字节,"
+                    f"可用 offset={window.end} 继续读取)"
+                )
+            return result
 
         except Exception as e:
             logger.error(f"读取文件时出错: {str(e)}")
@@ -1,16 +1,20 @@
 """
 音乐控制器
-负责音乐播放控制
+负责音乐播放控制和播放列表
 """
 
 import os
+import random
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import pygame
 
 import config
 from src.logger import logger
+from src.music_library import MusicLibrary, relevance
+from src.music_watcher import LibraryWatcher
 
 
 class MusicController:
@@ -23,6 +27,193 @@ class MusicController:
         self.is_playing = False
         self.is_paused = False
 
+        # 播放列表: playlist 为当前播放顺序,position 为正在播放的一首
+        self.playlist: List[str] = []
+        self.position = -1
+        self.shuffle = False
+        # 最近一次搜索的结果,可按序号播放
+        self.last_results: List[str] = []
+        self._original: List[str] = []
+        self._queued: Optional[str] = None
+        # 上次检查时的播放位置(毫秒),预载的下一首开始时位置从头计
+        self._last_pos = -1
+        self._play_lock = threading.RLock()
+        self._closed = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+        # 音乐库索引,启动时在后台增量刷新
+        self.library: Optional[MusicLibrary] = None
+        self.watcher: Optional[LibraryWatcher] = None
+        self._library_lock = threading.Lock()
+        # 当前索引的首次扫描是否已完成
+        self._library_ready = threading.Event()
+        if config.MUSIC_LIBRARY_ENABLED:
+            threading.Thread(target=self._get_library, name="music-library", daemon=True).start()
+
+    def _get_library(self, wait: bool = True) -> Optional[MusicLibrary]:
+        """
+        获取当前音乐目录的索引,目录配置变化时切换到对应的索引
+
+        首次扫描在锁外进行,期间其他线程等待扫描完成,不必等待的调用方(如本地意图匹配)直接返回
+
+        Args:
+            wait: 是否等待首次扫描完成;为False时不等待也不刷新,索引尚未就绪返回None
+        """
+        with self._library_lock:
+            root = os.path.abspath(config.DEFAULT_MUSIC_DIR)
+            scan = self.library is None or self.library.root != root
+            if scan:
+                self._close_library()
+                self.library = MusicLibrary(root)
+                self._library_ready = threading.Event()
+                if config.MUSIC_LIBRARY_WATCH:
+                    # 先开始监视再刷新,刷新期间的变化也不会遗漏;之后由监视器保持索引最新
+                    self.watcher = LibraryWatcher(self.library)
+                    self.watcher.start()
+            library, ready = self.library, self._library_ready
+
+        if scan:
+            try:
+                library.refresh()
+                if config.MUSIC_FUZZY_SEARCH:
+                    library.fuzzy_index()
+                self._update_metadata(library)
+            except Exception as e:
+                # 扫描期间目录配置变化或控制器关闭时索引已被关闭
+                if not library.closed:
+                    raise
+                logger.info(f"音乐库已关闭,停止扫描: {e}")
+            finally:
+                ready.set()
+            return library
+
+        if not wait:
+            return library if ready.is_set() else None
+        ready.wait()
+        with self._library_lock:
+            if self.library is library and self.watcher is None:
+                last_refresh = library.last_refresh
+                library.ensure_fresh()
+                if library.last_refresh != last_refresh:
+                    self._update_metadata(library)
+        return library
+
+    def _update_metadata(self, library: MusicLibrary):
+        """在后台线程中读取新增和修改过的文件的标签,搜索不必等待"""
+        if not config.MUSIC_METADATA_ENABLED:
+            return
+
+        def run():
+            try:
+                library.update_metadata()
+            except Exception as e:
+                logger.error(f"读取音乐标签出错: {e}")
+
+        threading.Thread(target=run, name="music-metadata", daemon=True).start()
+
+    def _close_library(self):
+        """停止监视并关闭索引"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self.library is not None:
+            self.library.close()
+            self.library = None
+
+    def close(self):
+        """停止播放列表的监视线程,释放音乐库索引"""
+        self._closed.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=2)
+            self._monitor = None
+        with self._library_lock:
+            self._close_library()
+
+    def _start_monitor(self):
+        """启动播放列表的监视线程(首次播放时)"""
+        if self._monitor is not None:
+            return
+        self._monitor = threading.Thread(target=self._run_monitor, name="music-queue", daemon=True)
+        self._monitor.start()
+
+    def _run_monitor(self):
+        """
+        监视线程: 定时检查播放状态,切换到下一首并预载再下一首
+
+        只调用 mixer 的查询接口,不使用 SDL 事件队列和视频子系统(macOS 上只能在主线程使用)
+        """
+        while not self._closed.wait(config.MUSIC_QUEUE_POLL_INTERVAL):
+            try:
+                with self._play_lock:
+                    self._check_playback()
+            except Exception as e:
+                logger.error(f"切换播放列表中的音乐时出错: {e}")
+                with self._play_lock:
+                    self.is_playing = False
+
+    def _check_playback(self):
+        """检查当前一首是否已经结束,或预载的下一首是否已经接着开始"""
+        if not self.is_playing or self.is_paused:
+            return
+        position = pygame.mixer.music.get_pos()
+        if not pygame.mixer.music.get_busy():
+            self._on_music_end()
+            return
+
+        if self._queued is not None and position < self._last_pos:
+            # 预载的下一首已经无缝接上(播放位置从头计)
+            self.position += 1
+            self.current_music = self._queued
+            self._queue_following()
+            logger.info(f"播放列表切换到: {Path(self.current_music).name}")
+        self._last_pos = position
+
+    def _on_music_end(self):
+        """播放停止: 还有下一首时播放下一首,否则结束"""
+        if self.position + 1 < len(self.playlist):
+            self._start(self.position + 1)
+        else:
+            self.is_playing = False
+            self.is_paused = False
+            self.current_music = None
+            self._queued = None
+            logger.info("播放列表已播放完毕")
+
+    def _start(self, index: int):
+        """从头播放列表中的第 index 首,并预载下一首"""
+        path = self.playlist[index]
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play()
+        self._last_pos = -1
+        self.position = index
+        self.current_music = path
+        self.is_playing = True
+        self.is_paused = False
+        self._queue_following()
+
+    def _queue_following(self):
+        """把下一首交给 pygame 预载,当前一首结束时无缝接着播放"""
+        self._queued = None
+        if self.position + 1 >= len(self.playlist):
+            return
+        following = self.playlist[self.position + 1]
+        try:
+            pygame.mixer.music.queue(following)
+            self._queued = following
+        except pygame.error as e:
+            # 预载失败时等这一首结束后再正常加载
+            logger.warning(f"预载下一首失败: {following}: {e}")
+
+    @staticmethod
+    def _check_file(file_path: str) -> Optional[str]:
+        """检查音乐文件,有问题时返回错误描述"""
+        if not os.path.exists(file_path):
+            return f"错误: 文件不存在 - {file_path}"
+        ext = Path(file_path).suffix.lower()
+        if ext not in config.MUSIC_EXTENSIONS:
+            return f"错误: 不支持的音乐格式 - {ext}"
+        return None
+
     def play(self, file_path: str) -> str:
         """
         播放音乐
@@ -34,26 +225,17 @@ class MusicController:
             执行结果描述
         """
         try:
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                return f"错误: 文件不存在 - {file_path}"
-
-            # 检查文件扩展名
-            ext = Path(file_path).suffix.lower()
-            if ext not in config.MUSIC_EXTENSIONS:
-                return f"错误: 不支持的音乐格式 - {ext}"
-
-            # 停止当前播放
-            if self.is_playing:
-                pygame.mixer.music.stop()
-
-            # 加载并播放音乐
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-
-            self.current_music = file_path
-            self.is_playing = True
-            self.is_paused = False
+            # 检查文件是否存在和扩展名
+            error = self._check_file(file_path)
+            if error:
+                return error
+
+            # 单独播放一首时替换播放列表
+            self._start_monitor()
+            with self._play_lock:
+                self.playlist = self._original = [file_path]
+                self.shuffle = False
+                self._start(0)
 
             return f"正在播放: {Path(file_path).name}"
 
@@ -69,14 +251,16 @@ class MusicController:
             执行结果描述
         """
         try:
-            if not self.is_playing:
-                return "当前没有正在播放的音乐"
+            # 暂停后 get_busy() 为 False,持锁避免监视线程在状态更新前误判为播放结束
+            with self._play_lock:
+                if not self.is_playing:
+                    return "当前没有正在播放的音乐"
 
-            if self.is_paused:
-                return "音乐已经处于暂停状态"
+                if self.is_paused:
+                    return "音乐已经处于暂停状态"
 
-            pygame.mixer.music.pause()
-            self.is_paused = True
+                pygame.mixer.music.pause()
+                self.is_paused = True
 
             return "音乐已暂停"
 
@@ -92,14 +276,15 @@ class MusicController:
             执行结果描述
         """
         try:
-            if not self.is_playing:
-                return "当前没有音乐可以继续播放"
+            with self._play_lock:
+                if not self.is_playing:
+                    return "当前没有音乐可以继续播放"
 
-            if not self.is_paused:
-                return "音乐正在播放中"
+                if not self.is_paused:
+                    return "音乐正在播放中"
 
-            pygame.mixer.music.unpause()
-            self.is_paused = False
+                pygame.mixer.music.unpause()
+                self.is_paused = False
 
             return "继续播放音乐"
 
@@ -115,13 +300,15 @@ class MusicController:
             执行结果描述
         """
         try:
-            if not self.is_playing:
-                return "当前没有正在播放的音乐"
+            with self._play_lock:
+                if not self.is_playing:
+                    return "当前没有正在播放的音乐"
 
-            pygame.mixer.music.stop()
-            self.is_playing = False
-            self.is_paused = False
-            self.current_music = None
+                pygame.mixer.music.stop()
+                self.is_playing = False
+                self.is_paused = False
+                self.current_music = None
+                self._queued = None
 
             return "音乐已停止"
 
@@ -129,6 +316,187 @@ class MusicController:
             logger.error(f"停止音乐时出错: {str(e)}")
             return f"停止音乐时出错: {str(e)}"
 
+    def play_queue(
+        self,
+        file_paths: Optional[Sequence[str]] = None,
+        keyword: Optional[str] = None,
+        shuffle: bool = False,
+        start: int = 0,
+    ) -> str:
+        """
+        用一组音乐替换播放列表并开始播放
+
+        Args:
+            file_paths: 音乐文件路径
+            keyword: 关键词,把音乐库中匹配的音乐(最多 MUSIC_QUEUE_MAX_TRACKS 首)作为播放列表
+            shuffle: 是否随机顺序播放(从随机的一首开始)
+            start: 从第几首开始播放(从0开始,不随机播放时有效)
+
+        Returns:
+            执行结果描述
+        """
+        try:
+            paths, skipped = self._collect(file_paths, keyword)
+            if not paths:
+                return skipped[0] if skipped else "错误: 播放列表为空"
+
+            self._start_monitor()
+            with self._play_lock:
+                self._original = list(paths)
+                self.playlist = list(paths)
+                self.shuffle = shuffle
+                if shuffle:
+                    random.shuffle(self.playlist)
+                    start = 0
+                self._start(min(max(start, 0), len(paths) - 1))
+
+            result = f"正在播放: {Path(self.current_music).name} (播放列表共 {len(paths)} 首"
+            result += ",随机播放)" if shuffle else ")"
+            if skipped:
+                result += f"\n已跳过 {len(skipped)} 个文件: " + "; ".join(skipped)
+            return result
+
+        except Exception as e:
+            logger.error(f"播放列表出错: {str(e)}")
+            return f"播放列表出错: {str(e)}"
+
+    def enqueue(
+        self, file_paths: Optional[Sequence[str]] = None, keyword: Optional[str] = None
+    ) -> str:
+        """
+        把音乐添加到播放列表末尾,没有在播放时从添加的第一首开始
+
+        Args:
+            file_paths: 音乐文件路径
+            keyword: 关键词,添加音乐库中匹配的音乐
+
+        Returns:
+            执行结果描述
+        """
+        paths, skipped = self._collect(file_paths, keyword)
+        if not paths:
+            return skipped[0] if skipped else "错误: 没有要添加的音乐"
+
+        with self._play_lock:
+            if not self.is_playing:
+                return self.play_queue(paths)
+            self._original.extend(paths)
+            self.playlist.extend(paths)
+            if self._queued is None:
+                self._queue_following()
+        return f"已添加 {len(paths)} 首到播放列表,共 {len(self.playlist)} 首"
+
+    def next_track(self) -> str:
+        """
+        播放下一首
+
+        Returns:
+            执行结果描述
+        """
+        with self._play_lock:
+            if not self.playlist:
+                return "播放列表为空"
+            if self.position + 1 >= len(self.playlist):
+                return "已经是最后一首"
+            self._start(self.position + 1)
+            return f"下一首: {Path(self.current_music).name}"
+
+    def previous_track(self) -> str:
+        """
+        播放上一首
+
+        Returns:
+            执行结果描述
+        """
+        with self._play_lock:
+            if not self.playlist:
+                return "播放列表为空"
+            if self.position <= 0:
+                return "已经是第一首"
+            self._start(self.position - 1)
+            return f"上一首: {Path(self.current_music).name}"
+
+    def set_shuffle(self, enabled: bool) -> str:
+        """
+        开关随机播放: 正在播放的一首不变,之后的顺序打乱或恢复原顺序
+
+        Args:
+            enabled: 是否随机播放
+
+        Returns:
+            执行结果描述
+        """
+        with self._play_lock:
+            self.shuffle = enabled
+            if not self.playlist:
+                return "已开启随机播放" if enabled else "已关闭随机播放"
+
+            current = self.playlist[self.position] if self.position >= 0 else None
+            if enabled:
+                rest = [p for i, p in enumerate(self.playlist) if i != self.position]
+                random.shuffle(rest)
+                self.playlist = ([current] if current else []) + rest
+                self.position = 0 if current else -1
+            else:
+                self.playlist = list(self._original)
+                if current in self.playlist:
+                    self.position = self.playlist.index(current)
+
+            if self.is_playing:
+                # 预载的下一首可能已经变了
+                self._queue_following()
+            return "已开启随机播放" if enabled else "已关闭随机播放"
+
+    def get_queue(self) -> str:
+        """
+        获取播放列表
+
+        Returns:
+            播放列表描述(最多列出 MUSIC_QUEUE_LIST_LIMIT 首)
+        """
+        with self._play_lock:
+            if not self.playlist:
+                return "播放列表为空"
+            limit = config.MUSIC_QUEUE_LIST_LIMIT
+            start = max(0, min(self.position, len(self.playlist) - limit))
+            result = f"播放列表共 {len(self.playlist)} 首" + (",随机播放" if self.shuffle else "")
+            result += ":\n"
+            for i in range(start, min(start + limit, len(self.playlist))):
+                marker = "▶ " if i == self.position and self.is_playing else ""
+                result += f"{i + 1}. {marker}{Path(self.playlist[i]).name}\n"
+            return result
+
+    def _collect(
+        self, file_paths: Optional[Sequence[str]], keyword: Optional[str]
+    ) -> Tuple[List[str], List[str]]:
+        """
+        整理要播放的文件
+
+        Returns:
+            (可以播放的文件, 跳过的文件及原因)
+        """
+        paths: List[str] = list(file_paths or [])
+        if keyword:
+            if config.MUSIC_LIBRARY_ENABLED:
+                paths.extend(
+                    self._get_library().search(keyword, limit=config.MUSIC_QUEUE_MAX_TRACKS)
+                )
+            else:
+                music_dir = Path(config.DEFAULT_MUSIC_DIR)
+                matches = self._glob_music(music_dir, keyword)
+                paths.extend(str(p) for p in matches[: config.MUSIC_QUEUE_MAX_TRACKS])
+            if not paths:
+                return [], [f"未找到包含 '{keyword}' 的音乐文件"]
+
+        valid, skipped = [], []
+        for path in paths:
+            error = self._check_file(path)
+            if error:
+                skipped.append(error)
+            else:
+                valid.append(path)
+        return valid, skipped
+
     def search_music(self, keyword: str) -> str:
         """
         搜索音乐文件
@@ -146,20 +514,25 @@ class MusicController:
                 return f"音乐目录不存在: {music_dir}"
 
             # 搜索匹配的音乐文件
-            matches = []
-            for ext in config.MUSIC_EXTENSIONS:
-                matches.extend(music_dir.glob(f"**/*{keyword}*{ext}"))
+            matches, total, fuzzy = self._find(keyword, limit=5)
+            self.last_results = [str(match) for match in matches[:5]]
 
             if not matches:
                 return f"未找到包含 '{keyword}' 的音乐文件"
 
+            if fuzzy:
+                result = f"未找到包含 '{keyword}' 的音乐文件,以下是 {total} 个相近的结果:\n"
+                for i, match in enumerate(matches, 1):
+                    result += f"{i}. {match.name}{self._describe_tags(match)} ({match})\n"
+                return result
+
             # 返回找到的文件列表
-            result = f"找到 {len(matches)} 个匹配的音乐文件:\n"
+            result = f"找到 {total} 个匹配的音乐文件:\n"
             for i, match in enumerate(matches[:5], 1):  # 最多返回5个
-                result += f"{i}. {match.name} ({match})\n"
+                result += f"{i}. {match.name}{self._describe_tags(match)} ({match})\n"
 
-            if len(matches) > 5:
-                result += f"... 还有 {len(matches) - 5} 个文件"
+            if total > 5:
+                result += f"... 还有 {total - 5} 个文件"
 
             return result
 
@@ -167,6 +540,152 @@ class MusicController:
             logger.error(f"搜索音乐时出错: {str(e)}")
             return f"搜索音乐时出错: {str(e)}"
 
+    def find_music(self, keyword: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        搜索音乐并返回结构化结果;结果列表会被记住,之后可以按序号播放
+
+        Args:
+            keyword: 搜索关键词
+            limit: 最多返回的条数,默认取配置
+
+        Returns:
+            {"keyword", "total"(匹配总数), "fuzzy"(是否为相近结果),
+             "results": [{"index", "name", 以及音乐库中记录的 artist/album/title/duration}]}
+        """
+        limit = limit or config.MUSIC_SEARCH_RESULT_LIMIT
+        music_dir = Path(config.DEFAULT_MUSIC_DIR)
+        if not music_dir.exists():
+            return {"keyword": keyword, "error": f"音乐目录不存在: {music_dir}"}
+
+        matches, total, fuzzy = self._find(keyword, limit)
+        matches = matches[:limit]
+        self.last_results = [str(match) for match in matches]
+
+        results = []
+        for index, match in enumerate(matches, 1):
+            item: Dict[str, Any] = {"index": index, "name": match.name}
+            if self.library is not None:
+                metadata = self.library.metadata(str(match)) or {}
+                item.update({key: value for key, value in metadata.items() if value is not None})
+                if "duration" in item:
+                    item["duration"] = round(item["duration"])
+            results.append(item)
+        return {"keyword": keyword, "total": total, "fuzzy": fuzzy, "results": results}
+
+    def find_and_play(self, keyword: str, index: int = 1, play_all: bool = False) -> str:
+        """
+        搜索并直接播放,不必先把搜索结果交给大模型再选择
+
+        Args:
+            keyword: 搜索关键词
+            index: 播放第几个结果(从1开始,按相关程度排序)
+            play_all: 是否把全部结果作为播放列表,从第 index 个开始播放
+
+        Returns:
+            执行结果描述
+        """
+        try:
+            limit = config.MUSIC_QUEUE_MAX_TRACKS if play_all else max(index, 1)
+            found = self.find_music(keyword, limit=limit)
+            if "error" in found:
+                return found["error"]
+            if not found["results"]:
+                return f"未找到包含 '{keyword}' 的音乐文件"
+            if not 1 <= index <= len(self.last_results):
+                return f"错误: 只找到 {len(self.last_results)} 个结果,没有第 {index} 个"
+
+            if play_all:
+                result = self.play_queue(self.last_results, start=index - 1)
+            else:
+                result = self.play(self.last_results[index - 1])
+            if not result.startswith("正在播放"):
+                return result
+
+            track = self.current_music or self.last_results[index - 1]
+            result = f"正在播放: {Path(track).name}{self._describe_tags(Path(track))}"
+            if play_all:
+                result += f" (播放列表共 {len(self.playlist)} 首)"
+            elif found["total"] > 1:
+                result += f" (共找到 {found['total']} 首)"
+            if found["fuzzy"]:
+                result += f" (没有完全匹配 '{keyword}' 的音乐,播放的是最相近的结果)"
+            return result
+
+        except Exception as e:
+            logger.error(f"搜索并播放音乐时出错: {str(e)}")
+            return f"搜索并播放音乐时出错: {str(e)}"
+
+    def play_result(self, index: int) -> str:
+        """
+        播放最近一次搜索结果中的第 index 个
+
+        Args:
+            index: 结果序号(从1开始)
+
+        Returns:
+            执行结果描述
+        """
+        if not self.last_results:
+            return "错误: 没有可以按序号播放的搜索结果,请先搜索"
+        if not 1 <= index <= len(self.last_results):
+            return f"错误: 搜索结果只有 {len(self.last_results)} 个,没有第 {index} 个"
+        return self.play(self.last_results[index - 1])
+
+    def _find(self, keyword: str, limit: int) -> Tuple[List[Path], int, bool]:
+        """
+        搜索匹配的音乐文件(音乐库按文件名和标签匹配,没有结果时用模糊搜索)
+
+        Returns:
+            (匹配的文件, 匹配总数, 是否为相近结果);未启用音乐库时返回全部匹配的文件
+        """
+        if not config.MUSIC_LIBRARY_ENABLED:
+            matches = self._glob_music(Path(config.DEFAULT_MUSIC_DIR), keyword)
+            return matches, len(matches), False
+
+        library = self._get_library()
+        total = library.count(keyword)
+        matches = [Path(p) for p in library.search(keyword, limit=limit)]
+        if not matches and config.MUSIC_FUZZY_SEARCH:
+            # 没有完全包含关键词的文件时,按同音字、拼音和首字母找相近的
+            matches = [Path(p) for p in library.fuzzy_search(keyword, limit=limit)]
+            return matches, len(matches), True
+        return matches, total, False
+
+    def has_music(self, keyword: str) -> bool:
+        """
+        音乐库中是否有匹配关键词的音乐(本地意图匹配据此决定是否直接搜索并播放)
+
+        Args:
+            keyword: 关键词
+
+        Returns:
+            是否有匹配;音乐库首次扫描尚未完成时返回False(交给大模型,不阻塞本地意图匹配)
+        """
+        try:
+            if not config.MUSIC_LIBRARY_ENABLED:
+                return bool(self._glob_music(Path(config.DEFAULT_MUSIC_DIR), keyword))
+            library = self._get_library(wait=False)
+            return library is not None and library.count(keyword) > 0
+        except Exception as e:
+            logger.error(f"查找音乐时出错: {str(e)}")
+            return False
+
+    def _describe_tags(self, path: Path) -> str:
+        """音乐库中记录的歌手、标题和专辑,没有标签时返回空字符串"""
+        if self.library is None:
+            return ""
+        metadata = self.library.metadata(str(path)) or {}
+        parts = [metadata[field] for field in ("artist", "title", "album") if metadata.get(field)]
+        return f" [{' - '.join(parts)}]" if parts else ""
+
+    @staticmethod
+    def _glob_music(music_dir: Path, keyword: str) -> List[Path]:
+        """遍历目录树查找文件名包含关键词的音乐文件(未启用音乐库索引时使用),按相关程度排序"""
+        matches = []
+        for ext in config.MUSIC_EXTENSIONS:
+            matches.extend(music_dir.glob(f"**/*{keyword}*{ext}"))
+        return sorted(matches, key=lambda path: (relevance(path.stem, keyword), str(path)))
+
     def get_status(self) -> str:
         """
         获取播放状态
@@ -180,5 +699,7 @@ class MusicController:
         status = f"当前播放: {Path(self.current_music).name if self.current_music else '未知'}"
         if self.is_paused:
             status += " (已暂停)"
+        if len(self.playlist) > 1:
+            status += f" (播放列表第 {self.position + 1}/{len(self.playlist)} 首)"
 
         return status
@@ -8,10 +8,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from openai import OpenAI
-
 import config
 from src.logger import logger
+from src.openai_client import get_openai_client
 
 
 class WritingController:
@@ -19,7 +18,7 @@ class WritingController:
 
     def __init__(self):
         """初始化写作控制器"""
-        self.client = OpenAI()
+        self.client = get_openai_client()
         self.model = config.OPENAI_MODEL
 
     def write_article(
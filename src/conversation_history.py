@@ -0,0 +1,194 @@
+"""
+对话历史管理模块
+按 token 预算裁剪对话历史,并把较早的对话折叠为滚动摘要
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import config
+
+# 中日韩文字大致每个字符对应一个 token
+CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+# 每条消息的固定开销(角色、分隔符等)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# 摘要中每条记录保留的最大字符数
+SUMMARY_SNIPPET_CHARS = 60
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """获取 tiktoken 编码器,未安装或加载失败时返回None"""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    估算文本的 token 数
+
+    安装了 tiktoken 时精确计数,否则按中文字符 1 个 token、其他字符 4 个一 token 估算
+
+    Args:
+        text: 文本
+
+    Returns:
+        token 数
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def count_message_tokens(message: Dict[str, Any]) -> int:
+    """
+    估算单条消息的 token 数
+
+    Args:
+        message: 对话消息
+
+    Returns:
+        token 数
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call["function"]
+        tokens += count_tokens(function["name"]) + count_tokens(function["arguments"])
+    return tokens
+
+
+class ConversationHistory:
+    """按 token 预算管理的对话历史"""
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        summary_max_tokens: Optional[int] = None,
+    ):
+        """
+        初始化对话历史
+
+        Args:
+            system_prompt: 系统提示词
+            max_tokens: 历史消息的 token 上限,默认取配置
+            max_turns: 完整保留的最大对话轮数,默认取配置
+            summary_max_tokens: 滚动摘要的 token 上限,默认取配置
+        """
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.max_tokens = config.MAX_PROMPT_TOKENS if max_tokens is None else max_tokens
+        self.max_turns = config.MAX_CONVERSATION_HISTORY if max_turns is None else max_turns
+        self.summary_max_tokens = (
+            config.HISTORY_SUMMARY_MAX_TOKENS if summary_max_tokens is None else summary_max_tokens
+        )
+
+        # 每一轮以用户消息开头,包含其后的助手回复、工具调用及工具结果,裁剪时整轮丢弃
+        self.turns: List[List[Dict[str, Any]]] = []
+        self.summary_lines: List[str] = []
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """发送给大模型的完整消息列表"""
+        messages = [self.system_message]
+        summary = self.summary_message
+        if summary:
+            messages.append(summary)
+        for turn in self.turns:
+            messages.extend(turn)
+        return messages
+
+    @property
+    def summary_message(self) -> Optional[Dict[str, Any]]:
+        """较早对话的滚动摘要消息"""
+        if not self.summary_lines:
+            return None
+        return {"role": "system", "content": "较早对话摘要:\n" + "\n".join(self.summary_lines)}
+
+    def append(self, message: Dict[str, Any]):
+        """
+        追加一条消息
+
+        Args:
+            message: 对话消息
+        """
+        if message["role"] == "user" or not self.turns:
+            self.turns.append([message])
+        else:
+            self.turns[-1].append(message)
+
+    def reset(self):
+        """清空对话历史和摘要"""
+        self.turns = []
+        self.summary_lines = []
+
+    def count_tokens(self) -> int:
+        """当前消息列表的 token 总数"""
+        return sum(count_message_tokens(message) for message in self.messages)
+
+    def enforce_budget(self):
+        """
+        把历史控制在预算内
+
+        从最早的一轮开始整轮移出(工具调用和它的结果总是一起移出),并折叠进摘要;
+        最新一轮始终完整保留
+        """
+        base_tokens = count_message_tokens(self.system_message)
+        turn_tokens = [sum(count_message_tokens(m) for m in turn) for turn in self.turns]
+
+        while len(self.turns) > 1:
+            summary = self.summary_message
+            summary_tokens = count_message_tokens(summary) if summary else 0
+            total = base_tokens + summary_tokens + sum(turn_tokens)
+            if len(self.turns) <= self.max_turns and total <= self.max_tokens:
+                break
+
+            self._fold(self.turns.pop(0))
+            turn_tokens.pop(0)
+
+    def _fold(self, turn: List[Dict[str, Any]]):
+        """把一轮对话折叠为摘要行"""
+        for message in turn:
+            role = message["role"]
+            content = _snippet(message.get("content"))
+
+            if role == "user":
+                self.summary_lines.append(f"用户: {content}")
+            elif role == "tool":
+                self.summary_lines.append(f"工具 {message.get('name', '')} 结果: {content}")
+            elif message.get("tool_calls"):
+                for tool_call in message["tool_calls"]:
+                    function = tool_call["function"]
+                    arguments = _snippet(function["arguments"])
+                    self.summary_lines.append(f"助手调用 {function['name']}({arguments})")
+            elif content:
+                self.summary_lines.append(f"助手: {content}")
+
+        # 摘要本身也有上限,超出时丢弃最早的记录
+        while self.summary_lines and (
+            count_tokens("\n".join(self.summary_lines)) > self.summary_max_tokens
+        ):
+            self.summary_lines.pop(0)
+
+
+def _snippet(text: Optional[str]) -> str:
+    """截取摘要片段"""
+    if not text:
+        return ""
+    text = " ".join(text.split())
+    if len(text) > SUMMARY_SNIPPET_CHARS:
+        text = text[:SUMMARY_SNIPPET_CHARS] + "..."
+    return text
@@ -0,0 +1,332 @@
+"""
+文件窗口读取模块
+只读取并解码需要的字节(开头、结尾或指定的字节范围),大文件通过 mmap 访问;
+按文件开头的少量字节识别编码,支持逐行过滤(grep),内存占用与文件大小无关
+"""
+
+import codecs
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import IO, Any, Iterator, List, Optional, Pattern, Tuple
+
+import config
+
+# 字节顺序标记及对应的编码(解码窗口时跳过标记本身)
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+# 没有字节顺序标记时依次尝试的编码,都不符合时按 latin-1 解码(不会失败)
+CANDIDATE_ENCODINGS = ("utf-8", "gb18030")
+
+# 逐行过滤时每次读取的字节数
+GREP_CHUNK_SIZE = 64 * 1024
+# 可以直接在字节中查找普通文本的编码
+BYTE_SEARCH_ENCODINGS = ("utf-8", "latin-1")
+# 正则表达式的特殊字符,过滤条件不含这些字符时按普通文本查找
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+CR = "\r"
+
+
+@dataclass
+class FileWindow:
+    """读取到的一段文件内容"""
+
+    text: str  # 解码后的文本(过滤时为匹配的行)
+    start: int  # 实际读取的起始字节
+    end: int  # 实际读取的结束字节(不含),继续读取时作为下一次的 offset
+    size: int  # 文件总字节数
+    encoding: str
+    matches: int = 0  # 过滤时匹配的行数
+    truncated: bool = False  # 过滤时匹配的行数达到上限,提前结束
+
+
+def detect_encoding(prefix: bytes) -> Tuple[str, int]:
+    """
+    根据文件开头的字节识别编码
+
+    Args:
+        prefix: 文件开头的字节
+
+    Returns:
+        (编码, 字节顺序标记的长度)
+
+    Raises:
+        ValueError: 看起来是二进制文件
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding, len(bom)
+
+    if b"\x00" in prefix:
+        raise ValueError("看起来是二进制文件,无法按文本读取")
+
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            # 开头的字节可能在多字节字符中间截断,不算错误
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            return encoding, 0
+        except UnicodeDecodeError:
+            continue
+    return "latin-1", 0
+
+
+def _align_start(data: bytes, start: int, encoding: str, bom: int) -> int:
+    """
+    从文件中间开始读取时,跳过被截断的字符,返回需要跳过的字节数
+
+    Args:
+        data: 从 start 开始读到的字节
+        start: 起始字节
+        encoding: 文件编码
+        bom: 字节顺序标记的长度
+    """
+    if start < bom:
+        return bom - start
+    if start == 0:
+        return 0
+    if encoding == "utf-8":
+        # 跳过 UTF-8 的后续字节(10xxxxxx),最多3个
+        skip = 0
+        while skip < min(3, len(data)) and data[skip] & 0xC0 == 0x80:
+            skip += 1
+        return skip
+    if encoding.startswith("utf-16"):
+        return (start - bom) % 2
+    if encoding == "gb18030":
+        # 双字节编码无法从任意位置判断字符边界,从下一行开始(换行符不会出现在多字节字符中)
+        newline = data.find(b"\n")
+        return newline + 1 if newline >= 0 else 0
+    return 0
+
+
+@contextmanager
+def _open(path: str, size: int) -> Iterator[Tuple[IO[bytes], Any]]:
+    """打开文件,超过阈值的大文件同时建立只读 mmap(按需分页,不占用进程内存)"""
+    with open(path, "rb") as f:
+        if size and size >= config.FILE_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield f, view
+        else:
+            yield f, None
+
+
+def _read(f: IO[bytes], view: Any, start: int, end: int) -> bytes:
+    """读取 [start, end) 之间的字节"""
+    if view is not None:
+        return view[start:end]
+    f.seek(start)
+    return f.read(end - start)
+
+
+def _compile(pattern: str) -> Pattern[str]:
+    """编译过滤条件(不区分大小写,^ 和 $ 匹配每行的首尾),不是合法的正则表达式时按普通文本匹配"""
+    try:
+        return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    except re.error:
+        return re.compile(re.escape(pattern), re.IGNORECASE)
+
+
+def _literal_needle(pattern: str, encoding: str) -> Optional[bytes]:
+    """
+    过滤条件是普通文本时,返回可以直接在字节中查找的小写形式;否则返回None
+
+    UTF-8 和 latin-1 中 ASCII 字节不会出现在多字节字符内部,对字节转小写后查找,
+    不必解码整个文件,也比不区分大小写的正则表达式快得多
+    """
+    if encoding not in BYTE_SEARCH_ENCODINGS:
+        return None
+    try:
+        re.compile(pattern)
+        if any(c in REGEX_CHARS for c in pattern):
+            return None
+    except re.error:
+        pass  # 不是合法的正则表达式,按普通文本匹配
+    # bytes.lower() 只转换 ASCII 字母,含其他有大小写之分的字母时交给正则表达式
+    if any(not c.isascii() and c.lower() != c.upper() for c in pattern):
+        return None
+    try:
+        return pattern.lower().encode(encoding)
+    except UnicodeEncodeError:
+        return None
+
+
+def _count_lines(f: IO[bytes], view: Any, end: int, encoding: str, bom: int) -> int:
+    """
+    逐块统计 [0, end) 中的换行符数,过滤从文件中间开始时据此给出从文件开头算起的行号
+
+    UTF-16 以外的候选编码中换行符不会出现在多字节字符内部,直接在字节中计数
+    """
+    decoder = (
+        codecs.getincrementaldecoder(encoding)(errors="replace")
+        if encoding.startswith("utf-16")
+        else None
+    )
+    count = 0
+    position = bom if decoder is not None else 0
+    while position < end:
+        chunk = _read(f, view, position, min(end, position + GREP_CHUNK_SIZE))
+        position += len(chunk)
+        count += chunk.count(b"\n") if decoder is None else decoder.decode(chunk).count("\n")
+    return count
+
+
+def read_window(
+    path: str,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    grep: Optional[str] = None,
+) -> FileWindow:
+    """
+    读取文件的一段内容
+
+    Args:
+        path: 文件路径
+        offset: 起始字节,负数表示从文件末尾倒数(如 -2000 为最后约2000字节),默认从头开始
+        length: 读取的字节数,默认取配置,不超过 FILE_READ_MAX_BYTES;
+                过滤时为搜索的范围,默认搜索到文件末尾
+        grep: 只返回匹配的行(正则表达式,不区分大小写)
+
+    Returns:
+        读取到的内容
+
+    Raises:
+        ValueError: 二进制文件
+    """
+    size = os.path.getsize(path)
+    with _open(path, size) as (f, view):
+        encoding, bom = detect_encoding(_read(f, view, 0, config.FILE_ENCODING_PROBE_BYTES))
+
+        if offset is None:
+            start = 0
+        elif offset < 0:
+            start = max(0, size + offset)
+        else:
+            start = min(offset, size)
+
+        if grep:
+            end = size if length is None else min(size, start + max(0, length))
+            return _grep(f, view, start, end, size, encoding, bom, grep)
+
+        if length is None:
+            length = config.FILE_READ_DEFAULT_BYTES if offset is None or offset >= 0 else -offset
+        end = min(size, start + min(max(0, length), config.FILE_READ_MAX_BYTES))
+
+        data = _read(f, view, start, end)
+        skip = _align_start(data, start, encoding, bom)
+        if offset is not None and offset < 0 and start > 0:
+            # 从末尾倒数时去掉不完整的第一行(与 tail 一致)
+            newline = data.find(b"\n", skip)
+            if 0 <= newline < len(data) - 1:
+                skip = newline + 1
+
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        text = decoder.decode(data[skip:], final=end >= size)
+        # 末尾被截断的字符留给下一次读取
+        end -= len(decoder.getstate()[0])
+        return FileWindow(text=text, start=start + skip, end=end, size=size, encoding=encoding)
+
+
+def _grep(
+    f: IO[bytes],
+    view: Any,
+    start: int,
+    end: int,
+    size: int,
+    encoding: str,
+    bom: int,
+    grep: str,
+) -> FileWindow:
+    """逐块读取 [start, end) 并逐行过滤,只保留匹配的行"""
+    max_matches = config.FILE_GREP_MAX_MATCHES
+    max_chars = config.FILE_GREP_MAX_LINE_CHARS
+
+    # 普通文本直接在字节中查找,只解码匹配的行;正则表达式在解码后的文本中查找
+    needle = _literal_needle(grep, encoding)
+    pattern = _compile(grep) if needle is None else None
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    newline: Any = b"\n" if needle is not None else "\n"
+
+    def find(body: Any) -> Iterator[int]:
+        """块中每个匹配的起始位置"""
+        if needle is None:
+            yield from (match.start() for match in pattern.finditer(body))
+            return
+        lowered = body.lower()
+        index = lowered.find(needle)
+        while index >= 0:
+            yield index
+            index = lowered.find(needle, index + 1)
+
+    def to_text(data: Any) -> str:
+        return data.decode(encoding, errors="replace") if needle is not None else data
+
+    def to_bytes(data: Any) -> int:
+        """尚未检查的内容对应的字节数"""
+        if needle is not None:
+            return len(data)
+        return len(data.encode(encoding, errors="replace")) + len(decoder.getstate()[0])
+
+    probe = _read(f, view, start, min(end, start + config.FILE_ENCODING_PROBE_BYTES))
+    first = start + _align_start(probe, start, encoding, bom)
+    matches: List[str] = []
+    line_no = _count_lines(f, view, first, encoding, bom) if first > bom else 0
+    pending = newline[:0]
+    position = first
+
+    while position < end or pending:
+        if position < end:
+            chunk = _read(f, view, position, min(end, position + GREP_CHUNK_SIZE))
+            position += len(chunk)
+            if needle is None:
+                chunk = decoder.decode(chunk, final=position >= size)
+            text = pending + chunk
+            cut = text.rfind(newline) + 1
+            if cut == 0 and len(text) <= GREP_CHUNK_SIZE and position < end:
+                pending = text
+                continue
+            # 超长的一行(如压缩过的日志)分段检查,内存不随行长增长
+            body, pending = (text[:cut], text[cut:]) if cut else (text, text[:0])
+        else:
+            # 最后一行没有换行符
+            body, pending = pending, pending[:0]
+
+        # 整块查找,只取出匹配的行,不必逐行切分
+        checked = 0
+        for index in find(body):
+            if index < checked:
+                continue
+            line_start = body.rfind(newline, 0, index) + 1
+            line_end = body.find(newline, index)
+            line_end = len(body) if line_end < 0 else line_end
+            number = line_no + body.count(newline, 0, line_start) + 1
+            line = to_text(body[line_start:line_end]).rstrip(CR)
+            matches.append(f"{number}: {line[:max_chars]}")
+            checked = line_end + 1
+
+            if len(matches) >= max_matches:
+                # 尚未检查的内容留给下一次搜索
+                return FileWindow(
+                    text="\n".join(matches),
+                    start=first,
+                    end=position - to_bytes(body[checked:] + pending),
+                    size=size,
+                    encoding=encoding,
+                    matches=len(matches),
+                    truncated=True,
+                )
+        line_no += body.count(newline)
+
+    return FileWindow(
+        text="\n".join(matches),
+        start=first,
+        end=max(first, end),
+        size=size,
+        encoding=encoding,
+        matches=len(matches),
+    )
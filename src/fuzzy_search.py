@@ -0,0 +1,205 @@
+"""
+模糊搜索模块
+按汉字、全拼和拼音首字母建立 n-gram 倒排索引,候选结果按编辑距离排序;
+语音识别出的同音错字、拼音或首字母输入也能找到对应的曲目
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时只按汉字和字母匹配
+    lazy_pinyin = None
+
+# 单个汉字,或连续的字母数字(一个英文单词)
+TOKEN_PATTERN = re.compile(r"[\u3400-\u9fff]|[a-z0-9]+")
+CJK_PATTERN = re.compile(r"[\u3400-\u9fff]")
+
+# 各种形式的 n-gram 长度: 汉字信息量大用 2-gram,全拼用 3-gram
+GRAM_SIZES = {"chars": 2, "pinyin": 3, "initials": 2}
+
+# 每次查询最多计算编辑距离的候选数
+MAX_CANDIDATES = 40
+
+
+@lru_cache(maxsize=None)
+def char_pinyin(char: str) -> str:
+    """
+    单个汉字的拼音(按字缓存,比逐句转换快得多;多音字取最常用的读音)
+
+    Args:
+        char: 汉字
+
+    Returns:
+        不带声调的拼音,未安装 pypinyin 时返回汉字本身
+    """
+    if lazy_pinyin is None:
+        return char
+    return lazy_pinyin(char)[0]
+
+
+def text_forms(text: str) -> Dict[str, str]:
+    """
+    计算文本的三种匹配形式(去掉空白和标点,转小写)
+
+    Args:
+        text: 文本
+
+    Returns:
+        {"chars": 原文, "pinyin": 全拼, "initials": 首字母}
+    """
+    tokens = TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower())
+    syllables = [char_pinyin(t) if CJK_PATTERN.match(t) else t for t in tokens]
+    return {
+        "chars": "".join(tokens),
+        "pinyin": "".join(syllables),
+        "initials": "".join(s[0] for s in syllables),
+    }
+
+
+def ngrams(text: str, n: int) -> List[str]:
+    """
+    提取 n-gram,不足 n 个字符时返回整个文本
+
+    Args:
+        text: 文本
+        n: n-gram 长度
+
+    Returns:
+        n-gram 列表
+    """
+    if len(text) <= n:
+        return [text] if text else []
+    return [text[i : i + n] for i in range(len(text) - n + 1)]
+
+
+def substring_distance(pattern: str, text: str) -> int:
+    """
+    pattern 与 text 中最相近的子串之间的编辑距离(起止位置不计代价)
+
+    Args:
+        pattern: 查询
+        text: 被搜索的文本
+
+    Returns:
+        编辑距离
+    """
+    previous = [0] * (len(text) + 1)
+    for i, p in enumerate(pattern, 1):
+        current = [i]
+        left = i
+        for j, t in enumerate(text, 1):
+            # 逐项比较比调用 min() 快,这里是查询的热点
+            cost = previous[j - 1] + (p != t)
+            above = previous[j] + 1
+            if above < cost:
+                cost = above
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+        previous = current
+    return min(previous)
+
+
+class FuzzyIndex:
+    """汉字、全拼、首字母 n-gram 倒排索引"""
+
+    def __init__(self, items: Iterable[Tuple[int, str]]):
+        """
+        建立索引
+
+        Args:
+            items: (编号, 名称) 序列
+        """
+        ids = []
+        self.forms: Dict[str, List[str]] = {kind: [] for kind in GRAM_SIZES}
+        postings: Dict[str, List[int]] = defaultdict(list)
+
+        for doc, (key, name) in enumerate(items):
+            ids.append(key)
+            for kind, form in text_forms(name).items():
+                self.forms[kind].append(form)
+                for gram in set(ngrams(form, GRAM_SIZES[kind])):
+                    postings[f"{kind[0]}:{gram}"].append(doc)
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.postings = {gram: np.array(docs, dtype=np.int32) for gram, docs in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def memory_bytes(self) -> int:
+        """倒排表和编号数组占用的内存(字节,不含名称字符串)"""
+        return self.ids.nbytes + sum(docs.nbytes for docs in self.postings.values())
+
+    def search(
+        self, query: str, limit: int = 5, max_distance: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        模糊搜索
+
+        Args:
+            query: 查询文本(汉字、拼音或首字母)
+            limit: 最多返回的条数
+            max_distance: 最大相对编辑距离(编辑距离 / 查询长度),默认取配置
+
+        Returns:
+            (编号, 相对编辑距离) 列表,按相近程度排序
+        """
+        max_distance = config.MUSIC_FUZZY_MAX_DISTANCE if max_distance is None else max_distance
+        query_forms = text_forms(query)
+        if not query_forms["chars"] or not len(self):
+            return []
+
+        # 含汉字的查询按汉字和全拼匹配;不含汉字时按全拼和首字母匹配(输入的就是拼音或首字母)
+        if CJK_PATTERN.search(query_forms["chars"]):
+            kinds = {"chars": query_forms["chars"], "pinyin": query_forms["pinyin"]}
+        else:
+            kinds = {"pinyin": query_forms["chars"], "initials": query_forms["chars"]}
+
+        # 每种形式命中的 n-gram 比例,按最高的一种挑选候选
+        coverage = {}
+        for kind, form in kinds.items():
+            grams = set(ngrams(form, GRAM_SIZES[kind]))
+            docs = [self.postings.get(f"{kind[0]}:{gram}") for gram in grams]
+            docs = [d for d in docs if d is not None]
+            if docs:
+                hits = np.bincount(np.concatenate(docs), minlength=len(self))
+                coverage[kind] = hits / len(grams)
+        if not coverage:
+            return []
+        stacked = np.stack(list(coverage.values()))
+        best, total = stacked.max(axis=0), stacked.sum(axis=0)
+
+        count = min(MAX_CANDIDATES, int(np.count_nonzero(best)))
+        candidates = np.argpartition(-best, count - 1)[:count]
+
+        ranked = []
+        for doc in candidates:
+            # 先算命中比例高的形式,完全匹配时不必再算其他形式
+            distance = float("inf")
+            for kind in sorted(coverage, key=lambda k: -coverage[k][doc]):
+                if coverage[kind][doc] == 0:
+                    break
+                form = kinds[kind]
+                distance = min(
+                    distance, substring_distance(form, self.forms[kind][doc]) / len(form)
+                )
+                if distance == 0:
+                    break
+            if distance <= max_distance:
+                # 距离相同时,汉字本身也相同的排在前面,再按名称长度
+                ranked.append((distance, -total[doc], len(self.forms["chars"][doc]), doc))
+
+        ranked.sort()
+        return [(int(self.ids[doc]), distance) for distance, _, _, doc in ranked[:limit]]
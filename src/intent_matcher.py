@@ -0,0 +1,231 @@
+"""
+本地意图匹配模块
+用预编译的规则表识别常见指令,命中时直接生成函数调用,无需请求大模型
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+import config
+from src.logger import logger
+
+# 句末可忽略的标点和语气词
+TRAILING_PATTERN = re.compile(r"(?:[\s。.!！?？,,、~]|吧|啊|呀)+$")
+
+CHINESE_DIGITS = {
+    "零": 0,
+    "一": 1,
+    "二": 2,
+    "两": 2,
+    "三": 3,
+    "四": 4,
+    "五": 5,
+    "六": 6,
+    "七": 7,
+    "八": 8,
+    "九": 9,
+}
+
+# 音量数值: 阿拉伯数字或简单的中文数字(如 五十、一百)
+NUMBER = r"(?P<value>\d{1,3}|[零一二两三四五六七八九十百]{1,4})"
+
+
+def parse_number(text: str) -> Optional[int]:
+    """
+    解析阿拉伯数字或一百以内的中文数字
+
+    Args:
+        text: 数字文本
+
+    Returns:
+        整数值,无法解析时返回None
+    """
+    if text.isdigit():
+        return int(text)
+
+    if text == "一百":
+        return 100
+
+    if "十" in text:
+        tens, _, ones = text.partition("十")
+        if (tens and tens not in CHINESE_DIGITS) or (ones and ones not in CHINESE_DIGITS):
+            return None
+        tens_value = CHINESE_DIGITS[tens] if tens else 1
+        ones_value = CHINESE_DIGITS[ones] if ones else 0
+        return tens_value * 10 + ones_value
+
+    if len(text) == 1 and text in CHINESE_DIGITS:
+        return CHINESE_DIGITS[text]
+
+    return None
+
+
+def _volume_step(match: "re.Match[str]") -> Dict[str, Any]:
+    """解析可选的音量步长"""
+    value = match.groupdict().get("value")
+    step = parse_number(value) if value else None
+    return {"value": step} if step is not None else {}
+
+
+def _set_volume(match: "re.Match[str]") -> Optional[Dict[str, Any]]:
+    """构造设置音量的参数,数值越界视为不确定"""
+    value = parse_number(match.group("value"))
+    if value is None or not 0 <= value <= 100:
+        return None
+    return {"action": "set_volume", "value": value}
+
+
+def _open_application(match: "re.Match[str]") -> Optional[Dict[str, Any]]:
+    """只有应用名在白名单中时才认为匹配可信"""
+    app_name = match.group("app")
+    if app_name in config.ALLOWED_APPLICATIONS:
+        return {"app_name": app_name}
+    return None
+
+
+# 只说了"播放音乐"之类时没有可搜索的关键词
+GENERIC_MUSIC_WORDS = {"音乐", "歌", "歌曲", "一首歌", "点音乐", "点歌"}
+MUSIC_SUFFIX_PATTERN = re.compile(r"(的)?(歌|歌曲|音乐|这首歌)$")
+# 关键词中含连接词或其他动作时是复合指令(如“播放晴天然后把音量调到50”),交给大模型
+COMPOUND_PATTERN = re.compile(
+    r"然后|并|再|和|把|接着|同时|顺便|调|打开|关闭|关掉|设置|截图|截屏|暂停|停止|搜索|播放|音量"
+)
+# 描述性的说法(如“点安静的”“一些轻松的”“我的歌单”)不是歌名,交给大模型
+VAGUE_PATTERN = re.compile(r"^(第|点|一点|些|一些|什么|随便)|的$|歌单")
+
+
+def _find_and_play(match: "re.Match[str]") -> Optional[Dict[str, Any]]:
+    """提取要播放的关键词,序号、泛指、描述和复合指令交给大模型"""
+    keyword = match.group("keyword").strip()
+    if keyword in GENERIC_MUSIC_WORDS or COMPOUND_PATTERN.search(keyword):
+        return None
+    keyword = MUSIC_SUFFIX_PATTERN.sub("", keyword) or keyword
+    if keyword in GENERIC_MUSIC_WORDS or VAGUE_PATTERN.search(keyword):
+        return None
+    return {"keyword": keyword}
+
+
+# 规则表: (正则, 函数名, 参数构造函数)
+RuleBuilder = Callable[["re.Match[str]"], Optional[Dict[str, Any]]]
+INTENT_RULES: List[Tuple[str, str, RuleBuilder]] = [
+    # 音乐控制
+    (r"(请|帮我)?暂停(一下)?(播放)?(音乐|歌曲|歌)?", "play_music", lambda m: {"action": "pause"}),
+    (r"(请|帮我)?(继续|恢复)(播放)?(音乐|歌曲|歌)?", "play_music", lambda m: {"action": "resume"}),
+    (
+        r"(请|帮我)?(停止|关掉|关闭)(播放)?(音乐|歌曲|歌)",
+        "play_music",
+        lambda m: {"action": "stop"},
+    ),
+    (r"(请|帮我)?停止播放", "play_music", lambda m: {"action": "stop"}),
+    # 播放列表
+    (
+        r"(请|帮我)?(播放|切换到|换到|切到)?下一(首|曲)(歌|音乐)?",
+        "music_queue",
+        lambda m: {"action": "next"},
+    ),
+    (
+        r"(请|帮我)?(播放|切换到|换到|切到)?上一(首|曲)(歌|音乐)?",
+        "music_queue",
+        lambda m: {"action": "previous"},
+    ),
+    (r"(请|帮我)?(开启|打开)?随机播放", "music_queue", lambda m: {"action": "shuffle"}),
+    (r"(请|帮我)?(关闭|取消)随机播放|顺序播放", "music_queue", lambda m: {"action": "unshuffle"}),
+    # 搜索并播放
+    (
+        r"(请|帮我)?(播放|放一首|来一首|我想听|我要听)(一下|一首)?(?P<keyword>.{1,20})",
+        "find_and_play",
+        _find_and_play,
+    ),
+    # 音量
+    (
+        rf"(请|帮我)?(把)?音量(调|设置|设)(到|为|成){NUMBER}(%|％)?",
+        "system_control",
+        _set_volume,
+    ),
+    (
+        rf"(请|帮我)?(把)?音量(调|开)?(大|高|增加|提高)({NUMBER}(%|％)?|一点|一些|点)?",
+        "system_control",
+        lambda m: {"action": "volume_up", **_volume_step(m)},
+    ),
+    (
+        r"(请|帮我)?(调高|调大|提高|增大)(一下)?音量",
+        "system_control",
+        lambda m: {"action": "volume_up"},
+    ),
+    (r"(请|帮我)?(大声|响)(一)?点", "system_control", lambda m: {"action": "volume_up"}),
+    (
+        rf"(请|帮我)?(把)?音量(调|关)?(小|低|减少|降低)({NUMBER}(%|％)?|一点|一些|点)?",
+        "system_control",
+        lambda m: {"action": "volume_down", **_volume_step(m)},
+    ),
+    (
+        r"(请|帮我)?(调低|调小|降低|减小)(一下)?音量",
+        "system_control",
+        lambda m: {"action": "volume_down"},
+    ),
+    (r"(请|帮我)?小声(一)?点", "system_control", lambda m: {"action": "volume_down"}),
+    # 截图
+    (
+        r"(请|帮我)?(截图|截屏|截个图|截个屏|截一下屏|截一下图)",
+        "system_control",
+        lambda m: {"action": "screenshot"},
+    ),
+    # 打开应用
+    (
+        r"(请|帮我)?(打开|启动|开启|运行)(一下)?(?P<app>.{1,10})",
+        "open_application",
+        _open_application,
+    ),
+]
+
+
+class IntentMatcher:
+    """本地意图匹配器"""
+
+    def __init__(self, has_music: Optional[Callable[[str], bool]] = None):
+        """
+        初始化并预编译规则表
+
+        Args:
+            has_music: 判断音乐库中是否有匹配关键词的音乐;搜索并播放只在有匹配时走快速路径,
+                       未提供时一律交给大模型
+        """
+        self.rules: List[Tuple[Pattern[str], str, RuleBuilder]] = [
+            (re.compile(f"^(?:{pattern})$"), function_name, builder)
+            for pattern, function_name, builder in INTENT_RULES
+        ]
+        # 参数还需要确认的函数
+        self.checks: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+            "find_and_play": lambda arguments: has_music is not None
+            and has_music(arguments["keyword"]),
+        }
+
+    def match(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        尝试匹配用户输入
+
+        Args:
+            text: 用户输入文本
+
+        Returns:
+            可信匹配时返回 {"name": 函数名, "arguments": 参数},否则返回None
+        """
+        normalized = TRAILING_PATTERN.sub("", text.strip())
+
+        for pattern, function_name, builder in self.rules:
+            match = pattern.match(normalized)
+            if not match:
+                continue
+
+            arguments = builder(match)
+            if arguments is None:
+                continue
+            check = self.checks.get(function_name)
+            if check is not None and not check(arguments):
+                continue
+
+            logger.info(f"意图匹配: 本地快速路径 '{text}' -> {function_name} {arguments}")
+            return {"name": function_name, "arguments": arguments}
+
+        logger.info(f"意图匹配: 未命中,交给大模型 '{text}'")
+        return None
@@ -3,27 +3,62 @@
 负责与OpenAI API交互,实现Function Calling
 """
 
+import abc
 import json
-from typing import Any, Dict, List, Optional
-
-from openai import OpenAI
+from functools import partial
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
 
 import config
+from src.conversation_history import ConversationHistory
 from src.logger import logger
+from src.openai_client import get_openai_client
+from src.streaming import StreamAccumulator
 
+# 回复文本与函数调用列表
+ChatReply = Tuple[Optional[str], Optional[List[Dict[str, Any]]]]
+# 不含网络请求的处理步骤: 每次产出一个无参数的 I/O 调用,接收它的返回值,最后返回结果;
+# 同步版本直接调用,异步版本 await 调用结果,两者共用同一份处理逻辑
+Steps = Generator[Callable[[], Any], Any, Any]
 
-class LLMClient:
-    """大模型客户端"""
+
+def run_steps(steps: Steps) -> Any:
+    """
+    同步执行处理步骤
+
+    Args:
+        steps: 处理步骤
+
+    Returns:
+        处理结果
+    """
+    try:
+        call = next(steps)
+        while True:
+            try:
+                value = call()
+            except Exception as e:
+                call = steps.throw(e)
+            else:
+                call = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+class BaseLLMClient(abc.ABC):
+    """大模型客户端基类: 维护对话历史、函数定义和补全流程,只有发送请求由子类实现"""
 
     def __init__(self):
         """初始化客户端"""
-        self.client = OpenAI()  # API key已在环境变量中配置
         self.model = config.OPENAI_MODEL
-        self.conversation_history: List[Dict[str, Any]] = []
         self.system_prompt = config.SYSTEM_PROMPT
 
-        # 初始化系统消息
-        self.conversation_history.append({"role": "system", "content": self.system_prompt})
+        # 对话历史(含系统消息),按token预算裁剪
+        self.history = ConversationHistory(self.system_prompt)
+
+    @property
+    def conversation_history(self) -> List[Dict[str, Any]]:
+        """当前发送给大模型的完整消息列表"""
+        return self.history.messages
 
     def get_available_functions(self) -> List[Dict[str, Any]]:
         """获取可用的函数定义"""
@@ -45,6 +80,11 @@ class LLMClient:
                                 "type": "string",
                                 "description": "音乐文件路径(仅play时需要)",
                             },
+                            "index": {
+                                "type": "integer",
+                                "description": "播放最近一次 search_music 结果中的第几个"
+                                "(从1开始,仅play时可代替file_path)",
+                            },
                         },
                         "required": ["action"],
                     },
@@ -108,6 +148,21 @@ class LLMClient:
                                 "type": "string",
                                 "description": "文件内容(仅create时需要)",
                             },
+                            "offset": {
+                                "type": "integer",
+                                "description": "读取的起始字节(仅read时使用),负数表示从末尾倒数,"
+                                "如 -4000 读取最后约4000字节;结果会提示继续读取用的 offset",
+                            },
+                            "length": {
+                                "type": "integer",
+                                "description": "读取的字节数(仅read时使用,默认4096字节,约1300个汉字,最多65536);"
+                                "与grep同用时为搜索的范围",
+                            },
+                            "grep": {
+                                "type": "string",
+                                "description": "只返回包含该内容的行(仅read时使用,支持正则表达式,"
+                                "不区分大小写),适合在大文件中查找",
+                            },
                         },
                         "required": ["operation", "file_path"],
                     },
@@ -139,7 +194,9 @@ class LLMClient:
                 "type": "function",
                 "function": {
                     "name": "search_music",
-                    "description": "在音乐目录中搜索音乐文件",
+                    "description": "在音乐目录中按文件名、歌手、专辑和标题搜索音乐,返回 JSON: "
+                    "total 为匹配总数,results 中每项有 index(可用于 play_music 播放)、"
+                    "name 和已知的 artist/album/title/duration(秒)",
                     "parameters": {
                         "type": "object",
                         "properties": {"keyword": {"type": "string", "description": "搜索关键词"}},
@@ -147,110 +204,307 @@ class LLMClient:
                     },
                 },
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "find_and_play",
+                    "description": "搜索音乐并直接播放最匹配的一首(如“播放晴天”“放一首周杰伦的歌”),"
+                    "无需先调用 search_music",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "keyword": {
+                                "type": "string",
+                                "description": "搜索关键词(歌名、歌手、专辑等)",
+                            },
+                            "index": {
+                                "type": "integer",
+                                "description": "播放第几个结果(从1开始,默认1)",
+                            },
+                            "play_all": {
+                                "type": "boolean",
+                                "description": "是否把全部搜索结果作为播放列表依次播放",
+                            },
+                        },
+                        "required": ["keyword"],
+                    },
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "music_queue",
+                    "description": "播放列表: 一次播放多首音乐(可按关键词把搜索到的音乐全部加入),"
+                    "切换上一首/下一首,随机播放",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "action": {
+                                "type": "string",
+                                "enum": [
+                                    "play",
+                                    "add",
+                                    "next",
+                                    "previous",
+                                    "shuffle",
+                                    "unshuffle",
+                                    "list",
+                                ],
+                                "description": "操作: play(用这些音乐替换播放列表并开始播放), "
+                                "add(添加到播放列表末尾), next(下一首), previous(上一首), "
+                                "shuffle(随机播放), unshuffle(顺序播放), list(查看播放列表)",
+                            },
+                            "file_paths": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "音乐文件路径(仅play和add时需要)",
+                            },
+                            "keyword": {
+                                "type": "string",
+                                "description": "搜索关键词,匹配的音乐全部加入播放列表"
+                                "(仅play和add时需要,可代替file_paths)",
+                            },
+                            "shuffle": {
+                                "type": "boolean",
+                                "description": "是否随机顺序播放(仅play时使用)",
+                            },
+                        },
+                        "required": ["action"],
+                    },
+                },
+            },
         ]
 
-    def chat(self, user_message: str) -> tuple[Optional[str], Optional[List[Dict[str, Any]]]]:
+    def record_function_results(self, results: List[Dict[str, Any]]):
         """
-        发送消息并获取响应
+        仅把函数执行结果写入历史,不请求后续响应
 
         Args:
-            user_message: 用户消息
+            results: 执行结果列表,每项包含 id(工具调用ID)、name(函数名称)、result(执行结果)
+        """
+        for item in results:
+            self.history.append(
+                {
+                    "role": "tool",
+                    "tool_call_id": item["id"],
+                    "name": item["name"],
+                    "content": item["result"],
+                }
+            )
 
-        Returns:
-            (回复文本, 函数调用列表) 的元组
+    def record_exchange(self, user_message: str, reply: str):
         """
-        # 添加用户消息到历史
-        self.conversation_history.append({"role": "user", "content": user_message})
+        记录一轮未经大模型处理的对话(如本地快速路径),保持后续对话的上下文连贯
 
-        # 限制历史长度
-        if len(self.conversation_history) > config.MAX_CONVERSATION_HISTORY * 2 + 1:
-            # 保留系统消息和最近的对话
-            self.conversation_history = [self.conversation_history[0]] + self.conversation_history[
-                -(config.MAX_CONVERSATION_HISTORY * 2) :
-            ]
+        Args:
+            user_message: 用户消息
+            reply: 助手回复
+        """
+        self.history.append({"role": "user", "content": user_message})
+        self.history.append({"role": "assistant", "content": reply})
 
-        try:
-            # 调用OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.conversation_history,
-                tools=self.get_available_functions(),
-                tool_choice="auto",
-            )
+    def _chat_steps(self, user_message: str, on_sentence: Optional[Callable[[str], None]]) -> Steps:
+        """发送用户消息并获取响应的处理步骤"""
+        # 添加用户消息到历史
+        self.history.append({"role": "user", "content": user_message})
+        return self._completion_steps(on_sentence, "调用大模型时出错")
 
-            message = response.choices[0].message
+    def _results_steps(
+        self, results: List[Dict[str, Any]], on_sentence: Optional[Callable[[str], None]]
+    ) -> Steps:
+        """提交函数执行结果并获取后续响应的处理步骤"""
+        self.record_function_results(results)
+        # 所有结果就位后再调用API获取基于函数结果的响应
+        return self._completion_steps(on_sentence, "处理函数结果时出错")
 
-            # 添加助手响应到历史
-            self.conversation_history.append(
-                {"role": "assistant", "content": message.content, "tool_calls": message.tool_calls}
-            )
+    def _completion_steps(
+        self, on_sentence: Optional[Callable[[str], None]], error_prefix: str
+    ) -> Steps:
+        """
+        基于当前对话历史请求一次补全,并把助手回复写入历史
 
-            # 检查是否有函数调用
-            if message.tool_calls:
-                function_calls = []
-                for tool_call in message.tool_calls:
-                    function_calls.append(
-                        {
-                            "id": tool_call.id,
-                            "name": tool_call.function.name,
-                            "arguments": json.loads(tool_call.function.arguments),
-                        }
-                    )
-                return message.content, function_calls
+        Args:
+            on_sentence: 可选的句子回调,提供时使用流式补全
+            error_prefix: 请求失败时回复的前缀
+
+        Returns:
+            处理步骤,结果为 (回复文本, 函数调用列表) 的元组
+        """
+        try:
+            request = self._build_request()
+            if on_sentence is None:
+                message = yield partial(self._send, request)
+                content, tool_calls = message.content, self._serialize_tool_calls(message)
             else:
-                return message.content, None
+                # 流式读取: 文本边到达边分句回调,工具调用增量拼接完整后再解析
+                accumulator = StreamAccumulator(on_sentence)
+                yield partial(self._send_stream, request, accumulator)
+                content, tool_calls = accumulator.finish()
+            return self._finish_completion(content, tool_calls)
 
         except Exception as e:
-            error_msg = f"调用大模型时出错: {str(e)}"
+            error_msg = f"{error_prefix}: {str(e)}"
             logger.error(error_msg)
+            if on_sentence:
+                on_sentence(error_msg)
             return error_msg, None
 
+    @abc.abstractmethod
+    def _send(self, request: Dict[str, Any]) -> Any:
+        """发送非流式补全请求,返回响应中的消息"""
+
+    @abc.abstractmethod
+    def _send_stream(self, request: Dict[str, Any], accumulator: StreamAccumulator) -> Any:
+        """发送流式补全请求,把每个数据块交给 accumulator"""
+
+    def _build_request(self) -> Dict[str, Any]:
+        """
+        构造补全请求参数
+
+        Returns:
+            chat.completions.create 的参数
+        """
+        # 限制历史长度: 超出token预算的较早对话折叠为摘要
+        self.history.enforce_budget()
+
+        return {
+            "model": self.model,
+            "messages": self.history.messages,
+            "tools": self.get_available_functions(),
+            "tool_choice": "auto",
+        }
+
+    @staticmethod
+    def _serialize_tool_calls(message: Any) -> List[Dict[str, Any]]:
+        """把非流式响应中的工具调用转换为可写入历史的字典"""
+        return [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments,
+                },
+            }
+            for tool_call in message.tool_calls or []
+        ]
+
+    def _finish_completion(
+        self, content: Optional[str], tool_calls: List[Dict[str, Any]]
+    ) -> ChatReply:
+        """
+        把助手回复写入历史并解析函数调用
+
+        Args:
+            content: 回复文本
+            tool_calls: 工具调用列表
+
+        Returns:
+            (回复文本, 函数调用列表) 的元组
+        """
+        # 添加助手响应到历史
+        assistant_message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_calls:
+            assistant_message["tool_calls"] = tool_calls
+        self.history.append(assistant_message)
+
+        # 检查是否有函数调用
+        if not tool_calls:
+            return content, None
+
+        function_calls = []
+        for tool_call in tool_calls:
+            function_calls.append(
+                {
+                    "id": tool_call["id"],
+                    "name": tool_call["function"]["name"],
+                    "arguments": json.loads(tool_call["function"]["arguments"] or "{}"),
+                }
+            )
+        return content, function_calls
+
+    def reset_conversation(self):
+        """重置对话历史"""
+        self.history.reset()
+
+
+class LLMClient(BaseLLMClient):
+    """大模型客户端"""
+
+    def __init__(self):
+        """初始化客户端"""
+        super().__init__()
+        self.client = get_openai_client()  # 进程内共享连接池,API key已在环境变量中配置
+
+    def chat(
+        self, user_message: str, on_sentence: Optional[Callable[[str], None]] = None
+    ) -> ChatReply:
+        """
+        发送消息并获取响应
+
+        Args:
+            user_message: 用户消息
+            on_sentence: 可选的句子回调,提供时以流式方式读取回复,每凑满一句就回调一次
+
+        Returns:
+            (回复文本, 函数调用列表) 的元组
+        """
+        return run_steps(self._chat_steps(user_message, on_sentence))
+
     def add_function_result(
-        self, tool_call_id: str, function_name: str, result: str
+        self,
+        tool_call_id: str,
+        function_name: str,
+        result: str,
+        on_sentence: Optional[Callable[[str], None]] = None,
     ) -> Optional[str]:
         """
-        添加函数执行结果并获取后续响应
+        添加单个函数执行结果并获取后续响应
+
+        一条助手消息包含多个工具调用时,应使用 add_function_results 一次性提交全部结果
 
         Args:
             tool_call_id: 工具调用ID
             function_name: 函数名称
             result: 执行结果
+            on_sentence: 可选的句子回调,提供时以流式方式读取回复
 
         Returns:
             助手的回复文本
         """
-        # 添加函数结果到历史
-        self.conversation_history.append(
-            {"role": "tool", "tool_call_id": tool_call_id, "name": function_name, "content": result}
+        content, function_calls = self.add_function_results(
+            [{"id": tool_call_id, "name": function_name, "result": result}],
+            on_sentence=on_sentence,
         )
 
-        try:
-            # 再次调用API获取基于函数结果的响应
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.conversation_history,
-                tools=self.get_available_functions(),
-                tool_choice="auto",
-            )
+        # 如果还有函数调用,返回None表示需要继续处理
+        if function_calls:
+            return None
 
-            message = response.choices[0].message
+        return content
 
-            # 添加助手响应到历史
-            self.conversation_history.append(
-                {"role": "assistant", "content": message.content, "tool_calls": message.tool_calls}
-            )
+    def add_function_results(
+        self,
+        results: List[Dict[str, Any]],
+        on_sentence: Optional[Callable[[str], None]] = None,
+    ) -> ChatReply:
+        """
+        批量添加同一条助手消息的全部函数执行结果,并只请求一次后续响应
 
-            # 如果还有函数调用,返回None表示需要继续处理
-            if message.tool_calls:
-                return None
+        Args:
+            results: 执行结果列表,每项包含 id(工具调用ID)、name(函数名称)、result(执行结果)
+            on_sentence: 可选的句子回调,提供时以流式方式读取回复
 
-            return message.content
+        Returns:
+            (回复文本, 函数调用列表) 的元组
+        """
+        return run_steps(self._results_steps(results, on_sentence))
 
-        except Exception as e:
-            error_msg = f"处理函数结果时出错: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+    def _send(self, request: Dict[str, Any]) -> Any:
+        """发送非流式补全请求,返回响应中的消息"""
+        return self.client.chat.completions.create(**request).choices[0].message
 
-    def reset_conversation(self):
-        """重置对话历史"""
-        self.conversation_history = [{"role": "system", "content": self.system_prompt}]
+    def _send_stream(self, request: Dict[str, Any], accumulator: StreamAccumulator):
+        """发送流式补全请求,把每个数据块交给 accumulator"""
+        for chunk in self.client.chat.completions.create(stream=True, **request):
+            accumulator.add_chunk(chunk)
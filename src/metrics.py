@@ -0,0 +1,99 @@
+"""
+延迟统计模块
+按阶段记录耗时,输出 p50/p95/p99 分位数
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    计算分位数(线性插值)
+
+    Args:
+        samples: 样本
+        q: 分位(0-100)
+
+    Returns:
+        分位数,没有样本时返回0
+    """
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class LatencyRecorder:
+    """分阶段延迟记录器"""
+
+    def __init__(self):
+        """初始化记录器"""
+        self.samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        """
+        记录一次耗时
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时(秒)
+        """
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """
+        记录代码块耗时
+
+        Args:
+            stage: 阶段名称
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        各阶段统计
+
+        Returns:
+            {阶段: {"count", "p50", "p95", "p99"}},耗时单位为毫秒
+        """
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self.samples.items()}
+
+        return {
+            stage: {
+                "count": len(values),
+                "p50": percentile(values, 50) * 1000,
+                "p95": percentile(values, 95) * 1000,
+                "p99": percentile(values, 99) * 1000,
+            }
+            for stage, values in samples.items()
+        }
+
+    def report(self) -> str:
+        """
+        格式化的统计表
+
+        Returns:
+            可直接打印的文本
+        """
+        lines = [f"{'阶段':<14}{'次数':>6}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}"]
+        for stage, stats in self.summary().items():
+            lines.append(
+                f"{stage:<16}{stats['count']:>6}"
+                f"{stats['p50']:>12.2f}{stats['p95']:>12.2f}{stats['p99']:>12.2f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,712 @@
+"""
+音乐库索引模块
+把音乐目录中的文件索引到 SQLite(FTS5 全文索引),按目录和文件的修改时间增量刷新,搜索不再遍历整个目录树
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from src.fuzzy_search import FuzzyIndex
+from src.logger import logger
+from src.music_metadata import MetadataExtractor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    artist TEXT,
+    album TEXT,
+    title TEXT,
+    duration REAL,
+    tags_mtime_ns INTEGER,
+    tags_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS tracks_dir ON tracks(dir);
+CREATE INDEX IF NOT EXISTS tracks_name ON tracks(name);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+"""
+
+# 标签相关的列,旧版本的索引文件打开时补上
+METADATA_COLUMNS = {
+    "artist": "TEXT",
+    "album": "TEXT",
+    "title": "TEXT",
+    "duration": "REAL",
+    "tags_mtime_ns": "INTEGER",
+    "tags_size": "INTEGER",
+}
+
+# 索引文件格式版本(PRAGMA user_version),全文索引的列变化时递增
+SCHEMA_VERSION = 2
+
+# 文件名和标签的 trigram 全文索引,与 tracks 表通过触发器保持同步
+FTS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    name, artist, album, title, content='tracks', content_rowid='id', tokenize='trigram'
+)
+"""
+FTS_TRIGGERS = {
+    "tracks_ai": """
+CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts(rowid, name, artist, album, title)
+    VALUES (new.id, new.name, new.artist, new.album, new.title);
+END
+""",
+    "tracks_ad": """
+CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, name, artist, album, title)
+    VALUES ('delete', old.id, old.name, old.artist, old.album, old.title);
+END
+""",
+    "tracks_au": """
+CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE OF name, artist, album, title ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, name, artist, album, title)
+    VALUES ('delete', old.id, old.name, old.artist, old.album, old.title);
+    INSERT INTO tracks_fts(rowid, name, artist, album, title)
+    VALUES (new.id, new.name, new.artist, new.album, new.title);
+END
+""",
+}
+
+# 短关键词用 LIKE 匹配的列
+SEARCH_COLUMNS = ("name", "artist", "album", "title")
+
+# trigram 分词器只能加速不少于3个字符的查询,更短的关键词用 LIKE 扫描
+FTS_MIN_CHARS = 3
+
+
+def default_index_path(root: str) -> str:
+    """
+    音乐目录对应的索引文件路径(不同目录使用不同的索引文件)
+
+    Args:
+        root: 音乐目录
+
+    Returns:
+        索引文件路径
+    """
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(config.MUSIC_LIBRARY_DIR, f"{digest}.db")
+
+
+def _escape_like(text: str) -> str:
+    """转义 LIKE 模式中的通配符"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def relevance(name: str, keyword: str) -> Tuple[int, int, str]:
+    """
+    文件名与关键词的相关程度排序键(与 MusicLibrary.search 的排序一致,用于未启用索引时)
+
+    Args:
+        name: 文件名(不含扩展名)
+        keyword: 关键词
+
+    Returns:
+        排序键,越小越相关: 与关键词相同、以关键词开头、其他包含关键词的;再按文件名长度
+    """
+    lowered, keyword = name.lower(), keyword.lower()
+    tier = 0 if lowered == keyword else 1 if lowered.startswith(keyword) else 2
+    return tier, len(name), name
+
+
+class MusicLibrary:
+    """音乐库索引"""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        path: Optional[str] = None,
+        extensions: Optional[Iterable[str]] = None,
+    ):
+        """
+        初始化索引(不会立即扫描,需调用 refresh)
+
+        Args:
+            root: 音乐目录,默认取配置
+            path: 索引文件路径,默认按音乐目录生成;传 ":memory:" 表示只保存在内存中
+            extensions: 音乐文件扩展名,默认取配置
+        """
+        self.root = os.path.abspath(root or config.DEFAULT_MUSIC_DIR)
+        self.path = path or default_index_path(self.root)
+        self.extensions = {e.lower() for e in (extensions or config.MUSIC_EXTENSIONS)}
+        self.last_refresh = 0.0
+        self.last_scan: Dict[str, float] = {}
+        self.last_metadata: Dict[str, float] = {}
+        self.closed = False
+
+        # 索引内容每次变化时递增,模糊搜索索引据此判断是否需要重建
+        self.version = 0
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._fuzzy_version = -1
+        # 模糊搜索索引在后台线程重建,重建完成前查询继续使用旧的索引
+        self._fuzzy_lock = threading.Lock()
+        self._fuzzy_building = False
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # 工具调用在线程池中执行,连接由锁保护
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.RLock()
+        # 同一时间只运行一次标签读取
+        self._metadata_lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            migrated = self._migrate()
+            self.fts = self._create_fts(rebuild=migrated)
+
+    def _migrate(self) -> bool:
+        """
+        升级旧版本的索引文件: 补上标签列,删除旧的全文索引(随后按新的列重建)
+
+        Returns:
+            是否做了升级
+        """
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return False
+
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tracks)")}
+        for name, kind in METADATA_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE tracks ADD COLUMN {name} {kind}")
+        for name in FTS_TRIGGERS:
+            self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        self._conn.execute("DROP TABLE IF EXISTS tracks_fts")
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return True
+
+    def _create_fts(self, rebuild: bool = False) -> bool:
+        """创建全文索引,SQLite 不支持 FTS5 trigram 时退回 LIKE 查询"""
+        try:
+            self._conn.execute(FTS_TABLE)
+            for sql in FTS_TRIGGERS.values():
+                self._conn.execute(sql)
+            if rebuild:
+                self._conn.execute("INSERT INTO tracks_fts(tracks_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite 不支持 FTS5 trigram,音乐搜索改用 LIKE 查询: {e}")
+            return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def refresh(self) -> Dict[str, float]:
+        """
+        增量刷新索引: 目录修改时间未变的目录不再列出文件,只检查已索引文件的修改时间和其子目录
+
+        Returns:
+            扫描统计(检查的目录数、重新列出的目录数、增删和更新的文件数、耗时)
+        """
+        started = time.perf_counter()
+        stats = {"dirs": 0, "listed": 0, "added": 0, "removed": 0, "updated": 0}
+
+        with self._lock, self._conn:
+            known = dict(self._conn.execute("SELECT path, mtime_ns FROM dirs"))
+            seen = set()
+
+            # 首次构建时逐行同步全文索引很慢,先去掉触发器,扫描完后整体重建
+            bulk = self.fts and not known
+            if bulk:
+                for name in FTS_TRIGGERS:
+                    self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            stack = [self.root]
+
+            while stack:
+                directory = stack.pop()
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(directory)
+                stats["dirs"] += 1
+
+                updated = self._check_files(directory) if known.get(directory) == mtime_ns else None
+                if updated is not None:
+                    # 目录内容没有变化(增删、改名都会更新目录的修改时间),
+                    # 但原地修改文件(如重写标签)不会更新目录的修改时间,还要逐个比较文件
+                    stats["updated"] += updated
+                    stack.extend(
+                        row[0]
+                        for row in self._conn.execute(
+                            "SELECT path FROM dirs WHERE parent = ?", (directory,)
+                        )
+                    )
+                    continue
+
+                stats["listed"] += 1
+                subdirs, added, removed, updated = self._rescan_dir(directory, mtime_ns)
+                stack.extend(subdirs)
+                stats["added"] += added
+                stats["removed"] += removed
+                stats["updated"] += updated
+
+            # 已经不存在的目录
+            for directory in set(known) - seen:
+                stats["removed"] += self._conn.execute(
+                    "DELETE FROM tracks WHERE dir = ?", (directory,)
+                ).rowcount
+                self._conn.execute("DELETE FROM dirs WHERE path = ?", (directory,))
+
+            if bulk:
+                self._conn.execute("INSERT INTO tracks_fts(tracks_fts) VALUES ('rebuild')")
+                for sql in FTS_TRIGGERS.values():
+                    self._conn.execute(sql)
+
+        stats["seconds"] = time.perf_counter() - started
+        self.last_refresh = time.time()
+        if stats["added"] or stats["removed"]:
+            self.version += 1
+            self._schedule_fuzzy_rebuild()
+        self.last_scan = stats
+        logger.info(
+            f"音乐库刷新: 检查 {stats['dirs']} 个目录, 重新列出 {stats['listed']} 个, "
+            f"新增 {stats['added']} 首, 移除 {stats['removed']} 首, 更新 {stats['updated']} 首, "
+            f"耗时 {stats['seconds'] * 1000:.0f}ms"
+        )
+        return stats
+
+    def _check_files(self, directory: str) -> Optional[int]:
+        """
+        检查目录中已索引文件的修改时间和大小,同步原地修改过的文件
+
+        Args:
+            directory: 目录路径
+
+        Returns:
+            更新的文件数;有文件已经不存在时返回None(由调用方重新列出目录)
+        """
+        changed = []
+        for path, mtime_ns, size in self._conn.execute(
+            "SELECT path, mtime_ns, size FROM tracks WHERE dir = ?", (directory,)
+        ).fetchall():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+                changed.append((st.st_mtime_ns, st.st_size, path))
+
+        self._conn.executemany("UPDATE tracks SET mtime_ns = ?, size = ? WHERE path = ?", changed)
+        return len(changed)
+
+    def _rescan_dir(self, directory: str, mtime_ns: int) -> Tuple[List[str], int, int, int]:
+        """
+        重新列出一个目录,同步其中的音乐文件
+
+        Args:
+            directory: 目录路径
+            mtime_ns: 目录修改时间
+
+        Returns:
+            (子目录列表, 新增文件数, 移除文件数, 更新的文件数)
+        """
+        subdirs, files = [], {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                            st = entry.stat()
+                            stem = os.path.splitext(entry.name)[0]
+                            files[entry.path] = (stem, st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"无法读取目录 {directory}: {e}")
+
+        existing = {
+            row[0]: tuple(row[1:])
+            for row in self._conn.execute(
+                "SELECT path, mtime_ns, size FROM tracks WHERE dir = ?", (directory,)
+            )
+        }
+        removed = existing.keys() - files.keys()
+        added = files.keys() - existing.keys()
+        self._conn.executemany("DELETE FROM tracks WHERE path = ?", ((p,) for p in removed))
+        self._conn.executemany(
+            "INSERT INTO tracks(path, dir, name, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+            ((path, directory, *files[path]) for path in added),
+        )
+        changed = [
+            (*files[path][1:], path)
+            for path in files.keys() & existing.keys()
+            if files[path][1:] != existing[path]
+        ]
+        self._conn.executemany("UPDATE tracks SET mtime_ns = ?, size = ? WHERE path = ?", changed)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs(path, parent, mtime_ns) VALUES (?, ?, ?)",
+            (directory, os.path.dirname(directory) if directory != self.root else None, mtime_ns),
+        )
+        return subdirs, len(added), len(removed), len(changed)
+
+    def apply_changes(
+        self, changed: Iterable[str] = (), deleted: Iterable[str] = ()
+    ) -> Dict[str, int]:
+        """
+        把文件系统事件增量写入索引,不扫描其他目录
+
+        Args:
+            changed: 新建、修改或移入的文件和目录
+            deleted: 删除或移出的文件和目录
+
+        Returns:
+            新增、更新、移除的文件数
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        touched = set()
+
+        with self._lock, self._conn:
+            for path in map(os.path.abspath, deleted):
+                if not self._contains(path):
+                    continue
+                # 删除的可能是目录,连同其中的文件和子目录一起移除
+                prefix = path + os.sep
+                args = (path, len(prefix), prefix)
+                stats["removed"] += self._conn.execute(
+                    "DELETE FROM tracks WHERE path = ? OR substr(path, 1, ?) = ?", args
+                ).rowcount
+                self._conn.execute(
+                    "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?", args
+                )
+                touched.add(os.path.dirname(path))
+
+            known = {row[0] for row in self._conn.execute("SELECT path FROM dirs")}
+            for path in map(os.path.abspath, changed):
+                if not self._contains(path):
+                    continue
+                directory = path if os.path.isdir(path) else os.path.dirname(path)
+                if directory == path or directory not in known:
+                    # 新目录(或所在目录尚未索引)整体扫描
+                    stats["added"] += self._scan_subtree(directory, known)
+                    touched.add(os.path.dirname(directory))
+                    continue
+
+                if os.path.splitext(path)[1].lower() not in self.extensions:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                updated = self._conn.execute(
+                    "UPDATE tracks SET mtime_ns = ?, size = ? WHERE path = ?",
+                    (st.st_mtime_ns, st.st_size, path),
+                ).rowcount
+                if updated:
+                    stats["updated"] += 1
+                else:
+                    self._conn.execute(
+                        "INSERT INTO tracks(path, dir, name, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+                        (
+                            path,
+                            directory,
+                            os.path.splitext(os.path.basename(path))[0],
+                            st.st_mtime_ns,
+                            st.st_size,
+                        ),
+                    )
+                    stats["added"] += 1
+                touched.add(directory)
+
+            # 同步受影响目录的修改时间,之后的增量刷新不必再重新列出这些目录
+            for directory in touched:
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                self._conn.execute(
+                    "UPDATE dirs SET mtime_ns = ? WHERE path = ?", (mtime_ns, directory)
+                )
+
+        if stats["added"] or stats["removed"]:
+            self.version += 1
+            self._schedule_fuzzy_rebuild()
+        logger.debug(f"音乐库增量更新: {stats}")
+        return stats
+
+    def _contains(self, path: str) -> bool:
+        """路径是否在音乐目录内"""
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _scan_subtree(self, directory: str, known: set) -> int:
+        """扫描一个目录及其全部子目录,返回新增的文件数"""
+        added = 0
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            subdirs, count, _, _ = self._rescan_dir(current, mtime_ns)
+            known.add(current)
+            stack.extend(subdirs)
+            added += count
+        return added
+
+    def ensure_fresh(self, max_age: Optional[float] = None):
+        """
+        距离上次刷新超过 max_age 秒时增量刷新一次
+
+        Args:
+            max_age: 最长间隔(秒),默认取配置
+        """
+        max_age = config.MUSIC_LIBRARY_REFRESH_INTERVAL if max_age is None else max_age
+        with self._lock:
+            if time.time() - self.last_refresh > max_age:
+                self.refresh()
+
+    def update_metadata(self, extractor: Optional[MetadataExtractor] = None) -> Dict[str, float]:
+        """
+        读取新增和修改过的文件的标签(歌手、专辑、标题、时长);
+        修改时间和大小都没有变化的文件不再读取。读取在锁外并行进行,每完成一块写入一次
+
+        Args:
+            extractor: 元数据读取器,默认按配置创建
+
+        Returns:
+            读取统计(文件数、有标签的文件数、耗时、每秒文件数)
+        """
+        stats = {"files": 0, "tagged": 0, "seconds": 0.0, "files_per_second": 0.0}
+        if not MetadataExtractor.available():
+            return stats
+        if not self._metadata_lock.acquire(blocking=False):
+            return stats
+
+        try:
+            started = time.perf_counter()
+            with self._lock:
+                if self.closed:
+                    return stats
+                pending = self._conn.execute(
+                    "SELECT path, mtime_ns, size FROM tracks WHERE tags_mtime_ns IS NULL "
+                    "OR tags_mtime_ns != mtime_ns OR tags_size != size"
+                ).fetchall()
+            if not pending:
+                return stats
+
+            versions = {path: (mtime_ns, size) for path, mtime_ns, size in pending}
+            extractor = extractor or MetadataExtractor()
+            for chunk in extractor.extract([row[0] for row in pending]):
+                rows = []
+                for path, metadata in chunk:
+                    metadata = metadata or {}
+                    if any(metadata.get(field) for field in ("artist", "album", "title")):
+                        stats["tagged"] += 1
+                    rows.append(
+                        (
+                            metadata.get("artist"),
+                            metadata.get("album"),
+                            metadata.get("title"),
+                            metadata.get("duration"),
+                            *versions[path],
+                            path,
+                            *versions[path],
+                        )
+                    )
+                # 读取期间文件又被修改时不写入,下次再读
+                with self._lock:
+                    if self.closed:
+                        logger.info("音乐库已关闭,停止读取标签")
+                        return stats
+                    with self._conn:
+                        self._conn.executemany(
+                            "UPDATE tracks SET artist = ?, album = ?, title = ?, duration = ?, "
+                            "tags_mtime_ns = ?, tags_size = ? "
+                            "WHERE path = ? AND mtime_ns = ? AND size = ?",
+                            rows,
+                        )
+                stats["files"] += len(chunk)
+
+            stats["seconds"] = time.perf_counter() - started
+            stats["files_per_second"] = stats["files"] / max(stats["seconds"], 1e-9)
+            self.last_metadata = stats
+            logger.info(
+                f"音乐标签读取: {stats['files']} 首 (有标签 {stats['tagged']} 首), "
+                f"耗时 {stats['seconds'] * 1000:.0f}ms, {stats['files_per_second']:.0f} 首/秒"
+            )
+            return stats
+        finally:
+            self._metadata_lock.release()
+
+    def metadata(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        获取文件的标签
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            {"artist", "album", "title", "duration"},文件不在索引中时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artist, album, title, duration FROM tracks WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("artist", "album", "title", "duration"), row))
+
+    def search(self, keyword: str, limit: Optional[int] = None) -> List[str]:
+        """
+        按文件名、歌手、专辑和标题搜索(文件名不含扩展名,不区分大小写)
+
+        Args:
+            keyword: 关键词
+            limit: 最多返回的条数,None 表示全部
+
+        Returns:
+            匹配的文件路径,按相关程度排序: 文件名或标题与关键词相同的在前,其次是以关键词开头的,
+            再按全文索引的 bm25 得分(短关键词按文件名长度,越短与关键词越接近)
+        """
+        sql, params = self._match(keyword)
+        pattern = _escape_like(keyword)
+        tier = (
+            "CASE WHEN tracks.name LIKE ? ESCAPE '\\' OR tracks.title LIKE ? ESCAPE '\\' THEN 0 "
+            "WHEN tracks.name LIKE ? ESCAPE '\\' OR tracks.title LIKE ? ESCAPE '\\' THEN 1 "
+            "ELSE 2 END"
+        )
+        params += (pattern, pattern, pattern + "%", pattern + "%")
+        order = [tier, "length(tracks.name)", "tracks.name", "tracks.path"]
+        if sql.startswith("tracks_fts"):
+            order.insert(1, "bm25(tracks_fts)")
+        sql = f"SELECT tracks.path FROM {sql} ORDER BY {', '.join(order)}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def count(self, keyword: str) -> int:
+        """
+        统计匹配的文件数
+
+        Args:
+            keyword: 关键词
+
+        Returns:
+            匹配数量
+        """
+        sql, params = self._match(keyword)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {sql}", params).fetchone()[0]
+
+    def fuzzy_index(self) -> FuzzyIndex:
+        """
+        获取模糊搜索索引: 只有第一次在调用方线程建立,之后音乐库的变化由后台线程重建,
+        重建期间返回旧的索引
+
+        Returns:
+            模糊搜索索引
+        """
+        with self._fuzzy_lock:
+            if self._fuzzy is not None:
+                return self._fuzzy
+
+        with self._lock:
+            if self._fuzzy is None:
+                version = self.version
+                index = self._build_fuzzy(self._conn.execute("SELECT id, name FROM tracks"))
+                with self._fuzzy_lock:
+                    self._fuzzy, self._fuzzy_version = index, version
+            return self._fuzzy
+
+    def _build_fuzzy(self, rows: Iterable[Tuple[int, str]]) -> FuzzyIndex:
+        """建立模糊搜索索引"""
+        started = time.perf_counter()
+        index = FuzzyIndex(rows)
+        logger.info(
+            f"模糊搜索索引: {len(index)} 首, 耗时 {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return index
+
+    def _schedule_fuzzy_rebuild(self):
+        """音乐库变化后在后台线程重建模糊搜索索引(尚未建立过索引时等第一次使用再建立)"""
+        with self._fuzzy_lock:
+            if self._fuzzy is None or self._fuzzy_building:
+                # 正在重建时,重建结束前会再检查一次版本
+                return
+            self._fuzzy_building = True
+        threading.Thread(target=self._rebuild_fuzzy, name="fuzzy-index", daemon=True).start()
+
+    def _rebuild_fuzzy(self):
+        """重建模糊搜索索引直到与音乐库的版本一致,完成后替换旧的索引"""
+        try:
+            while True:
+                with self._fuzzy_lock:
+                    if self.closed or self._fuzzy_version == self.version:
+                        self._fuzzy_building = False
+                        return
+                with self._lock:
+                    if self.closed:
+                        continue
+                    version = self.version
+                    rows = self._conn.execute("SELECT id, name FROM tracks").fetchall()
+                # 在锁外建立,不阻塞查询和索引更新
+                index = self._build_fuzzy(rows)
+                with self._fuzzy_lock:
+                    self._fuzzy, self._fuzzy_version = index, version
+        except Exception as e:
+            logger.error(f"重建模糊搜索索引出错: {e}")
+            with self._fuzzy_lock:
+                self._fuzzy_building = False
+
+    def fuzzy_search(self, keyword: str, limit: int = 5) -> List[str]:
+        """
+        模糊搜索: 容忍同音错字,支持拼音和首字母
+
+        Args:
+            keyword: 关键词
+            limit: 最多返回的条数
+
+        Returns:
+            匹配的文件路径,按相近程度排序
+        """
+        matches = self.fuzzy_index().search(keyword, limit=limit)
+        if not matches:
+            return []
+
+        ids = [track_id for track_id, _ in matches]
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            paths = dict(
+                self._conn.execute(f"SELECT id, path FROM tracks WHERE id IN ({placeholders})", ids)
+            )
+        return [paths[track_id] for track_id in ids if track_id in paths]
+
+    def _match(self, keyword: str) -> Tuple[str, tuple]:
+        """生成匹配关键词的 FROM ... WHERE 子句"""
+        if self.fts and len(keyword) >= FTS_MIN_CHARS:
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            return (
+                "tracks_fts JOIN tracks ON tracks.id = tracks_fts.rowid WHERE tracks_fts MATCH ?",
+                (phrase,),
+            )
+
+        pattern = f"%{_escape_like(keyword)}%"
+        condition = " OR ".join(f"tracks.{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS)
+        return f"tracks WHERE {condition}", (pattern,) * len(SEARCH_COLUMNS)
+
+    def close(self):
+        """关闭索引"""
+        with self._lock:
+            self.closed = True
+            self._conn.close()
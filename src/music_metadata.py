@@ -0,0 +1,110 @@
+"""
+音乐元数据模块
+读取音乐文件的标签(ID3、Vorbis、MP4 等,需要 mutagen)和时长,大量文件时分块交给进程池并行读取
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import config
+from src.logger import logger
+
+# 保存到音乐库的标签字段
+TAG_FIELDS = ("artist", "album", "title")
+
+
+def read_metadata(path: str) -> Optional[Dict[str, Any]]:
+    """
+    读取单个文件的标签和时长
+
+    Args:
+        path: 音乐文件路径
+
+    Returns:
+        {"artist", "album", "title", "duration"},缺失的字段为None;无法解析时返回None
+    """
+    import mutagen
+
+    try:
+        audio = mutagen.File(path, easy=True)
+    except Exception:
+        return None
+    if audio is None:
+        return None
+
+    tags = audio.tags or {}
+    metadata: Dict[str, Any] = {}
+    for field in TAG_FIELDS:
+        try:
+            values = tags.get(field)
+        except Exception:
+            values = None
+        metadata[field] = (str(values[0]).strip() or None) if values else None
+
+    info = getattr(audio, "info", None)
+    metadata["duration"] = getattr(info, "length", None)
+    return metadata
+
+
+def read_metadata_batch(paths: Sequence[str]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    读取一批文件(在工作进程中执行,一次处理一块以减少进程间通信)
+
+    Args:
+        paths: 文件路径
+
+    Returns:
+        (路径, 元数据) 列表
+    """
+    return [(path, read_metadata(path)) for path in paths]
+
+
+class MetadataExtractor:
+    """并行读取元数据"""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        """
+        初始化
+
+        Args:
+            workers: 工作进程数,默认取配置(0 表示按 CPU 核数)
+            chunk_size: 每块的文件数,默认取配置
+        """
+        workers = config.MUSIC_METADATA_WORKERS if workers is None else workers
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or config.MUSIC_METADATA_CHUNK_SIZE
+
+    @staticmethod
+    def available() -> bool:
+        """是否安装了 mutagen"""
+        try:
+            import mutagen  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def extract(self, paths: Sequence[str]) -> Iterator[List[Tuple[str, Optional[Dict[str, Any]]]]]:
+        """
+        分块读取元数据,每完成一块就返回一块(调用方可以边读边写入)
+
+        Args:
+            paths: 文件路径
+
+        Yields:
+            一块文件的 (路径, 元数据) 列表
+        """
+        chunks = [paths[i : i + self.chunk_size] for i in range(0, len(paths), self.chunk_size)]
+        if self.workers <= 1 or len(chunks) <= 1:
+            # 文件不多时启动进程池反而更慢
+            for chunk in chunks:
+                yield read_metadata_batch(chunk)
+            return
+
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                yield from pool.map(read_metadata_batch, chunks)
+        except Exception as e:
+            logger.warning(f"进程池读取元数据失败,改为在当前进程读取: {e}")
+            for chunk in chunks:
+                yield read_metadata_batch(chunk)
@@ -0,0 +1,193 @@
+"""
+音乐目录监视模块
+监听音乐目录的文件系统事件(inotify 等,需要 watchdog),合并后批量写入音乐库索引;
+无法监听时退回定时增量刷新
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+import config
+from src.logger import logger
+from src.music_library import MusicLibrary
+
+
+class LibraryWatcher:
+    """音乐目录监视器"""
+
+    def __init__(
+        self,
+        library: MusicLibrary,
+        debounce: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        use_events: bool = True,
+    ):
+        """
+        初始化
+
+        Args:
+            library: 音乐库索引
+            debounce: 最后一个事件之后等待多久再写入(秒),期间的事件合并为一批,默认取配置
+            poll_interval: 退回定时刷新时的间隔(秒),默认取配置
+            use_events: 是否监听文件系统事件,False 时直接使用定时刷新
+        """
+        self.library = library
+        self.debounce = config.MUSIC_WATCH_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = (
+            config.MUSIC_WATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        )
+        self.use_events = use_events
+
+        # "events" 表示监听文件系统事件,"polling" 表示定时增量刷新
+        self.mode: Optional[str] = None
+        self.events = 0
+        self.batches = 0
+
+        self._changed: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._observer: Any = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """监视统计"""
+        return {"mode": self.mode, "events": self.events, "batches": self.batches}
+
+    def start(self):
+        """开始监视(应在首次刷新索引之前调用,刷新期间的变化也不会遗漏)"""
+        if self.use_events:
+            try:
+                self._observer = self._start_observer()
+                self.mode = "events"
+            except Exception as e:
+                logger.warning(f"无法监听音乐目录,改为每 {self.poll_interval}s 增量刷新: {e}")
+        if self._observer is None:
+            self.mode = "polling"
+
+        self._thread = threading.Thread(target=self._run, name="music-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"开始监视音乐目录: {self.library.root} ({self.mode})")
+
+    def stop(self):
+        """停止监视,并写入尚未处理的事件"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def notify(self, changed: Iterable[str] = (), deleted: Iterable[str] = ()):
+        """
+        记录文件系统事件(同一路径以最后一个事件为准)
+
+        Args:
+            changed: 新建、修改或移入的路径
+            deleted: 删除或移出的路径
+        """
+        with self._lock:
+            for path in deleted:
+                self._changed.discard(path)
+                self._deleted.add(path)
+                self.events += 1
+            for path in changed:
+                self._deleted.discard(path)
+                self._changed.add(path)
+                self.events += 1
+            self._last_event = time.monotonic()
+        self._wakeup.set()
+
+    def flush(self) -> Dict[str, int]:
+        """
+        把合并后的事件一次性写入索引
+
+        Returns:
+            新增、更新、移除的文件数
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            deleted, self._deleted = self._deleted, set()
+        if not changed and not deleted:
+            return {"added": 0, "updated": 0, "removed": 0}
+
+        self.batches += 1
+        try:
+            return self.library.apply_changes(changed=changed, deleted=deleted)
+        except Exception as e:
+            logger.error(f"更新音乐库索引出错: {e}")
+            return {"added": 0, "updated": 0, "removed": 0}
+
+    def _run(self):
+        """后台线程: 事件模式下防抖后批量写入,定时模式下周期性增量刷新"""
+        while not self._stop_event.is_set():
+            if self.mode == "polling":
+                if self._stop_event.wait(self.poll_interval):
+                    break
+                try:
+                    self.library.refresh()
+                except Exception as e:
+                    logger.error(f"刷新音乐库索引出错: {e}")
+                self._update_metadata()
+                continue
+
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 防抖: 等到最后一个事件之后安静 debounce 秒再写入
+            while not self._stop_event.is_set():
+                remaining = self._last_event + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._stop_event.wait(remaining)
+            if any(self.flush().values()):
+                self._update_metadata()
+
+    def _update_metadata(self):
+        """读取新增和修改过的文件的标签"""
+        if not config.MUSIC_METADATA_ENABLED:
+            return
+        try:
+            self.library.update_metadata()
+        except Exception as e:
+            logger.error(f"读取音乐标签出错: {e}")
+
+    def _start_observer(self) -> Any:
+        """启动 watchdog 观察者(Linux 上使用 inotify)"""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError as e:
+            raise RuntimeError("未安装 watchdog,请执行 pip install watchdog") from e
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            """把 watchdog 事件转交给监视器"""
+
+            def on_created(self, event):
+                watcher.notify(changed=[event.src_path])
+
+            def on_modified(self, event):
+                # 目录的修改事件只表示其中的条目有变化,条目本身会有单独的事件
+                if not event.is_directory:
+                    watcher.notify(changed=[event.src_path])
+
+            def on_deleted(self, event):
+                watcher.notify(deleted=[event.src_path])
+
+            def on_moved(self, event):
+                watcher.notify(changed=[event.dest_path], deleted=[event.src_path])
+
+        observer = Observer()
+        observer.schedule(Handler(), self.library.root, recursive=True)
+        observer.daemon = True
+        observer.start()
+        return observer
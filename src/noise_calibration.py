@@ -0,0 +1,143 @@
+"""
+环境噪音校准模块
+按输入设备保存校准结果,启动时直接复用;运行中根据非语音帧持续更新噪音基线
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import speech_recognition as sr
+
+import config
+from src.logger import logger
+
+
+def describe_device(source: sr.AudioSource) -> str:
+    """
+    生成输入设备的标识,用作校准结果的键
+
+    Args:
+        source: 音频输入源
+
+    Returns:
+        设备标识
+    """
+    if isinstance(source, sr.Microphone):
+        name = "default"
+        if source.device_index is not None:
+            try:
+                name = sr.Microphone.list_microphone_names()[source.device_index]
+            except Exception:
+                name = f"#{source.device_index}"
+        return f"mic:{name}:{source.SAMPLE_RATE}"
+
+    return type(source).__name__
+
+
+class CalibrationStore:
+    """按设备保存的校准结果(JSON 文件)"""
+
+    def __init__(self, path: Optional[str] = None, max_age: Optional[float] = None):
+        """
+        初始化
+
+        Args:
+            path: 文件路径,默认取配置
+            max_age: 校准结果的有效期(秒),过期后重新校准,默认取配置
+        """
+        self.path = path or config.CALIBRATION_FILE
+        self.max_age = config.CALIBRATION_MAX_AGE if max_age is None else max_age
+        self._lock = threading.Lock()
+
+    def get(self, device: str) -> Optional[float]:
+        """
+        读取设备的能量阈值
+
+        Args:
+            device: 设备标识
+
+        Returns:
+            能量阈值,没有记录或已过期时返回None
+        """
+        entry = self._load().get(device)
+        if not entry or time.time() - entry["updated"] > self.max_age:
+            return None
+        return entry["energy_threshold"]
+
+    def put(self, device: str, energy_threshold: float):
+        """
+        保存设备的能量阈值
+
+        Args:
+            device: 设备标识
+            energy_threshold: 能量阈值
+        """
+        with self._lock:
+            entries = self._load()
+            entries[device] = {"energy_threshold": energy_threshold, "updated": time.time()}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f"保存校准结果失败: {e}")
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """读取全部记录"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取校准结果失败: {e}")
+            return {}
+
+
+class AdaptiveNoiseFloor:
+    """自适应噪音基线: 用非语音帧的能量做指数滑动平均,阈值随环境变化"""
+
+    def __init__(
+        self,
+        energy_threshold: float,
+        rate: Optional[float] = None,
+        ratio: Optional[float] = None,
+        min_threshold: Optional[float] = None,
+    ):
+        """
+        初始化
+
+        Args:
+            energy_threshold: 初始能量阈值(通常来自校准)
+            rate: 每帧的更新速率(0-1),默认取配置
+            ratio: 阈值与噪音基线的倍数,默认取配置
+            min_threshold: 阈值下限,避免在极安静的环境中过于敏感,默认取配置
+        """
+        self.rate = config.NOISE_ADAPT_RATE if rate is None else rate
+        self.ratio = config.NOISE_THRESHOLD_RATIO if ratio is None else ratio
+        self.min_threshold = config.NOISE_MIN_THRESHOLD if min_threshold is None else min_threshold
+        self.noise_floor = energy_threshold / self.ratio
+
+    @property
+    def threshold(self) -> float:
+        """当前能量阈值"""
+        return max(self.min_threshold, self.noise_floor * self.ratio)
+
+    def update(self, energies: Iterable[float]) -> float:
+        """
+        用非语音帧的能量更新噪音基线
+
+        Args:
+            energies: 非语音帧的 RMS 能量
+
+        Returns:
+            更新后的能量阈值
+        """
+        for energy in energies:
+            self.noise_floor += (float(energy) - self.noise_floor) * self.rate
+        return self.threshold
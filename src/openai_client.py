@@ -0,0 +1,190 @@
+"""
+OpenAI 客户端工厂
+进程内共享一个带连接池的客户端,支持启动预热和空闲保活
+"""
+
+import threading
+import time
+from typing import Optional
+
+import httpx
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, OpenAI
+
+import config
+from src.logger import logger
+
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+_client_lock = threading.Lock()
+
+# 最近一次发出请求的时间,用于判断连接是否空闲
+_last_activity = 0.0
+
+
+def _mark_activity(request: httpx.Request):
+    """记录请求时间"""
+    global _last_activity
+    _last_activity = time.monotonic()
+
+
+async def _mark_activity_async(request: httpx.Request):
+    """记录请求时间(异步客户端)"""
+    _mark_activity(request)
+
+
+def _pool_limits() -> httpx.Limits:
+    """连接池参数"""
+    return httpx.Limits(
+        max_connections=config.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.LLM_MAX_CONNECTIONS,
+        keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    """超时策略"""
+    return httpx.Timeout(config.LLM_TIMEOUT, connect=config.LLM_CONNECT_TIMEOUT)
+
+
+def _build_http_client() -> httpx.Client:
+    """构建带连接池、超时策略和 keep-alive 的 HTTP 客户端"""
+    return httpx.Client(
+        limits=_pool_limits(),
+        timeout=_timeout(),
+        event_hooks={"request": [_mark_activity]},
+    )
+
+
+def get_openai_client() -> OpenAI:
+    """
+    获取进程内共享的 OpenAI 客户端
+
+    Returns:
+        OpenAI 客户端(API key 和 base_url 从环境变量读取)
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(
+                http_client=_build_http_client(),
+                max_retries=config.LLM_MAX_RETRIES,
+            )
+        return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    获取进程内共享的 AsyncOpenAI 客户端,连接池参数与同步客户端一致
+
+    Returns:
+        AsyncOpenAI 客户端
+    """
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncOpenAI(
+                http_client=httpx.AsyncClient(
+                    limits=_pool_limits(),
+                    timeout=_timeout(),
+                    event_hooks={"request": [_mark_activity_async]},
+                ),
+                max_retries=config.LLM_MAX_RETRIES,
+            )
+        return _async_client
+
+
+def reset_openai_client():
+    """关闭并丢弃共享客户端,下次获取时按当前环境重新创建"""
+    global _client, _async_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        # 异步客户端绑定在创建它的事件循环上,这里只丢弃引用
+        _async_client = None
+
+
+def warm_up(client: Optional[OpenAI] = None) -> Optional[float]:
+    """
+    预热连接: 发一个轻量请求,提前完成 DNS 解析和 TCP/TLS 握手
+
+    Args:
+        client: 要预热的客户端,默认使用共享客户端
+
+    Returns:
+        预热请求耗时(秒),失败时返回None
+    """
+    client = client or get_openai_client()
+    started = time.perf_counter()
+    try:
+        client.with_options(max_retries=0).models.list()
+    except APIConnectionError as e:
+        logger.warning(f"大模型连接预热失败: {e}")
+        return None
+    except APIStatusError as e:
+        # 请求被拒绝(如鉴权失败)时连接也已建立,预热依然有效
+        logger.debug(f"连接预热请求返回 {e.status_code}")
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"大模型连接预热完成: {elapsed * 1000:.0f}ms")
+    return elapsed
+
+
+async def async_warm_up(client: Optional[AsyncOpenAI] = None) -> Optional[float]:
+    """
+    预热异步客户端的连接
+
+    Args:
+        client: 要预热的客户端,默认使用共享异步客户端
+
+    Returns:
+        预热请求耗时(秒),失败时返回None
+    """
+    client = client or get_async_openai_client()
+    started = time.perf_counter()
+    try:
+        await client.with_options(max_retries=0).models.list()
+    except APIConnectionError as e:
+        logger.warning(f"大模型连接预热失败: {e}")
+        return None
+    except APIStatusError as e:
+        logger.debug(f"连接预热请求返回 {e.status_code}")
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"大模型异步连接预热完成: {elapsed * 1000:.0f}ms")
+    return elapsed
+
+
+class KeepAlivePinger:
+    """空闲保活: 会话空闲一段时间后发送轻量请求,避免连接被服务端回收"""
+
+    def __init__(self, interval: Optional[float] = None):
+        """
+        初始化保活器
+
+        Args:
+            interval: 空闲多久(秒)后发送保活请求,默认取配置
+        """
+        self.interval = config.LLM_KEEPALIVE_INTERVAL if interval is None else interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动后台保活线程"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="llm-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台保活线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self):
+        """保活循环"""
+        while not self._stop_event.wait(self.interval / 2):
+            if time.monotonic() - _last_activity >= self.interval:
+                warm_up()
@@ -0,0 +1,240 @@
+"""
+规划缓存模块
+缓存常见指令对应的函数调用计划,重复或相近的说法可以跳过大模型直接执行
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+import config
+from src.logger import logger
+
+# 归一化时去掉的标点和空白
+PUNCTUATION_PATTERN = re.compile(r"[\s\.,!?;:'\"、。,!?;:~…]+")
+
+# 数字必须完全一致才算相近(“音量调到50”与“音量调到60”是不同的指令)
+DIGITS_PATTERN = re.compile(r"\d+")
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    归一化用户输入: 全角转半角、转小写、去掉标点和空白
+
+    Args:
+        text: 用户输入
+
+    Returns:
+        归一化后的文本
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return PUNCTUATION_PATTERN.sub("", text)
+
+
+def schema_fingerprint(tools: List[Dict[str, Any]]) -> str:
+    """
+    计算函数定义的指纹,函数定义变化后旧的缓存自动失效
+
+    Args:
+        tools: get_available_functions 返回的函数定义
+
+    Returns:
+        指纹字符串
+    """
+    data = json.dumps(tools, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def char_ngrams(text: str, n: int = 2) -> Set[str]:
+    """
+    提取字符 n-gram
+
+    Args:
+        text: 文本
+        n: n-gram 长度
+
+    Returns:
+        n-gram 集合
+    """
+    if len(text) <= n:
+        return {text}
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class PlanCache:
+    """函数调用计划缓存(LRU + TTL + 磁盘持久化)"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        similarity: Optional[float] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: 持久化文件路径,默认取配置;传空字符串表示只缓存在内存中
+            max_entries: 最大条目数,默认取配置
+            ttl: 条目有效期(秒),默认取配置
+            similarity: 相近说法的 n-gram 相似度阈值,默认取配置
+        """
+        self.path = config.PLAN_CACHE_FILE if path is None else path
+        self.max_entries = config.PLAN_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = config.PLAN_CACHE_TTL if ttl is None else ttl
+        self.similarity = config.PLAN_CACHE_SIMILARITY if similarity is None else similarity
+
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ngrams: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """命中统计"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+        }
+
+    def get(self, utterance: str, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        查找计划: 先精确匹配,再按字符 n-gram 相似度查找相近说法
+
+        Args:
+            utterance: 用户输入
+            fingerprint: 函数定义指纹
+
+        Returns:
+            函数调用计划(每项包含 name 和 arguments),未命中返回None
+        """
+        normalized = normalize_utterance(utterance)
+        key = f"{fingerprint}|{normalized}"
+
+        with self._lock:
+            self._evict_expired()
+
+            entry = self._entries.get(key)
+            if entry is None:
+                key = self._find_similar(normalized, fingerprint)
+                entry = self._entries.get(key) if key else None
+                if entry is not None:
+                    self.fuzzy_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                logger.info(f"规划缓存未命中: '{utterance}' {self.stats}")
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            logger.info(f"规划缓存命中: '{utterance}' -> '{entry['utterance']}' {self.stats}")
+            return entry["plan"]
+
+    def put(self, utterance: str, fingerprint: str, plan: List[Dict[str, Any]]):
+        """
+        写入计划
+
+        Args:
+            utterance: 用户输入
+            fingerprint: 函数定义指纹
+            plan: 函数调用计划,每项包含 name 和 arguments
+        """
+        normalized = normalize_utterance(utterance)
+        if not normalized:
+            return
+
+        key = f"{fingerprint}|{normalized}"
+        with self._lock:
+            self._entries[key] = {
+                "utterance": normalized,
+                "fingerprint": fingerprint,
+                "plan": [{"name": c["name"], "arguments": c["arguments"]} for c in plan],
+                "created": time.time(),
+            }
+            self._entries.move_to_end(key)
+            self._ngrams[key] = char_ngrams(normalized)
+
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._ngrams.pop(oldest, None)
+
+            self._save()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._ngrams.clear()
+            self._save()
+
+    def _find_similar(self, normalized: str, fingerprint: str) -> Optional[str]:
+        """按 n-gram Jaccard 相似度查找最相近的条目"""
+        grams = char_ngrams(normalized)
+        digits = DIGITS_PATTERN.findall(normalized)
+
+        best_key, best_score = None, self.similarity
+        for key, entry in self._entries.items():
+            if entry["fingerprint"] != fingerprint:
+                continue
+            if DIGITS_PATTERN.findall(entry["utterance"]) != digits:
+                continue
+
+            other = self._ngrams[key]
+            score = len(grams & other) / len(grams | other)
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        return best_key
+
+    def _evict_expired(self):
+        """移除过期条目"""
+        deadline = time.time() - self.ttl
+        expired = [key for key, entry in self._entries.items() if entry["created"] < deadline]
+        for key in expired:
+            del self._entries[key]
+            self._ngrams.pop(key, None)
+
+    def _load(self):
+        """从磁盘加载缓存"""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取规划缓存失败: {e}")
+            return
+
+        for key, entry in entries:
+            self._entries[key] = entry
+            self._ngrams[key] = char_ngrams(entry["utterance"])
+        self._evict_expired()
+
+    def _save(self):
+        """写入磁盘(先写临时文件再替换,避免写一半时中断导致文件损坏)"""
+        if not self.path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(self._entries.items()), f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"保存规划缓存失败: {e}")
@@ -3,26 +3,113 @@
 负责将语音转换为文本
 """
 
+import math
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import speech_recognition as sr
 
 import config
 from src.logger import logger
+from src.noise_calibration import AdaptiveNoiseFloor, CalibrationStore, describe_device
+from src.stt_backends import STTBackend, create_backends
+from src.vad import VoiceActivityDetector, frame_features
+from src.wake_word import PrefixedSource, WakeWordSpotter
 
 
 class SpeechRecognizer:
     """语音识别器"""
 
-    def __init__(self):
-        """初始化识别器"""
+    def __init__(
+        self,
+        microphone: Optional[sr.AudioSource] = None,
+        calibrate: bool = True,
+        backends: Optional[List[STTBackend]] = None,
+    ):
+        """
+        初始化识别器
+
+        Args:
+            microphone: 音频输入源,默认使用系统麦克风(测试和基准中可替换为音频文件)
+            calibrate: 是否在启动时校准环境噪音(优先复用该设备已保存的校准结果)
+            backends: 识别后端,按顺序尝试,默认按配置创建(本地模型在此时加载)
+        """
+        started = time.perf_counter()
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.microphone = microphone if microphone is not None else sr.Microphone()
+        self.backends = backends if backends is not None else create_backends()
+        self.vad = VoiceActivityDetector() if config.VAD_ENABLED else None
+        self.wake_word = self._load_wake_word() if config.WAKE_WORD_ENABLED else None
+
+        # 持续监听模式: 录音线程切分语句放入音频队列,识别线程把结果放入文本队列
+        self._audio_queue: "queue.Queue[sr.AudioData]" = queue.Queue(
+            maxsize=config.SPEECH_CAPTURE_QUEUE_SIZE
+        )
+        self._transcripts: "queue.Queue[str]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.dropped = 0
+
+        # 识别统计: 识别结果为空的语句计为误触发
+        self.utterances = 0
+        self.false_triggers = 0
+
+        # 最近一次打断朗读的耗时(从用户开始说话到朗读停止)
+        self.last_barge_in: Optional[float] = None
+
+        self.device = describe_device(self.microphone)
+        self.calibration_store = CalibrationStore() if calibrate else None
+        if calibrate:
+            self._calibrate()
+        if self.vad is not None and config.NOISE_ADAPTIVE:
+            self.vad.noise_floor = AdaptiveNoiseFloor(self.recognizer.energy_threshold)
+
+        self.startup_seconds = time.perf_counter() - started
+        logger.info(f"语音识别初始化耗时 {self.startup_seconds * 1000:.0f}ms")
+
+    def _load_wake_word(self) -> Optional[WakeWordSpotter]:
+        """加载唤醒词模板,不可用时关闭唤醒词"""
+        try:
+            return WakeWordSpotter.load()
+        except Exception as e:
+            logger.warning(f"唤醒词模板不可用,已关闭唤醒词: {e}")
+            return None
+
+    def _calibrate(self):
+        """校准环境噪音,该设备有未过期的校准结果时直接复用,不阻塞启动"""
+        saved = self.calibration_store.get(self.device)
+        if saved is not None:
+            self.recognizer.energy_threshold = saved
+            logger.info(f"使用已保存的噪音校准: {self.device} 阈值 {saved:.0f}")
+            return
 
         # 调整环境噪音
         print("正在校准环境噪音...")
         with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            self.recognizer.adjust_for_ambient_noise(source, duration=config.CALIBRATION_DURATION)
+        self.calibration_store.put(self.device, self.recognizer.energy_threshold)
         print("校准完成!")
 
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """启动耗时、误触发率和当前能量阈值"""
+        return {
+            "startup_ms": round(self.startup_seconds * 1000),
+            "utterances": self.utterances,
+            "false_triggers": self.false_triggers,
+            "false_trigger_rate": self.false_triggers / self.utterances if self.utterances else 0.0,
+            "energy_threshold": round(self.recognizer.energy_threshold),
+        }
+
+    def save_calibration(self):
+        """保存运行中自适应调整后的能量阈值,下次启动直接使用"""
+        logger.info(f"语音识别统计: {self.stats}")
+        if self.calibration_store is not None:
+            self.calibration_store.put(self.device, self.recognizer.energy_threshold)
+
     def listen(self) -> str:
         """
         监听并识别语音
@@ -30,36 +117,220 @@ class SpeechRecognizer:
         Returns:
             识别出的文本,如果识别失败返回空字符串
         """
+        if self.listening:
+            # 持续监听模式下只取出已经识别好的文本
+            return self.get_transcript(timeout=config.SPEECH_RECOGNITION_TIMEOUT)
+
         try:
-            print("\n🎤 请说话...")
-            with self.microphone as source:
-                # 监听音频
-                audio = self.recognizer.listen(
-                    source, timeout=config.SPEECH_RECOGNITION_TIMEOUT, phrase_time_limit=10
-                )
+            print("\n💤 等待唤醒词..." if self.wake_word else "\n🎤 请说话...")
+            audio = self.capture()
+        except sr.WaitTimeoutError:
+            logger.warning("等待超时,未检测到语音")
+            return ""
+        except Exception as e:
+            logger.error(f"发生错误: {e}")
+            return ""
 
-            print("🔄 正在识别...")
+        if not audio.frame_data:
+            # 等待唤醒词时输入流结束或收到停止信号,没有录到音频,不送去识别
+            return ""
 
-            # 使用Google Speech Recognition识别
-            text = self.recognizer.recognize_google(
-                audio, language=config.SPEECH_RECOGNITION_LANGUAGE
-            )
+        print("🔄 正在识别...")
+        return self._recognize_safely(audio)
+
+    def _recognize_safely(self, audio: sr.AudioData) -> str:
+        """
+        识别一段音频,出错时记录日志
+
+        Args:
+            audio: 录制的音频
 
+        Returns:
+            识别出的文本,识别失败返回空字符串
+        """
+        self.utterances += 1
+        try:
+            text = self.recognize(audio)
             print(f"✅ 识别结果: {text}")
             return text
 
-        except sr.WaitTimeoutError:
-            logger.warning("等待超时,未检测到语音")
-            return ""
         except sr.UnknownValueError:
             logger.warning("无法识别语音内容")
+            # 误触发: 这段音频多半是噪音,计入噪音基线
+            self.false_triggers += 1
+            if self.vad is not None:
+                self.vad.learn_noise(audio)
+                self.recognizer.energy_threshold = self.vad.energy_threshold
             return ""
         except sr.RequestError as e:
             logger.error(f"识别服务出错: {e}")
             return ""
         except Exception as e:
             logger.error(f"发生错误: {e}")
-            return ""   def listen_once(self) -> str:
+            return ""
+
+    def barge_in(
+        self, speaking: Callable[[], bool], interrupt: Callable[[], None]
+    ) -> Optional[str]:
+        """
+        朗读期间监听麦克风: 检测到用户说话立即打断朗读,接着录完这句话直接识别
+
+        Args:
+            speaking: 返回是否仍在朗读
+            interrupt: 停止朗读并清空排队的内容,返回时应已静音
+
+        Returns:
+            识别出的文本;朗读结束前没有检测到说话(或处于持续监听模式)返回None
+        """
+        if self.listening:
+            return None
+
+        try:
+            with self.microphone as source:
+                detected = self._wait_barge_in(source, speaking)
+                if detected is None:
+                    return None
+
+                prefix, speech_started = detected
+                interrupt()
+                self.last_barge_in = time.perf_counter() - speech_started
+                logger.info(f"打断朗读: 从开始说话到停止朗读 {self.last_barge_in * 1000:.0f}ms")
+
+                # 打断时已读入的语音接在这句话前面,不再等待唤醒词
+                print("✋ 已打断,请继续说...")
+                audio = self._listen_phrase(
+                    PrefixedSource(source, prefix),
+                    timeout=config.SPEECH_RECOGNITION_TIMEOUT,
+                    wake_word=False,
+                )
+        except sr.WaitTimeoutError:
+            return ""
+        except Exception as e:
+            logger.error(f"打断监听出错: {e}")
+            return None
+
+        print("🔄 正在识别...")
+        return self._recognize_safely(audio)
+
+    def _wait_barge_in(
+        self, source: sr.AudioSource, speaking: Callable[[], bool]
+    ) -> Optional[Tuple[bytes, float]]:
+        """
+        朗读期间按帧检测用户是否开始说话(只看能量,阈值按倍数抬高以忽略扬声器的声音)
+
+        Args:
+            source: 已打开的音频源
+            speaking: 返回是否仍在朗读
+
+        Returns:
+            (开始说话以来读入的音频, 开始说话的时刻);朗读结束或输入流结束返回None
+        """
+        frame_length = int(source.SAMPLE_RATE * config.VAD_FRAME_MS / 1000)
+        frame_bytes = frame_length * source.SAMPLE_WIDTH
+        frame_seconds = frame_length / source.SAMPLE_RATE
+        start_frames = max(1, math.ceil(config.BARGE_IN_SPEECH_MS / config.VAD_FRAME_MS))
+        pad_frames = math.ceil(config.VAD_PADDING_MS / config.VAD_FRAME_MS)
+        threshold = self.recognizer.energy_threshold * config.BARGE_IN_THRESHOLD_RATIO
+
+        pre_roll: deque = deque(maxlen=start_frames + pad_frames)
+        speech_run = 0
+        while speaking():
+            data = source.stream.read(frame_length)
+            if len(data) < frame_bytes:
+                return None
+
+            rms, _ = frame_features(data, source.SAMPLE_WIDTH, frame_length)
+            pre_roll.append(data)
+            speech_run = speech_run + 1 if rms[0] > threshold else 0
+            if speech_run >= start_frames:
+                return b"".join(pre_roll), time.perf_counter() - speech_run * frame_seconds
+
+        return None
+
+    def capture(self) -> sr.AudioData:
+        """
+        从输入源录制一句话
+
+        Returns:
+            录制的音频
+        """
+        with self.microphone as source:
+            # 监听音频
+            return self._listen_phrase(source, timeout=config.SPEECH_RECOGNITION_TIMEOUT)
+
+    def _listen_phrase(
+        self, source: sr.AudioSource, timeout: float, wake_word: bool = True
+    ) -> sr.AudioData:
+        """
+        从已打开的输入源切分出一句话
+
+        Args:
+            source: 已打开的音频源
+            timeout: 等待开始说话的最长时间(秒)
+            wake_word: 启用唤醒词时是否先等待唤醒词
+
+        Returns:
+            录制的音频
+        """
+        if wake_word and self.wake_word is not None:
+            # 先在本地等待唤醒词,唤醒后再录制指令;唤醒词之后已读入的音频接在指令前面
+            self.wake_word.energy_threshold = self.recognizer.energy_threshold
+            prefix = self.wake_word.wait(
+                source, timeout=timeout, should_stop=self._stop_event.is_set
+            )
+            if prefix is None:
+                return sr.AudioData(b"", source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            print("👂 已唤醒,请说指令...")
+            source = PrefixedSource(source, prefix)
+            timeout = config.WAKE_WORD_COMMAND_TIMEOUT
+
+        if self.vad is None:
+            return self.recognizer.listen(
+                source, timeout=timeout, phrase_time_limit=config.SPEECH_PHRASE_TIME_LIMIT
+            )
+
+        # 端点检测沿用校准得到的能量阈值,自适应调整后的阈值再同步回来
+        self.vad.energy_threshold = self.recognizer.energy_threshold
+        try:
+            return self.vad.listen(
+                source, timeout=timeout, phrase_time_limit=config.SPEECH_PHRASE_TIME_LIMIT
+            )
+        finally:
+            self.recognizer.energy_threshold = self.vad.energy_threshold
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """
+        识别一段音频
+
+        Args:
+            audio: 录制的音频
+
+        Returns:
+            识别出的文本
+
+        Raises:
+            sr.UnknownValueError: 没有识别出内容
+            sr.RequestError: 所有后端都不可用
+        """
+        error: Optional[Exception] = None
+        for backend in self.backends:
+            started = time.perf_counter()
+            try:
+                text = backend.recognize(audio)
+            except sr.RequestError as e:
+                # 当前后端不可用,这一句换下一个后端识别
+                logger.warning(f"识别后端 {backend.name} 出错,尝试下一个: {e}")
+                error = e
+                continue
+
+            logger.debug(
+                f"识别后端 {backend.name} 耗时 {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+            return text
+
+        raise error or sr.RequestError("没有可用的识别后端")
+
+    def listen_once(self) -> str:
         """
         监听一次语音输入
 
@@ -67,3 +338,94 @@ class SpeechRecognizer:
             识别出的文本
         """
         return self.listen()
+
+    @property
+    def listening(self) -> bool:
+        """是否处于持续监听模式"""
+        return bool(self._threads)
+
+    def start_background(self):
+        """启动持续监听: 麦克风保持打开,录音和识别分别在后台线程进行"""
+        if self.listening:
+            return
+
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="stt-capture", daemon=True),
+            threading.Thread(target=self._recognize_loop, name="stt-recognize", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("持续监听已启动")
+
+    def stop_background(self):
+        """停止持续监听"""
+        if not self.listening:
+            return
+
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        self._stop_event.clear()
+        logger.info(f"持续监听已停止,丢弃语句 {self.dropped} 句")
+
+    def get_transcript(self, timeout: Optional[float] = None) -> str:
+        """
+        取出一句已识别的文本
+
+        Args:
+            timeout: 最长等待时间(秒),None 表示一直等待
+
+        Returns:
+            识别出的文本,超时返回空字符串
+        """
+        try:
+            return self._transcripts.get(timeout=timeout)
+        except queue.Empty:
+            return ""
+
+    def _capture_loop(self):
+        """录音线程: 保持输入流打开,逐句切分后放入音频队列"""
+        try:
+            with self.microphone as source:
+                while not self._stop_event.is_set():
+                    try:
+                        # 超时较短,以便及时响应停止信号
+                        audio = self._listen_phrase(source, timeout=1)
+                    except sr.WaitTimeoutError:
+                        continue
+
+                    if not audio.frame_data:
+                        # 输入流已结束(如音频文件读完)
+                        break
+                    self._enqueue(audio)
+
+        except Exception as e:
+            logger.error(f"持续监听录音出错: {e}")
+
+    def _enqueue(self, audio: sr.AudioData):
+        """放入音频队列,队列满时丢弃最早的一句,优先保留最新的输入"""
+        while True:
+            try:
+                self._audio_queue.put_nowait(audio)
+                return
+            except queue.Full:
+                try:
+                    self._audio_queue.get_nowait()
+                    self.dropped += 1
+                    logger.warning(f"待识别语句过多,丢弃最早的一句 (累计 {self.dropped})")
+                except queue.Empty:
+                    pass
+
+    def _recognize_loop(self):
+        """识别线程: 从音频队列取出语句识别,结果放入文本队列"""
+        while not self._stop_event.is_set():
+            try:
+                audio = self._audio_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            text = self._recognize_safely(audio)
+            if text:
+                self._transcripts.put(text)
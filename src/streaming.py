@@ -0,0 +1,122 @@
+"""
+流式输出模块
+负责拼接大模型的流式增量,并按句切分以便尽早送入语音合成
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# 句子结束标点: 中文句末标点、换行,以及后跟空白的西文句末标点(避免切开 3.14 之类的数字)
+SENTENCE_END_PATTERN = re.compile(r"[。！？!?；;…\n]+|[.](?=\s)")
+
+
+class SentenceSplitter:
+    """流式文本分句器"""
+
+    def __init__(self, min_length: int = 2):
+        """
+        初始化分句器
+
+        Args:
+            min_length: 一句话的最少字符数,过短的片段会并入下一句
+        """
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        追加一段文本增量
+
+        Args:
+            text: 新到达的文本片段
+
+        Returns:
+            已经完整的句子列表
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_PATTERN.finditer(self._buffer):
+            end = match.end()
+            sentence = self._buffer[start:end].strip()
+            if len(sentence) < self.min_length:
+                continue
+            sentences.append(sentence)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """
+        取出缓冲区中剩余的文本
+
+        Returns:
+            剩余文本,没有则返回None
+        """
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest or None
+
+
+class StreamAccumulator:
+    """流式补全累加器,拼接文本增量与工具调用增量"""
+
+    def __init__(self, on_sentence: Optional[Callable[[str], None]] = None):
+        """
+        初始化累加器
+
+        Args:
+            on_sentence: 每凑满一句话时的回调
+        """
+        self.on_sentence = on_sentence
+        self.splitter = SentenceSplitter()
+        self._content_parts: List[str] = []
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+
+    def add_chunk(self, chunk: Any):
+        """
+        处理一个流式分片
+
+        Args:
+            chunk: chat.completions 流式返回的分片
+        """
+        if not chunk.choices:
+            return
+
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            self._content_parts.append(delta.content)
+            if self.on_sentence:
+                for sentence in self.splitter.feed(delta.content):
+                    self.on_sentence(sentence)
+
+        # 工具调用按 index 分片到达,参数字符串需要逐段拼接
+        for tool_call in delta.tool_calls or []:
+            entry = self._tool_calls.setdefault(
+                tool_call.index,
+                {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+            )
+            if tool_call.id:
+                entry["id"] = tool_call.id
+            if tool_call.function:
+                if tool_call.function.name:
+                    entry["function"]["name"] = tool_call.function.name
+                if tool_call.function.arguments:
+                    entry["function"]["arguments"] += tool_call.function.arguments
+
+    def finish(self) -> tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        结束流式读取
+
+        Returns:
+            (完整回复文本, 工具调用列表) 的元组
+        """
+        if self.on_sentence:
+            rest = self.splitter.flush()
+            if rest:
+                self.on_sentence(rest)
+
+        content = "".join(self._content_parts) or None
+        tool_calls = [self._tool_calls[index] for index in sorted(self._tool_calls)]
+        return content, tool_calls
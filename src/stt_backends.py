@@ -0,0 +1,145 @@
+"""
+语音识别后端模块
+统一在线识别服务和本地离线引擎的接口,识别失败时可以逐句切换到下一个后端
+"""
+
+import json
+from typing import Dict, List, Optional, Type
+
+import speech_recognition as sr
+
+import config
+from src.logger import logger
+
+
+class STTBackend:
+    """语音识别后端基类"""
+
+    name = "base"
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """
+        识别一段音频
+
+        Args:
+            audio: 录制的音频
+
+        Returns:
+            识别出的文本
+
+        Raises:
+            sr.UnknownValueError: 没有识别出内容
+            sr.RequestError: 后端不可用(网络错误、服务出错等),可以换下一个后端重试
+        """
+        raise NotImplementedError
+
+
+class GoogleBackend(STTBackend):
+    """Google 在线语音识别"""
+
+    name = "google"
+
+    def __init__(self, language: Optional[str] = None):
+        """
+        初始化
+
+        Args:
+            language: 识别语言,默认取配置
+        """
+        self.language = language or config.SPEECH_RECOGNITION_LANGUAGE
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """调用在线服务识别"""
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class VoskBackend(STTBackend):
+    """Vosk 本地离线识别,模型在初始化时加载一次并常驻内存"""
+
+    name = "vosk"
+
+    # Vosk 模型要求的采样参数
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, model_path: Optional[str] = None):
+        """
+        加载模型
+
+        Args:
+            model_path: 模型目录,默认取配置
+
+        Raises:
+            RuntimeError: 未安装 vosk 或模型加载失败
+        """
+        try:
+            import vosk
+        except ImportError as e:
+            raise RuntimeError("未安装 vosk,请执行 pip install vosk") from e
+
+        model_path = model_path or config.VOSK_MODEL_PATH
+        try:
+            vosk.SetLogLevel(-1)
+            self.model = vosk.Model(model_path)
+        except Exception as e:
+            raise RuntimeError(f"加载 Vosk 模型失败: {model_path} ({e})") from e
+
+        self._vosk = vosk
+        logger.info(f"Vosk 模型已加载: {model_path}")
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """使用本地模型识别"""
+        recognizer = self._vosk.KaldiRecognizer(self.model, self.SAMPLE_RATE)
+        recognizer.AcceptWaveform(
+            audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=self.SAMPLE_WIDTH)
+        )
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+
+        # 中文模型按字输出,字与字之间有空格
+        if config.SPEECH_RECOGNITION_LANGUAGE.startswith("zh"):
+            text = text.replace(" ", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+# 后端名称与实现的对应关系
+STT_BACKENDS: Dict[str, Type[STTBackend]] = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def create_backends(names: Optional[List[str]] = None) -> List[STTBackend]:
+    """
+    按顺序创建识别后端,不可用的后端跳过
+
+    Args:
+        names: 后端名称列表,默认为配置中的主后端加备用后端
+
+    Returns:
+        可用的后端列表
+    """
+    if names is None:
+        names = [config.STT_BACKEND] + [
+            name for name in config.STT_FALLBACK_BACKENDS if name != config.STT_BACKEND
+        ]
+
+    backends = []
+    for name in names:
+        backend_class = STT_BACKENDS.get(name)
+        if backend_class is None:
+            logger.warning(f"未知的语音识别后端: {name}")
+            continue
+        try:
+            backends.append(backend_class())
+        except Exception as e:
+            logger.warning(f"语音识别后端 {name} 不可用: {e}")
+
+    if not backends:
+        logger.warning("没有可用的语音识别后端,使用 Google 在线识别")
+        backends.append(GoogleBackend())
+
+    logger.info(f"语音识别后端: {', '.join(backend.name for backend in backends)}")
+    return backends
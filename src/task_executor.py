@@ -3,8 +3,11 @@
 负责解析和执行函数调用
 """
 
-from typing import Any, Dict
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
+import config
 from src.controllers.app_controller import AppController
 from src.controllers.file_controller import FileController
 from src.controllers.music_controller import MusicController
@@ -12,6 +15,18 @@ from src.controllers.system_controller import SystemController
 from src.controllers.writing_controller import WritingController
 from src.logger import logger
 
+# 函数名到所属控制器的映射,同一控制器上的调用需要保持先后顺序
+FUNCTION_CONTROLLERS = {
+    "play_music": "music",
+    "search_music": "music",
+    "music_queue": "music",
+    "find_and_play": "music",
+    "write_article": "writing",
+    "open_application": "app",
+    "file_operation": "file",
+    "system_control": "system",
+}
+
 
 class TaskExecutor:
     """任务执行引擎"""
@@ -24,6 +39,11 @@ class TaskExecutor:
         self.app_controller = AppController()
         self.system_controller = SystemController()
 
+        # 批量执行工具调用的线程池
+        self._pool = ThreadPoolExecutor(
+            max_workers=config.TOOL_EXECUTOR_MAX_WORKERS, thread_name_prefix="tool"
+        )
+
     def execute(self, function_name: str, arguments: Dict[str, Any]) -> str:
         """
         执行函数调用
@@ -58,6 +78,12 @@ class TaskExecutor:
             elif function_name == "search_music":
                 return self._handle_search_music(arguments)
 
+            elif function_name == "music_queue":
+                return self._handle_music_queue(arguments)
+
+            elif function_name == "find_and_play":
+                return self._handle_find_and_play(arguments)
+
             else:
                 logger.error(f"未知的函数 - {function_name}")
             return f"错误: 未知的函数 - {function_name}"
@@ -66,15 +92,57 @@ class TaskExecutor:
             logger.error(f"执行函数 {function_name} 时出错: {str(e)}")
             return f"执行函数时出错: {str(e)}"
 
+    def execute_batch(self, function_calls: List[Dict[str, Any]]) -> List[str]:
+        """
+        并发执行同一条助手消息中的多个函数调用
+
+        不同控制器上的调用并行执行,同一控制器上的调用按原顺序串行执行
+        (例如先播放再暂停),慢操作不会拖住其他控制器的快操作
+
+        Args:
+            function_calls: 函数调用列表,每项包含 name(函数名称)和 arguments(函数参数)
+
+        Returns:
+            与输入顺序一致的执行结果列表
+        """
+        if len(function_calls) <= 1:
+            return [self.execute(call["name"], call["arguments"]) for call in function_calls]
+
+        # 按控制器分组,组内保持原顺序
+        groups: Dict[str, List[int]] = {}
+        for index, call in enumerate(function_calls):
+            key = FUNCTION_CONTROLLERS.get(call["name"], call["name"])
+            groups.setdefault(key, []).append(index)
+
+        results = [""] * len(function_calls)
+
+        def run_group(indices: List[int]):
+            for index in indices:
+                call = function_calls[index]
+                results[index] = self.execute(call["name"], call["arguments"])
+
+        futures = [self._pool.submit(run_group, indices) for indices in groups.values()]
+        for future in futures:
+            future.result()
+
+        return results
+
+    def shutdown(self):
+        """关闭执行线程池"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.music_controller.close()
+
     def _handle_play_music(self, args: Dict[str, Any]) -> str:
         """处理音乐播放"""
         action = args.get("action")
         file_path = args.get("file_path")
 
         if action == "play":
-            if not file_path:
-                return "错误: 播放音乐需要指定文件路径"
-            return self.music_controller.play(file_path)
+            if file_path:
+                return self.music_controller.play(file_path)
+            if args.get("index") is not None:
+                return self.music_controller.play_result(int(args["index"]))
+            return "错误: 播放音乐需要指定文件路径或搜索结果序号"
 
         elif action == "pause":
             return self.music_controller.pause()
@@ -121,7 +189,13 @@ class TaskExecutor:
             return self.file_controller.create_file(file_path, content)
 
         elif operation == "read":
-            return self.file_controller.read_file(file_path)
+            offset, length = args.get("offset"), args.get("length")
+            return self.file_controller.read_file(
+                file_path,
+                offset=int(offset) if offset is not None else None,
+                length=int(length) if length is not None else None,
+                grep=args.get("grep"),
+            )
 
         elif operation == "delete":
             return self.file_controller.delete_file(file_path)
@@ -158,4 +232,49 @@ class TaskExecutor:
         if not keyword:
             return "错误: 需要指定搜索关键词"
 
-        return self.music_controller.search_music(keyword)
+        # 结构化结果: 大模型按 index 引用,不必抄写文件路径
+        return json.dumps(self.music_controller.find_music(keyword), ensure_ascii=False)
+
+    def _handle_find_and_play(self, args: Dict[str, Any]) -> str:
+        """处理搜索并播放"""
+        keyword = args.get("keyword")
+
+        if not keyword:
+            return "错误: 需要指定搜索关键词"
+
+        return self.music_controller.find_and_play(
+            keyword, index=int(args.get("index", 1)), play_all=bool(args.get("play_all", False))
+        )
+
+    def _handle_music_queue(self, args: Dict[str, Any]) -> str:
+        """处理播放列表"""
+        action = args.get("action")
+        file_paths = args.get("file_paths") or []
+        keyword = args.get("keyword")
+
+        if action in ("play", "add"):
+            if not file_paths and not keyword:
+                return "错误: 需要指定音乐文件路径或搜索关键词"
+            if action == "play":
+                return self.music_controller.play_queue(
+                    file_paths, keyword, shuffle=bool(args.get("shuffle", False))
+                )
+            return self.music_controller.enqueue(file_paths, keyword)
+
+        elif action == "next":
+            return self.music_controller.next_track()
+
+        elif action == "previous":
+            return self.music_controller.previous_track()
+
+        elif action == "shuffle":
+            return self.music_controller.set_shuffle(True)
+
+        elif action == "unshuffle":
+            return self.music_controller.set_shuffle(False)
+
+        elif action == "list":
+            return self.music_controller.get_queue()
+
+        else:
+            return f"错误: 未知的播放列表操作 - {action}"
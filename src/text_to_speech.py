@@ -3,18 +3,29 @@
 负责将文本转换为语音
 """
 
+import time
+from typing import Any, Callable, Dict, Optional
+
+import pygame
 import pyttsx3
 
 import config
 from src.logger import logger
+from src.tts_cache import PhraseCache, phrase_key
 
 
 class TextToSpeech:
     """文本转语音"""
 
-    def __init__(self):
-        """初始化TTS引擎"""
-        self.engine = pyttsx3.init()
+    def __init__(self, engine: Any = None, cache: Optional[PhraseCache] = None):
+        """
+        初始化TTS引擎
+
+        Args:
+            engine: pyttsx3 引擎,默认新建(测试中可替换)
+            cache: 合成音频缓存,默认按配置创建
+        """
+        self.engine = engine or pyttsx3.init()
 
         # 设置语速
         self.engine.setProperty("rate", config.TTS_RATE)
@@ -30,6 +41,38 @@ class TextToSpeech:
                 self.engine.setProperty("voice", voice.id)
                 break
 
+        # 固定短语预先合成,之后直接播放音频文件
+        if cache is None and config.TTS_CACHE_ENABLED:
+            cache = PhraseCache()
+        self.cache = cache
+        self._channel: Optional[Any] = None
+        # 尚未缓存的短语,留到朗读线程空闲时再合成(缓存键 -> 文本),启动不必等待合成
+        self._pending: Dict[str, str] = {}
+        self.prerender(config.TTS_CACHE_PHRASES)
+
+    def _cache_key(self, text: str) -> str:
+        """当前语音设置下文本的缓存键"""
+        return phrase_key(
+            text,
+            self.engine.getProperty("voice"),
+            self.engine.getProperty("rate"),
+            self.engine.getProperty("volume"),
+        )
+
+    def prerender(self, phrases):
+        """
+        登记需要预先合成的短语,已缓存的跳过;由 render_pending 在空闲时合成
+
+        Args:
+            phrases: 短语列表
+        """
+        if self.cache is None:
+            return
+        for text in phrases:
+            key = self._cache_key(text)
+            if self.cache.get(key) is None:
+                self._pending[key] = text
+
     def speak(self, text: str):
         """
         朗读文本
@@ -42,14 +85,66 @@ class TextToSpeech:
 
         print(f"\n🔊 助手: {text}")
         try:
+            if self.cache is not None and self.cache.cacheable(text):
+                key = self._cache_key(text)
+                path = self.cache.get(key)
+                if path is None:
+                    # 未命中时直接朗读,先合成文件再播放会让这一句的延迟翻倍
+                    self._pending[key] = text
+                elif self._play(path):
+                    return
+
             self.engine.say(text)
             self.engine.runAndWait()
         except Exception as e:
             logger.error(f"语音合成出错: {e}")
 
+    def render_pending(self, should_stop: Callable[[], bool] = lambda: False) -> int:
+        """
+        合成尚未缓存的短语(在朗读线程空闲时调用,合成引擎不能同时朗读)
+
+        Args:
+            should_stop: 返回True时不再合成剩下的短语(如又有内容要朗读)
+
+        Returns:
+            合成的短语数
+        """
+        rendered = 0
+        while self._pending and self.cache is not None and not should_stop():
+            key, text = self._pending.popitem()
+            if self.cache.render(self.engine, text, key):
+                rendered += 1
+        return rendered
+
+    def _play(self, path: str) -> bool:
+        """
+        播放缓存的音频文件,播放完才返回
+
+        Args:
+            path: 音频文件路径
+
+        Returns:
+            是否播放成功(失败时由调用方改用合成引擎朗读)
+        """
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            # 用 Sound 通道播放,不影响 mixer.music 上正在播放的音乐
+            self._channel = pygame.mixer.Sound(path).play()
+        except Exception as e:
+            logger.warning(f"播放缓存音频失败: {e}")
+            return False
+
+        while self._channel is not None and self._channel.get_busy():
+            time.sleep(0.01)
+        self._channel = None
+        return True
+
     def stop(self):
         """停止朗读"""
         try:
+            if self._channel is not None:
+                self._channel.stop()
             self.engine.stop()
         except Exception as e:
             logger.error(f"停止语音出错: {e}")
@@ -0,0 +1,306 @@
+"""
+工具调用循环
+负责在一次对话中连续执行多轮函数调用,直到大模型给出最终回复
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+from src.async_llm_client import run_steps_async
+from src.llm_client import BaseLLMClient, LLMClient, Steps, run_steps
+from src.logger import logger
+from src.plan_cache import PlanCache, normalize_utterance, schema_fingerprint
+from src.task_executor import TaskExecutor
+
+
+@dataclass
+class StepTiming:
+    """单个步骤的耗时记录"""
+
+    step: int  # 第几轮(0 表示首次请求大模型)
+    stage: str  # llm 或 tools
+    detail: str  # 本步骤涉及的函数名等说明
+    seconds: float
+
+
+@dataclass
+class ToolLoopResult:
+    """一次对话的执行结果"""
+
+    text: Optional[str]  # 最终回复文本
+    steps: int = 0  # 实际执行的工具调用轮数
+    stop_reason: str = "final"  # final / max_steps / deadline / cache
+    timings: List[StepTiming] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        """整轮对话的总耗时"""
+        return sum(timing.seconds for timing in self.timings)
+
+
+class BaseToolLoop:
+    """工具调用循环基类: 循环逻辑、预算检查与耗时记录,调用大模型和执行函数由子类驱动"""
+
+    def __init__(
+        self,
+        llm_client: BaseLLMClient,
+        task_executor: Any,
+        max_steps: Optional[int] = None,
+        deadline: Optional[float] = None,
+        plan_cache: Optional[PlanCache] = None,
+    ):
+        """
+        初始化工具调用循环
+
+        Args:
+            llm_client: 大模型客户端
+            task_executor: 任务执行引擎
+            max_steps: 最多执行的工具调用轮数,默认取配置
+            deadline: 一次对话的最长耗时(秒),默认取配置
+            plan_cache: 可选的规划缓存,命中时跳过大模型直接执行
+        """
+        self.llm_client = llm_client
+        self.task_executor = task_executor
+        self.max_steps = config.MAX_TOOL_STEPS if max_steps is None else max_steps
+        self.deadline = config.TOOL_LOOP_DEADLINE if deadline is None else deadline
+        self.plan_cache = plan_cache
+        self.fingerprint = schema_fingerprint(llm_client.get_available_functions())
+
+    def _steps(self, user_message: str, on_sentence: Optional[Callable[[str], None]]) -> Steps:
+        """
+        处理一条用户消息的步骤: 调用大模型、执行函数的 I/O 调用交给 run_steps 或 run_steps_async
+
+        Args:
+            user_message: 用户消息
+            on_sentence: 可选的句子回调,提供时大模型回复以流式方式逐句回调
+
+        Returns:
+            处理步骤,结果为 ToolLoopResult
+        """
+        started = time.perf_counter()
+        result = ToolLoopResult(text=None)
+
+        plan = self._cached_plan(user_message)
+        if plan:
+            names = ", ".join(call["name"] for call in plan)
+            with self._timed(result, 1, "tools", names):
+                outputs = yield partial(self.task_executor.execute_batch, plan)
+            self._finish_from_cache(result, user_message, outputs, on_sentence)
+            self._log_timings(result)
+            return result
+
+        with self._timed(result, 0, "llm", "chat"):
+            text, function_calls = yield partial(
+                self.llm_client.chat, user_message, on_sentence=on_sentence
+            )
+        plan = function_calls
+        plan_outputs: List[str] = []
+
+        while function_calls:
+            if self._budget_exhausted(result, started):
+                text = self._stop_early(result, function_calls, on_sentence)
+                break
+
+            result.steps += 1
+            names = ", ".join(call["name"] for call in function_calls)
+
+            with self._timed(result, result.steps, "tools", names):
+                outputs = yield partial(self.task_executor.execute_batch, function_calls)
+            if result.steps == 1:
+                plan_outputs = outputs
+
+            results = self._collect_results(function_calls, outputs)
+
+            with self._timed(result, result.steps, "llm", "function_results"):
+                text, function_calls = yield partial(
+                    self.llm_client.add_function_results, results, on_sentence=on_sentence
+                )
+
+        result.text = text
+        self._remember_plan(user_message, result, plan, plan_outputs)
+        self._log_timings(result)
+        return result
+
+    def _cached_plan(self, user_message: str) -> Optional[List[Dict[str, Any]]]:
+        """查找规划缓存"""
+        if self.plan_cache is None:
+            return None
+        return self.plan_cache.get(user_message, self.fingerprint)
+
+    def _finish_from_cache(
+        self,
+        result: ToolLoopResult,
+        user_message: str,
+        outputs: List[str],
+        on_sentence: Optional[Callable[[str], None]],
+    ):
+        """缓存命中时直接用执行结果作为回复,并记入对话历史"""
+        for output in outputs:
+            print(f"✅ 执行结果: {output}")
+        result.text = "\n".join(outputs)
+        result.steps = 1
+        result.stop_reason = "cache"
+        self.llm_client.record_exchange(user_message, result.text)
+        if on_sentence:
+            on_sentence(result.text)
+
+    def _remember_plan(
+        self,
+        user_message: str,
+        result: ToolLoopResult,
+        plan: Optional[List[Dict[str, Any]]],
+        outputs: List[str],
+    ):
+        """只缓存一轮工具调用即完成、全部成功、且不依赖上下文的可缓存函数计划"""
+        if self.plan_cache is None or not plan:
+            return
+        if result.steps != 1 or result.stop_reason != "final":
+            return
+        if not all(call["name"] in config.PLAN_CACHE_FUNCTIONS for call in plan):
+            return
+        if any(
+            marker in output for output in outputs for marker in config.PLAN_CACHE_FAILURE_MARKERS
+        ):
+            return
+        if any(self._depends_on_context(user_message, call) for call in plan):
+            return
+        self.plan_cache.put(user_message, self.fingerprint, plan)
+
+    @staticmethod
+    def _depends_on_context(user_message: str, call: Dict[str, Any]) -> bool:
+        """函数调用的参数是否来自之前的对话(搜索结果序号、指代的文件等)"""
+        arguments = call.get("arguments") or {}
+        context_arguments = config.PLAN_CACHE_CONTEXT_ARGUMENTS.get(call["name"], [])
+        if any(arguments.get(name) is not None for name in context_arguments):
+            return True
+
+        utterance = normalize_utterance(user_message)
+        for name in config.PLAN_CACHE_PATH_ARGUMENTS:
+            value = arguments.get(name)
+            paths = value if isinstance(value, list) else [value] if value else []
+            for path in paths:
+                if normalize_utterance(Path(str(path)).stem) not in utterance:
+                    return True
+        return False
+
+    def _budget_exhausted(self, result: ToolLoopResult, started: float) -> bool:
+        """检查步数和时间预算,超出时记录结束原因"""
+        if result.steps >= self.max_steps:
+            result.stop_reason = "max_steps"
+        elif time.perf_counter() - started >= self.deadline:
+            result.stop_reason = "deadline"
+        return result.stop_reason != "final"
+
+    def _stop_early(
+        self,
+        result: ToolLoopResult,
+        function_calls: List[Dict[str, Any]],
+        on_sentence: Optional[Callable[[str], None]],
+    ) -> str:
+        """超出预算时不再执行,但要给未完成的调用补上结果以保持历史完整"""
+        self.llm_client.record_function_results(
+            [
+                {"id": call["id"], "name": call["name"], "result": "未执行: 超出执行预算"}
+                for call in function_calls
+            ]
+        )
+        text = "任务步骤较多,已暂停执行,请告诉我是否继续"
+        if on_sentence:
+            on_sentence(text)
+        logger.warning(f"工具调用循环提前结束: {result.stop_reason}")
+        return text
+
+    @staticmethod
+    def _collect_results(
+        function_calls: List[Dict[str, Any]], outputs: List[str]
+    ) -> List[Dict[str, Any]]:
+        """把执行结果整理为 add_function_results 的参数"""
+        results = []
+        for func_call, output in zip(function_calls, outputs):
+            print(f"✅ 执行结果: {output}")
+            results.append({"id": func_call["id"], "name": func_call["name"], "result": output})
+        return results
+
+    @contextmanager
+    def _timed(self, result: ToolLoopResult, step: int, stage: str, detail: str):
+        """记录一个步骤的耗时"""
+        step_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - step_started
+            result.timings.append(StepTiming(step, stage, detail, seconds))
+
+    def _log_timings(self, result: ToolLoopResult):
+        """输出本轮对话的分步耗时"""
+        details = ", ".join(
+            f"#{timing.step} {timing.stage}({timing.detail}) {timing.seconds * 1000:.0f}ms"
+            for timing in result.timings
+        )
+        logger.info(
+            f"对话完成: {result.steps} 轮工具调用, 总耗时 {result.total_seconds * 1000:.0f}ms, "
+            f"结束原因 {result.stop_reason} | {details}"
+        )
+
+
+class ToolLoop(BaseToolLoop):
+    """工具调用循环"""
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        task_executor: TaskExecutor,
+        max_steps: Optional[int] = None,
+        deadline: Optional[float] = None,
+        plan_cache: Optional[PlanCache] = None,
+    ):
+        """
+        初始化工具调用循环
+
+        Args:
+            llm_client: 大模型客户端
+            task_executor: 任务执行引擎
+            max_steps: 最多执行的工具调用轮数,默认取配置
+            deadline: 一次对话的最长耗时(秒),默认取配置
+            plan_cache: 可选的规划缓存,命中时跳过大模型直接执行
+        """
+        super().__init__(llm_client, task_executor, max_steps, deadline, plan_cache)
+
+    def run(
+        self, user_message: str, on_sentence: Optional[Callable[[str], None]] = None
+    ) -> ToolLoopResult:
+        """
+        处理一条用户消息,循环执行函数调用直到得到最终回复
+
+        Args:
+            user_message: 用户消息
+            on_sentence: 可选的句子回调,提供时大模型回复以流式方式逐句回调
+
+        Returns:
+            执行结果
+        """
+        return run_steps(self._steps(user_message, on_sentence))
+
+
+class AsyncToolLoop(BaseToolLoop):
+    """异步工具调用循环,配合 AsyncLLMClient 与 AsyncTaskExecutor 使用"""
+
+    async def run(
+        self, user_message: str, on_sentence: Optional[Callable[[str], None]] = None
+    ) -> ToolLoopResult:
+        """
+        处理一条用户消息,循环执行函数调用直到得到最终回复
+
+        Args:
+            user_message: 用户消息
+            on_sentence: 可选的句子回调,提供时大模型回复以流式方式逐句回调
+
+        Returns:
+            执行结果
+        """
+        return await run_steps_async(self._steps(user_message, on_sentence))
@@ -0,0 +1,173 @@
+"""
+语音合成缓存模块
+把固定短语合成为音频文件保存在磁盘上(LRU),再次朗读时直接播放,不再经过合成引擎
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+import config
+from src.logger import logger
+
+
+def phrase_key(text: str, voice: Any, rate: Any, volume: Any) -> str:
+    """
+    计算缓存键: 文本、语音、语速、音量任一变化都需要重新合成
+
+    Args:
+        text: 文本
+        voice: 语音ID
+        rate: 语速
+        volume: 音量
+
+    Returns:
+        缓存键
+    """
+    data = f"{text}|{voice}|{rate}|{volume}".encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:24]
+
+
+class PhraseCache:
+    """合成音频的磁盘缓存,按文件修改时间记录最近使用顺序,超出上限时淘汰最久未用的"""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        phrases: Optional[Iterable[str]] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            directory: 音频文件目录,默认取配置
+            max_entries: 最大条目数,默认取配置
+            phrases: 缓存的固定短语,默认取配置
+        """
+        self.directory = directory or config.TTS_CACHE_DIR
+        self.max_entries = config.TTS_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.phrases = set(config.TTS_CACHE_PHRASES if phrases is None else phrases)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """命中统计"""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def cacheable(self, text: str) -> bool:
+        """
+        判断文本是否缓存: 只缓存固定短语,一次性的文本(如大模型流式回复的短句)合成后
+        不会再用到,缓存反而要先合成文件再播放,并把固定短语挤出缓存
+
+        Args:
+            text: 文本
+
+        Returns:
+            是否缓存
+        """
+        return text in self.phrases
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查找合成好的音频
+
+        Args:
+            key: phrase_key 计算的缓存键
+
+        Returns:
+            音频文件路径,未命中返回None
+        """
+        with self._lock:
+            path = self._entries.get(key)
+            if path is None or not os.path.exists(path):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            try:
+                # 更新修改时间,重启后仍能恢复最近使用顺序
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+    def render(self, engine: Any, text: str, key: str) -> Optional[str]:
+        """
+        用合成引擎把文本渲染为音频文件并加入缓存
+
+        Args:
+            engine: pyttsx3 引擎(调用方需保证没有其他线程同时使用)
+            text: 文本
+            key: phrase_key 计算的缓存键
+
+        Returns:
+            音频文件路径,合成失败返回None
+        """
+        path = os.path.join(self.directory, f"{key}.wav")
+        tmp_path = f"{path}.tmp.wav"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+            if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+                logger.warning(f"合成音频为空,跳过缓存: '{text}'")
+                return None
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"合成缓存音频失败: {e}")
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            self._entries[key] = path
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                try:
+                    os.remove(oldest)
+                except OSError:
+                    pass
+
+        logger.debug(f"已缓存合成音频: '{text}' {self.stats}")
+        return path
+
+    def clear(self):
+        """清空缓存并删除音频文件"""
+        with self._lock:
+            for path in self._entries.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._entries.clear()
+
+    def _load(self):
+        """扫描缓存目录,按修改时间恢复最近使用顺序"""
+        if not os.path.isdir(self.directory):
+            return
+
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".wav") or name.endswith(".tmp.wav"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                files.append((os.path.getmtime(path), name[: -len(".wav")], path))
+            except OSError:
+                continue
+
+        for _, key, path in sorted(files):
+            self._entries[key] = path
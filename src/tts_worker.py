@@ -0,0 +1,194 @@
+"""
+语音合成工作线程
+专用线程独占合成引擎,按顺序朗读队列中的文本;调用方排队后立即返回,可以随时取消尚未播完的内容
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+import config
+from src.logger import logger
+from src.metrics import LatencyRecorder
+from src.text_to_speech import TextToSpeech
+
+# 通知工作线程退出
+_STOP = object()
+
+
+class SpeechWorker:
+    """语音合成工作线程"""
+
+    def __init__(self, tts: Any = None, metrics: Optional[LatencyRecorder] = None):
+        """
+        初始化并启动工作线程
+
+        Args:
+            tts: 语音合成器(需提供 speak 和 stop),默认在工作线程上创建 TextToSpeech,
+                 pyttsx3 引擎只在这一个线程上使用
+            metrics: 可选的延迟统计,每句朗读耗时记录为 "tts"
+        """
+        self.tts = tts
+        self.metrics = metrics
+        self.spoken = 0
+        self.cancelled = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._current: Optional[Future] = None
+        self._interrupted = False
+        self._error: Optional[Exception] = None
+        self._idle = threading.Event()
+        self._idle.set()
+        self._ready = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """朗读统计"""
+        return {
+            "queued": self._queue.qsize(),
+            "spoken": self.spoken,
+            "cancelled": self.cancelled,
+        }
+
+    @property
+    def speaking(self) -> bool:
+        """是否正在朗读或还有排队的内容"""
+        return not self._idle.is_set()
+
+    def say(self, text: str) -> "Future[bool]":
+        """
+        排队朗读文本,立即返回
+
+        Args:
+            text: 要朗读的文本
+
+        Returns:
+            朗读结束时完成的 Future,结果为是否完整播完(被打断为False);取消时处于 cancelled 状态
+        """
+        future: "Future[bool]" = Future()
+        if not text:
+            future.set_result(True)
+            return future
+
+        with self._lock:
+            self._idle.clear()
+            self._queue.put((text, future))
+        return future
+
+    def cancel(self) -> int:
+        """
+        取消所有排队的内容,并打断正在朗读的一句
+
+        Returns:
+            取消的条数(包括被打断的一句)
+        """
+        count = 0
+        with self._lock:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    # 退出信号放回队列
+                    self._queue.put(item)
+                    break
+                _, future = item
+                if future.cancel():
+                    count += 1
+
+            if self._current is not None:
+                count += 1
+                self._interrupted = True
+                self.tts.stop()
+            self.cancelled += count
+            if self._current is None:
+                self._idle.set()
+
+        if count:
+            logger.info(f"已取消 {count} 条语音")
+        return count
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待队列中的内容全部播完
+
+        Args:
+            timeout: 最长等待时间(秒)
+
+        Returns:
+            是否已全部播完
+        """
+        return self._idle.wait(timeout)
+
+    def close(self, wait: bool = True):
+        """
+        停止工作线程
+
+        Args:
+            wait: 是否先播完排队的内容,否则直接取消
+        """
+        if not wait:
+            self.cancel()
+        self._queue.put(_STOP)
+        self._thread.join(timeout=None if wait else 2)
+
+    def _run(self):
+        """工作线程主循环"""
+        try:
+            if self.tts is None:
+                self.tts = TextToSpeech()
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+
+        while True:
+            try:
+                item = self._queue.get(timeout=config.TTS_CACHE_RENDER_IDLE)
+            except queue.Empty:
+                # 空闲时合成朗读时未命中缓存的短语,有新内容要朗读就停下
+                render = getattr(self.tts, "render_pending", None)
+                if render is not None:
+                    try:
+                        render(should_stop=lambda: not self._queue.empty())
+                    except Exception as e:
+                        logger.warning(f"合成缓存音频出错: {e}")
+                item = self._queue.get()
+            if item is _STOP:
+                break
+
+            text, future = item
+            with self._lock:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._current = future
+                self._interrupted = False
+
+            started = time.perf_counter()
+            try:
+                self.tts.speak(text)
+            except Exception as e:
+                logger.error(f"语音合成出错: {e}")
+            seconds = time.perf_counter() - started
+            if self.metrics is not None:
+                self.metrics.record("tts", seconds)
+
+            with self._lock:
+                interrupted = self._interrupted
+                self._current = None
+                if not interrupted:
+                    self.spoken += 1
+                if self._queue.empty():
+                    self._idle.set()
+            future.set_result(not interrupted)
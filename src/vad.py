@@ -0,0 +1,281 @@
+"""
+语音活动检测(VAD)模块
+按帧计算短时能量和过零率判断是否有人说话,用于切分语句和裁掉首尾静音
+"""
+
+import math
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+import speech_recognition as sr
+
+import config
+from src.logger import logger
+from src.metrics import LatencyRecorder
+from src.noise_calibration import AdaptiveNoiseFloor
+
+# 采样宽度(字节)对应的 numpy 类型
+SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def frame_features(
+    pcm: bytes, sample_width: int, frame_length: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    计算每帧的能量和过零率
+
+    Args:
+        pcm: 单声道 PCM 数据
+        sample_width: 采样宽度(字节)
+        frame_length: 每帧采样数
+
+    Returns:
+        (能量, 过零率) 两个数组,能量为 RMS(换算到 16bit 幅度),过零率为 0-1;不足一帧的尾部忽略
+    """
+    samples = np.frombuffer(pcm, dtype=SAMPLE_DTYPES[sample_width]).astype(np.float32)
+    samples *= 2.0 ** (16 - 8 * sample_width)
+
+    count = len(samples) // frame_length
+    frames = samples[: count * frame_length].reshape(count, frame_length)
+
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return rms, zcr
+
+
+class VoiceActivityDetector:
+    """基于能量和过零率的语音端点检测"""
+
+    def __init__(
+        self,
+        energy_threshold: float = 300.0,
+        frame_ms: Optional[int] = None,
+        hangover_ms: Optional[int] = None,
+        speech_start_ms: Optional[int] = None,
+        padding_ms: Optional[int] = None,
+        zcr_threshold: Optional[float] = None,
+        unvoiced_ms: Optional[int] = None,
+        noise_floor: Optional[AdaptiveNoiseFloor] = None,
+    ):
+        """
+        初始化检测器
+
+        Args:
+            energy_threshold: 能量阈值(16bit 幅度的 RMS),与 sr.Recognizer.energy_threshold 同一量纲
+            frame_ms: 帧长(毫秒),默认取配置
+            hangover_ms: 语音结束后等待的静音时长(毫秒),超过即判定一句话结束,默认取配置
+            speech_start_ms: 连续多长的语音才算开始说话(毫秒),过滤短促噪声,默认取配置
+            padding_ms: 语音前后保留的静音(毫秒),避免切掉起止音,默认取配置
+            zcr_threshold: 过零率阈值,能量略低但过零率高的帧(清辅音)也算语音,默认取配置
+            unvoiced_ms: 清辅音只在能量达到阈值的帧之后多长时间内算作语音(毫秒),默认取配置
+            noise_floor: 自适应噪音基线,提供时用等待说话期间的静音帧持续更新能量阈值
+        """
+        self.energy_threshold = energy_threshold
+        self.frame_ms = frame_ms or config.VAD_FRAME_MS
+        self.hangover_ms = config.VAD_HANGOVER_MS if hangover_ms is None else hangover_ms
+        self.speech_start_ms = (
+            config.VAD_SPEECH_START_MS if speech_start_ms is None else speech_start_ms
+        )
+        self.padding_ms = config.VAD_PADDING_MS if padding_ms is None else padding_ms
+        self.zcr_threshold = config.VAD_ZCR_THRESHOLD if zcr_threshold is None else zcr_threshold
+        self.unvoiced_ms = config.VAD_UNVOICED_MS if unvoiced_ms is None else unvoiced_ms
+        self.noise_floor = noise_floor
+
+        # 最近一句的端点检测统计,以及历次判定耗时
+        self.last_stats: Dict[str, Any] = {}
+        self.metrics = LatencyRecorder()
+
+    def _frames(self, ms: int) -> int:
+        """毫秒数换算为帧数"""
+        return max(1, math.ceil(ms / self.frame_ms))
+
+    def frame_length(self, sample_rate: int) -> int:
+        """每帧采样数"""
+        return int(sample_rate * self.frame_ms / 1000)
+
+    def classify(self, pcm: bytes, sample_rate: int, sample_width: int) -> np.ndarray:
+        """
+        逐帧判断是否为语音
+
+        Args:
+            pcm: 单声道 PCM 数据
+            sample_rate: 采样率
+            sample_width: 采样宽度(字节)
+
+        Returns:
+            每帧是否为语音的布尔数组
+        """
+        rms, zcr = frame_features(pcm, sample_width, self.frame_length(sample_rate))
+        return self._decide(rms, zcr)
+
+    def _decide(
+        self, rms: np.ndarray, zcr: np.ndarray, since_voiced: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        按能量和过零率判定语音帧
+
+        能量达到阈值的帧为浊音;能量略低但过零率高的帧(清辅音)只在浊音之后 unvoiced_ms 内算作语音,
+        否则与阈值相当的宽带噪音(过零率约 0.5)会一直被当作语音
+
+        Args:
+            rms: 每帧能量
+            zcr: 每帧过零率
+            since_voiced: 第一帧之前距上一个浊音帧的帧数,默认之前没有浊音帧
+        """
+        voiced = rms > self.energy_threshold
+        span = self._frames(self.unvoiced_ms)
+        index = np.arange(len(rms))
+        before = -span - 1 if since_voiced is None else -since_voiced
+        last_voiced = np.maximum.accumulate(np.where(voiced, index, before))
+        unvoiced = (
+            (rms > self.energy_threshold / 2)
+            & (zcr > self.zcr_threshold)
+            & (index - last_voiced <= span)
+        )
+        return voiced | unvoiced
+
+    def learn_noise(self, audio: sr.AudioData):
+        """
+        把一段被误判为语音的音频计入噪音基线(如识别结果为空的误触发)
+
+        Args:
+            audio: 音频
+        """
+        if self.noise_floor is None or not audio.frame_data:
+            return
+        rms, _ = frame_features(
+            audio.frame_data, audio.sample_width, self.frame_length(audio.sample_rate)
+        )
+        self.energy_threshold = self.noise_floor.update(rms)
+
+    def trim(self, audio: sr.AudioData) -> sr.AudioData:
+        """
+        裁掉首尾静音,语音前后各保留 padding_ms
+
+        Args:
+            audio: 音频
+
+        Returns:
+            裁剪后的音频,没有语音时返回空音频
+        """
+        speech = self.classify(audio.frame_data, audio.sample_rate, audio.sample_width)
+        indices = np.flatnonzero(speech)
+        if len(indices) == 0:
+            return sr.AudioData(b"", audio.sample_rate, audio.sample_width)
+
+        pad = self._frames(self.padding_ms)
+        frame_bytes = self.frame_length(audio.sample_rate) * audio.sample_width
+        start = max(0, indices[0] - pad) * frame_bytes
+        end = min(len(speech), indices[-1] + 1 + pad) * frame_bytes
+        return sr.AudioData(audio.frame_data[start:end], audio.sample_rate, audio.sample_width)
+
+    def listen(
+        self,
+        source: sr.AudioSource,
+        timeout: Optional[float] = None,
+        phrase_time_limit: Optional[float] = None,
+    ) -> sr.AudioData:
+        """
+        从输入源录制一句话,检测到语音结束后立即返回,首尾静音只保留 padding_ms
+
+        Args:
+            source: 已打开的音频源
+            timeout: 等待开始说话的最长时间(秒)
+            phrase_time_limit: 单句最长时长(秒)
+
+        Returns:
+            录制的音频;输入流结束且没有语音时返回空音频
+
+        Raises:
+            sr.WaitTimeoutError: 超时仍未检测到语音
+        """
+        sample_rate, sample_width = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+        frame_length = self.frame_length(sample_rate)
+        frame_bytes = frame_length * sample_width
+        frame_seconds = frame_length / sample_rate
+
+        start_frames = self._frames(self.speech_start_ms)
+        hangover_frames = self._frames(self.hangover_ms)
+        pad_frames = self._frames(self.padding_ms)
+
+        pre_roll: deque = deque(maxlen=pad_frames + start_frames)
+        frames = []
+        elapsed = phrase_start = 0.0
+        speech_run = silence_run = 0
+        since_voiced: Optional[int] = None
+        triggered = False
+        processing = 0.0
+        last_speech_at = time.perf_counter()
+
+        while True:
+            data = source.stream.read(frame_length)
+            if len(data) < frame_bytes:
+                # 输入流结束
+                break
+            elapsed += frame_seconds
+
+            started = time.perf_counter()
+            rms, zcr = frame_features(data, sample_width, frame_length)
+            is_speech = bool(self._decide(rms, zcr, since_voiced)[0])
+            if rms[0] > self.energy_threshold:
+                since_voiced = 1
+            elif since_voiced is not None:
+                since_voiced += 1
+            if not triggered and not is_speech and self.noise_floor is not None:
+                # 等待说话期间的静音帧用于跟踪环境噪音
+                self.energy_threshold = self.noise_floor.update(rms)
+            processing += time.perf_counter() - started
+
+            if not triggered:
+                pre_roll.append(data)
+                speech_run = speech_run + 1 if is_speech else 0
+                if speech_run >= start_frames:
+                    triggered = True
+                    frames = list(pre_roll)
+                    phrase_start = elapsed - len(frames) * frame_seconds
+                    last_speech_at = time.perf_counter()
+                elif timeout and elapsed > timeout:
+                    raise sr.WaitTimeoutError(
+                        "listening timed out while waiting for phrase to start"
+                    )
+                continue
+
+            frames.append(data)
+            if is_speech:
+                silence_run = 0
+                last_speech_at = time.perf_counter()
+            else:
+                silence_run += 1
+                if silence_run >= hangover_frames:
+                    break
+
+            if phrase_time_limit and elapsed - phrase_start >= phrase_time_limit:
+                break
+
+        if not triggered:
+            return sr.AudioData(b"", sample_rate, sample_width)
+
+        # 拖尾静音只保留 padding_ms,不必上传给识别服务
+        trimmed = max(0, silence_run - pad_frames)
+        if trimmed:
+            frames = frames[:-trimmed]
+
+        self.last_stats = {
+            "speech_seconds": len(frames) * frame_seconds,
+            "trimmed_seconds": trimmed * frame_seconds,
+            "hangover_seconds": silence_run * frame_seconds,
+            "decision_seconds": time.perf_counter() - last_speech_at,
+            "processing_seconds": processing,
+        }
+        self.metrics.record("vad_decision", self.last_stats["decision_seconds"])
+        self.metrics.record("vad_cpu", processing)
+        logger.debug(
+            f"端点检测: 语音 {self.last_stats['speech_seconds']:.2f}s, "
+            f"裁掉静音 {self.last_stats['trimmed_seconds']:.2f}s, "
+            f"判定耗时 {self.last_stats['decision_seconds'] * 1000:.0f}ms "
+            f"(帧处理 {processing * 1000:.1f}ms)"
+        )
+        return sr.AudioData(b"".join(frames), sample_rate, sample_width)
@@ -0,0 +1,370 @@
+"""
+唤醒词检测模块
+用 MFCC 特征和 DTW 模板匹配在本地检测唤醒词,只有唤醒后才进行完整的语音识别
+"""
+
+import functools
+import os
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+import speech_recognition as sr
+
+import config
+from src.logger import logger
+from src.vad import SAMPLE_DTYPES, frame_features
+
+# MFCC 参数
+MFCC_FRAME_MS = 25
+MFCC_HOP_MS = 10
+MFCC_MELS = 26
+MFCC_COEFFS = 13
+
+
+def to_samples(pcm: bytes, sample_width: int) -> np.ndarray:
+    """PCM 数据转为浮点采样(16bit 幅度)"""
+    samples = np.frombuffer(pcm, dtype=SAMPLE_DTYPES[sample_width]).astype(np.float32)
+    return samples * 2.0 ** (16 - 8 * sample_width)
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """线性插值重采样(唤醒词匹配对音质要求不高)"""
+    count = int(len(samples) * to_rate / from_rate)
+    positions = np.linspace(0, len(samples) - 1, count)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+@functools.lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int, n_fft: int) -> np.ndarray:
+    """三角梅尔滤波器组"""
+
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), MFCC_MELS + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    bank = np.zeros((MFCC_MELS, n_fft // 2 + 1))
+    for m in range(1, MFCC_MELS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+@functools.lru_cache(maxsize=1)
+def _dct_matrix() -> np.ndarray:
+    """DCT-II 变换矩阵"""
+    n = np.arange(MFCC_MELS)
+    k = np.arange(MFCC_COEFFS)[:, None]
+    return np.cos(np.pi * k * (2 * n + 1) / (2 * MFCC_MELS))
+
+
+def mfcc(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    计算 MFCC 特征(已做倒谱均值归一化)
+
+    Args:
+        samples: 浮点采样
+        sample_rate: 采样率
+
+    Returns:
+        形状为 (帧数, MFCC_COEFFS) 的特征矩阵
+    """
+    frame_length = int(sample_rate * MFCC_FRAME_MS / 1000)
+    hop = int(sample_rate * MFCC_HOP_MS / 1000)
+    n_fft = 1 << (frame_length - 1).bit_length()
+
+    if len(samples) < frame_length:
+        samples = np.pad(samples, (0, frame_length - len(samples)))
+    emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])
+
+    count = 1 + (len(emphasized) - frame_length) // hop
+    index = np.arange(frame_length)[None, :] + hop * np.arange(count)[:, None]
+    frames = emphasized[index] * np.hamming(frame_length)
+
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    energies = np.log(power @ _mel_filterbank(sample_rate, n_fft).T + 1e-6)
+    features = energies @ _dct_matrix().T
+    return features - features.mean(axis=0)
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    两段特征序列的 DTW 距离(按路径长度归一化)
+
+    每一行用累加和与 np.minimum.accumulate 向量化求解,不需要逐格循环
+
+    Args:
+        a: 特征序列 (n, d)
+        b: 特征序列 (m, d)
+
+    Returns:
+        平均每步的距离
+    """
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    previous = np.concatenate([[0.0], np.full(len(b), np.inf)])
+
+    for row in cost:
+        # 来自上方和左上方的最小累计值
+        vertical = row + np.minimum(previous[1:], previous[:-1])
+        # 再考虑来自左方的路径: D[j] = C[j] + min_{k<=j}(vertical[k] - C[k])
+        cumulative = np.cumsum(row)
+        current = cumulative + np.minimum.accumulate(vertical - cumulative)
+        previous = np.concatenate([[np.inf], current])
+
+    return float(previous[-1] / (len(a) + len(b)))
+
+
+class PrefixedSource(sr.AudioSource):
+    """先读出一段缓存音频、再继续读取原输入源的音频源"""
+
+    def __init__(self, source: sr.AudioSource, prefix: bytes):
+        """
+        初始化
+
+        Args:
+            source: 已打开的音频源
+            prefix: 先返回的音频数据
+        """
+        self.SAMPLE_RATE = source.SAMPLE_RATE
+        self.SAMPLE_WIDTH = source.SAMPLE_WIDTH
+        self.CHUNK = source.CHUNK
+        self.stream = _PrefixedStream(source.stream, prefix, source.SAMPLE_WIDTH)
+
+    def __enter__(self) -> "PrefixedSource":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class _PrefixedStream:
+    """PrefixedSource 的数据流"""
+
+    def __init__(self, stream, prefix: bytes, sample_width: int):
+        self._stream = stream
+        self._prefix = prefix
+        self._sample_width = sample_width
+
+    def read(self, size: int) -> bytes:
+        wanted = size * self._sample_width
+        data, self._prefix = self._prefix[:wanted], self._prefix[wanted:]
+        if len(data) < wanted:
+            data += self._stream.read((wanted - len(data)) // self._sample_width)
+        return data
+
+
+class WakeWordSpotter:
+    """唤醒词检测器"""
+
+    # 检测窗口相对模板时长的伸缩比例,容忍语速差异
+    WINDOW_SCALES = (0.85, 1.0, 1.15)
+
+    def __init__(
+        self,
+        templates: Optional[List[np.ndarray]] = None,
+        sample_rate: int = 16000,
+        threshold: Optional[float] = None,
+        energy_threshold: float = 300.0,
+        frame_ms: Optional[int] = None,
+        hop_ms: Optional[int] = None,
+        ring_seconds: Optional[float] = None,
+    ):
+        """
+        初始化检测器
+
+        Args:
+            templates: 唤醒词模板(MFCC 特征)
+            sample_rate: 模板的采样率
+            threshold: DTW 距离阈值,低于该值视为检测到唤醒词,默认取配置
+            energy_threshold: 能量阈值,只有检测到声音时才做特征匹配,安静时几乎不占 CPU
+            frame_ms: 读取音频的帧长(毫秒),默认与 VAD 一致
+            hop_ms: 有声音时每隔多久匹配一次(毫秒),默认取配置
+            ring_seconds: 环形缓冲区时长(秒),默认取配置
+        """
+        self.templates = templates or []
+        self.sample_rate = sample_rate
+        self.threshold = config.WAKE_WORD_THRESHOLD if threshold is None else threshold
+        self.energy_threshold = energy_threshold
+        self.frame_ms = frame_ms or config.VAD_FRAME_MS
+        self.hop_ms = hop_ms or config.WAKE_WORD_HOP_MS
+        self.ring_seconds = ring_seconds or config.WAKE_WORD_RING_SECONDS
+
+        # 最近一次匹配的最小距离,便于调节阈值
+        self.last_score = float("inf")
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, **kwargs) -> "WakeWordSpotter":
+        """
+        从文件加载模板
+
+        Args:
+            path: 模板文件(.npz),默认取配置
+            **kwargs: 传给构造函数的其他参数
+
+        Returns:
+            检测器
+        """
+        path = path or config.WAKE_WORD_TEMPLATES
+        with np.load(path) as data:
+            sample_rate = int(data["sample_rate"])
+            templates = [data[key] for key in sorted(data.files) if key.startswith("template_")]
+        logger.info(f"唤醒词模板已加载: {len(templates)} 个 ({path})")
+        return cls(templates, sample_rate=sample_rate, **kwargs)
+
+    def save(self, path: Optional[str] = None):
+        """
+        保存模板
+
+        Args:
+            path: 模板文件(.npz),默认取配置
+        """
+        path = path or config.WAKE_WORD_TEMPLATES
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {f"template_{i:02d}": template for i, template in enumerate(self.templates)}
+        np.savez(path, sample_rate=self.sample_rate, **arrays)
+
+    def enroll(self, audio: sr.AudioData):
+        """
+        录入一段唤醒词样本(应已裁掉首尾静音)
+
+        Args:
+            audio: 唤醒词录音
+        """
+        audio_data = audio.get_raw_data(convert_rate=self.sample_rate)
+        self.templates.append(mfcc(to_samples(audio_data, audio.sample_width), self.sample_rate))
+
+    def score(self, samples: np.ndarray, sample_rate: int) -> float:
+        """
+        计算一段音频与模板的最小 DTW 距离
+
+        Args:
+            samples: 浮点采样
+            sample_rate: 采样率
+
+        Returns:
+            最小距离,没有模板时为无穷大
+        """
+        if not self.templates:
+            return float("inf")
+        if sample_rate != self.sample_rate:
+            samples = resample(samples, sample_rate, self.sample_rate)
+        features = mfcc(samples, self.sample_rate)
+        return min(dtw_distance(features, template) for template in self.templates)
+
+    def wait(
+        self,
+        source: sr.AudioSource,
+        timeout: Optional[float] = None,
+        should_stop=None,
+    ) -> Optional[bytes]:
+        """
+        从已打开的输入源持续读取音频,直到检测到唤醒词
+
+        Args:
+            source: 已打开的音频源
+            timeout: 安静状态持续多久(秒)后放弃等待
+            should_stop: 可选的回调,返回 True 时停止等待
+
+        Returns:
+            唤醒词之后已经读入的音频(紧跟唤醒词的指令不会被截掉);
+            输入流结束或被停止时返回None
+
+        Raises:
+            sr.WaitTimeoutError: 超时仍未检测到声音
+        """
+        if not self.templates:
+            raise RuntimeError("没有唤醒词模板")
+
+        sample_rate, sample_width = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+        frame_length = int(sample_rate * self.frame_ms / 1000)
+        frame_seconds = frame_length / sample_rate
+        hop_frames = max(1, round(self.hop_ms / self.frame_ms))
+        ring: deque = deque(maxlen=max(1, int(self.ring_seconds / frame_seconds)))
+
+        # 模板时长(换算为读取帧数)
+        template_frames = [
+            max(1, round(len(t) * MFCC_HOP_MS / self.frame_ms)) for t in self.templates
+        ]
+        longest = max(template_frames, default=1)
+        window_lengths = sorted(
+            {
+                max(1, round(length * scale))
+                for length in template_frames
+                for scale in self.WINDOW_SCALES
+            }
+        )
+
+        heard = False  # 是否听到过声音
+        quiet_run = 0  # 最近一次有声音之后连续安静的帧数
+        idle_seconds = 0.0
+        since_check = 0
+        frame_count = 0
+        # 低于阈值的最佳匹配 (距离, 窗口结束的帧序号);继续匹配到距离不再下降时才确认唤醒,
+        # 避免在唤醒词还没说完时就提前触发
+        candidate: Optional[tuple] = None
+
+        while should_stop is None or not should_stop():
+            data = source.stream.read(frame_length)
+            if len(data) < frame_length * sample_width:
+                return None
+            ring.append(data)
+            frame_count += 1
+
+            rms, _ = frame_features(data, sample_width, frame_length)
+            if rms[0] > self.energy_threshold:
+                heard, quiet_run, idle_seconds = True, 0, 0.0
+            else:
+                quiet_run += 1
+
+            # 声音结束超过一个模板时长后,窗口里已不可能有唤醒词,回到空闲状态
+            if not heard or quiet_run > longest:
+                if candidate:
+                    return self._confirm(ring, frame_count, candidate)
+                heard = False
+                idle_seconds += frame_seconds
+                if timeout and idle_seconds > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for wake word")
+                continue
+
+            since_check += 1
+            if since_check < hop_frames or len(ring) < window_lengths[0]:
+                continue
+            since_check = 0
+
+            # 窗口结束位置取当前和半个 hop 之前
+            frames = list(ring)
+            samples = to_samples(b"".join(frames), sample_width)
+            best_score, best_end = float("inf"), frame_count
+            for offset in sorted({0, hop_frames // 2}):
+                end = (len(frames) - offset) * frame_length
+                for length in window_lengths:
+                    start = end - length * frame_length
+                    if start < 0:
+                        continue
+                    score = self.score(samples[start:end], sample_rate)
+                    if score < best_score:
+                        best_score, best_end = score, frame_count - offset
+
+            self.last_score = best_score
+            if best_score < self.threshold and (not candidate or best_score < candidate[0]):
+                candidate = (best_score, best_end)
+            elif candidate:
+                return self._confirm(ring, frame_count, candidate)
+
+        return None
+
+    def _confirm(self, ring: deque, frame_count: int, candidate: tuple) -> bytes:
+        """确认唤醒,返回匹配窗口之后已读入的音频,留给指令识别"""
+        score, end = candidate
+        self.last_score = score
+        logger.info(f"检测到唤醒词 (距离 {score:.2f})")
+        after = frame_count - end
+        return b"".join(list(ring)[len(ring) - after :]) if after else b""
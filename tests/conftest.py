@@ -0,0 +1,35 @@
+"""
+测试公共配置
+"""
+
+import os
+import sys
+
+import pytest
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 没有声卡的环境(如 CI)也能初始化 pygame.mixer,必须在导入 pygame 之前设置
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import config
+from src.openai_client import reset_openai_client
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dirs(tmp_path, monkeypatch):
+    """缓存文件(音乐库索引、规划缓存等)写到临时目录,测试不在项目目录下留下文件"""
+    cache = tmp_path / ".cache"
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_DIR", str(cache / "music_library"))
+    monkeypatch.setattr(config, "PLAN_CACHE_FILE", str(cache / "plan_cache.json"))
+    monkeypatch.setattr(config, "TTS_CACHE_DIR", str(cache / "tts"))
+    monkeypatch.setattr(config, "CALIBRATION_FILE", str(cache / "calibration.json"))
+
+
+@pytest.fixture(autouse=True)
+def fresh_openai_client():
+    """每个测试结束后丢弃共享客户端,避免沿用上一个模拟服务的地址"""
+    yield
+    reset_openai_client()
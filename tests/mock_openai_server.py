@@ -0,0 +1,214 @@
+"""
+本地模拟 OpenAI 服务
+实现 chat.completions 接口(含流式 SSE),按脚本依次返回预设回复,供测试使用
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class MockOpenAIServer:
+    """OpenAI 兼容的本地模拟服务"""
+
+    def __init__(self, delay: float = 0.0, chunk_delay: float = 0.0, chunk_size: int = 4):
+        """
+        初始化模拟服务
+
+        Args:
+            delay: 每个请求返回首字节前的延迟(秒),模拟模型推理耗时
+            chunk_delay: 流式分片之间的延迟(秒)
+            chunk_size: 流式输出时每个分片的字符数
+        """
+        self.delay = delay
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.replies: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """服务的 base_url"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def add_reply(
+        self, content: Optional[str] = None, tool_calls: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        追加一条脚本回复
+
+        Args:
+            content: 回复文本
+            tool_calls: 工具调用列表,每项为 {"name": 函数名, "arguments": 参数字典}
+        """
+        self.replies.append({"content": content, "tool_calls": tool_calls or []})
+
+    def start(self) -> "MockOpenAIServer":
+        """启动服务"""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _next_reply(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """记录请求并取出下一条脚本回复"""
+        with self._lock:
+            self.requests.append(body)
+            if self.replies:
+                return self.replies.pop(0)
+        return {"content": "好的。", "tool_calls": []}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # 客户端关闭了空闲的 keep-alive 连接
+                    pass
+
+            def do_GET(self):
+                # 供连接预热/保活使用的轻量接口
+                self._send_json({"object": "list", "data": [{"id": "mock-model"}]})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                reply = server._next_reply(body)
+
+                if server.delay:
+                    time.sleep(server.delay)
+
+                if body.get("stream"):
+                    self._send_stream(body, reply)
+                else:
+                    self._send_json(_completion(body, reply))
+
+            def _send_json(self, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, body: Dict[str, Any], reply: Dict[str, Any]):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                for delta, finish_reason in _stream_deltas(reply, server.chunk_size):
+                    chunk = {
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "mock-model"),
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text: str):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _tool_call_payload(index: int, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+    """构造工具调用的完整结构"""
+    return {
+        "id": f"call_{index}",
+        "type": "function",
+        "function": {
+            "name": tool_call["name"],
+            "arguments": json.dumps(tool_call["arguments"], ensure_ascii=False),
+        },
+    }
+
+
+def _completion(body: Dict[str, Any], reply: Dict[str, Any]) -> Dict[str, Any]:
+    """构造非流式补全响应"""
+    message: Dict[str, Any] = {"role": "assistant", "content": reply["content"]}
+    if reply["tool_calls"]:
+        message["tool_calls"] = [
+            _tool_call_payload(i, tool_call) for i, tool_call in enumerate(reply["tool_calls"])
+        ]
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock-model"),
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if reply["tool_calls"] else "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _stream_deltas(reply: Dict[str, Any], chunk_size: int):
+    """把一条回复拆成流式增量序列"""
+    yield {"role": "assistant", "content": ""}, None
+
+    content = reply["content"] or ""
+    for start in range(0, len(content), chunk_size):
+        yield {"content": content[start : start + chunk_size]}, None
+
+    for i, tool_call in enumerate(reply["tool_calls"]):
+        payload = _tool_call_payload(i, tool_call)
+        arguments = payload["function"]["arguments"]
+        yield {
+            "tool_calls": [
+                {
+                    "index": i,
+                    "id": payload["id"],
+                    "type": "function",
+                    "function": {"name": payload["function"]["name"], "arguments": ""},
+                }
+            ]
+        }, None
+        for start in range(0, len(arguments), chunk_size):
+            yield {
+                "tool_calls": [
+                    {"index": i, "function": {"arguments": arguments[start : start + chunk_size]}}
+                ]
+            }, None
+
+    yield {}, "tool_calls" if reply["tool_calls"] else "stop"
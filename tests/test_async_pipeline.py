@@ -0,0 +1,109 @@
+"""
+异步流水线测试
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.async_llm_client import AsyncLLMClient
+from src.async_pipeline import AsyncTaskExecutor, AsyncTextToSpeech
+from src.tool_loop import AsyncToolLoop
+from tests.mock_openai_server import MockOpenAIServer
+
+
+class FakeExecutor:
+    """同步执行引擎替身"""
+
+    def execute(self, function_name, arguments):
+        return f"{function_name} 完成"
+
+    def execute_batch(self, function_calls):
+        return [self.execute(call["name"], call["arguments"]) for call in function_calls]
+
+
+class SlowTTS:
+    """记录朗读线程和顺序的语音合成替身"""
+
+    def __init__(self):
+        self.spoken = []
+        self.threads = set()
+
+    def speak(self, text):
+        time.sleep(0.05)
+        self.threads.add(threading.get_ident())
+        self.spoken.append(text)
+
+    def stop(self):
+        pass
+
+
+def test_async_tool_loop_streams_sentences(monkeypatch):
+    """测试异步客户端的工具调用循环与流式逐句回调"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(tool_calls=[{"name": "search_music", "arguments": {"keyword": "晴天"}}])
+        server.add_reply(content="找到了晴天。要播放吗?")
+
+        async def scenario():
+            loop = AsyncToolLoop(AsyncLLMClient(), AsyncTaskExecutor(FakeExecutor()))
+            spoken = []
+            result = await loop.run("搜索晴天", on_sentence=spoken.append)
+            return result, spoken
+
+        result, spoken = asyncio.run(scenario())
+
+        assert result.text == "找到了晴天。要播放吗?"
+        assert result.steps == 1
+        assert spoken == ["找到了晴天。", "要播放吗?"]
+
+
+def test_async_tts_queues_without_blocking():
+    """测试排队朗读不阻塞事件循环,且在同一线程按顺序执行"""
+    tts = SlowTTS()
+
+    async def scenario():
+        adapter = AsyncTextToSpeech(tts)
+        started = time.perf_counter()
+        futures = [adapter.speak_nowait(text) for text in ["一", "二", "三"]]
+        queued = time.perf_counter() - started
+        await asyncio.gather(*futures)
+        adapter.close()
+        return queued
+
+    queued = asyncio.run(scenario())
+
+    assert queued < 0.05
+    assert tts.spoken == ["一", "二", "三"]
+    assert len(tts.threads) == 1
+
+
+def test_async_tts_creates_engine_on_worker_thread(monkeypatch):
+    """测试未提供语音合成器时在工作线程上创建,引擎只在该线程上使用"""
+    created = []
+
+    class RecordingTTS(SlowTTS):
+        def __init__(self):
+            super().__init__()
+            created.append(threading.get_ident())
+
+    monkeypatch.setattr("src.tts_worker.TextToSpeech", RecordingTTS)
+
+    async def scenario():
+        adapter = AsyncTextToSpeech()
+        await adapter.speak("一")
+        adapter.close()
+        return adapter.tts
+
+    tts = asyncio.run(scenario())
+
+    assert tts.spoken == ["一"]
+    assert created != [threading.get_ident()]
+    assert tts.threads == set(created)
@@ -0,0 +1,94 @@
+"""
+离线基准测试组件测试
+"""
+
+import os
+import sys
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from benchmarks.harness import (
+    NullTextToSpeech,
+    TranscriptRecognizer,
+    WavPlaylistSource,
+    generate_wav,
+)
+from main import VoiceAssistant
+from src.metrics import LatencyRecorder, percentile
+from tests.mock_openai_server import MockOpenAIServer
+
+
+def test_percentile_interpolates():
+    """测试分位数计算"""
+    samples = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(samples, 50) == 3.0
+    assert percentile(samples, 100) == 5.0
+    assert percentile(samples, 25) == 2.0
+    assert percentile([], 95) == 0.0
+
+
+def test_latency_recorder_summary():
+    """测试分阶段统计"""
+    recorder = LatencyRecorder()
+    with recorder.time("stt"):
+        pass
+    recorder.record("llm", 0.2)
+    recorder.record("llm", 0.4)
+
+    summary = recorder.summary()
+    assert summary["stt"]["count"] == 1
+    assert summary["llm"]["count"] == 2
+    assert abs(summary["llm"]["p50"] - 300) < 1e-6
+    assert "llm" in recorder.report()
+
+
+def test_wav_playlist_drives_recognizer(tmp_path):
+    """测试 WAV 音频源按顺序返回对应文本,播放完后返回退出指令"""
+    wav = generate_wav(str(tmp_path / "a.wav"), speech_seconds=0.2, silence_seconds=0.1)
+    recognizer = TranscriptRecognizer(WavPlaylistSource([(wav, "你好"), (wav, "放首歌")]))
+
+    assert recognizer.listen() == "你好"
+    assert recognizer.listen() == "放首歌"
+    assert recognizer.listen() == "退出"
+
+
+def test_voice_assistant_end_to_end(tmp_path, monkeypatch):
+    """测试用离线组件端到端驱动 VoiceAssistant 并记录各阶段延迟"""
+    monkeypatch.setattr(config, "PLAN_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "LOCAL_INTENT_ENABLED", False)
+    monkeypatch.setattr(config, "LLM_WARMUP", False)
+    monkeypatch.setattr(config, "LLM_KEEPALIVE_INTERVAL", 0)
+    monkeypatch.setattr(config, "LLM_STREAMING", True)
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(tmp_path))
+
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(content="你好,有什么可以帮你?")
+        server.add_reply(tool_calls=[{"name": "search_music", "arguments": {"keyword": "晴天"}}])
+        server.add_reply(content="没有找到这首歌。")
+
+        wav = generate_wav(str(tmp_path / "a.wav"), speech_seconds=0.2, silence_seconds=0.1)
+        tts = NullTextToSpeech()
+        assistant = VoiceAssistant(
+            speech_recognizer=TranscriptRecognizer(
+                WavPlaylistSource([(wav, "你好"), (wav, "找一下晴天")])
+            ),
+            tts=tts,
+        )
+        assistant.run()
+        assistant.task_executor.shutdown()
+
+    assert tts.spoken[1] == "你好,有什么可以帮你?"
+    assert tts.spoken[2] == "没有找到这首歌。"
+    assert tts.spoken[-1] == "再见!"
+
+    summary = assistant.metrics.summary()
+    assert summary["turn"]["count"] == 2
+    assert summary["first_audio"]["count"] == 2
+    assert summary["llm"]["count"] == 3
+    assert summary["tools"]["count"] == 1
+    assert summary["stt"]["count"] == 3
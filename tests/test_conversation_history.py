@@ -0,0 +1,70 @@
+"""
+对话历史管理测试
+"""
+
+import os
+import sys
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.conversation_history import ConversationHistory
+
+
+def _add_tool_turn(history, index):
+    """追加一轮带工具调用的对话"""
+    history.append({"role": "user", "content": f"读取第{index}个文件"})
+    history.append(
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{index}",
+                    "type": "function",
+                    "function": {"name": "file_operation", "arguments": '{"operation": "read"}'},
+                }
+            ],
+        }
+    )
+    history.append(
+        {
+            "role": "tool",
+            "tool_call_id": f"call_{index}",
+            "name": "file_operation",
+            "content": "内容" * 300,
+        }
+    )
+    history.append({"role": "assistant", "content": f"第{index}个文件读取完成"})
+
+
+def test_budget_keeps_tool_calls_with_results():
+    """测试裁剪后工具调用与结果不被拆开,且 token 数保持在预算内"""
+    history = ConversationHistory("系统提示", max_tokens=1500, max_turns=10, summary_max_tokens=200)
+
+    for index in range(20):
+        _add_tool_turn(history, index)
+        history.enforce_budget()
+        assert history.count_tokens() <= 1500
+
+    messages = history.messages
+    assert messages[0] == {"role": "system", "content": "系统提示"}
+    assert messages[1]["content"].startswith("较早对话摘要")
+    assert "读取第0个文件" not in messages[1]["content"]  # 摘要本身也受预算限制
+    assert messages[2]["role"] == "user"
+
+    answered = {m["tool_call_id"] for m in messages if m["role"] == "tool"}
+    for message in messages:
+        for tool_call in message.get("tool_calls") or []:
+            assert tool_call["id"] in answered
+
+
+def test_latest_turn_is_always_kept():
+    """测试最新一轮即使超出预算也完整保留"""
+    history = ConversationHistory("系统提示", max_tokens=10, max_turns=10)
+    _add_tool_turn(history, 1)
+    history.enforce_budget()
+
+    assert len(history.turns) == 1
+    assert history.summary_lines == []
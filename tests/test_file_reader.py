@@ -0,0 +1,163 @@
+"""
+文件窗口读取测试
+"""
+
+import codecs
+import os
+import sys
+
+import pytest
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.controllers.file_controller import FileController
+from src.file_reader import detect_encoding, read_window
+
+
+@pytest.fixture(params=[False, True], ids=["read", "mmap"])
+def use_mmap(request, monkeypatch):
+    """分别通过普通读取和 mmap 运行"""
+    monkeypatch.setattr(config, "FILE_MMAP_THRESHOLD", 1 if request.param else 1 << 40)
+    return request.param
+
+
+def test_detect_encoding():
+    """测试按开头的字节识别编码,二进制文件报错"""
+    assert detect_encoding("你好,世界".encode("utf-8")) == ("utf-8", 0)
+    # 在多字节字符中间截断的开头不影响识别
+    assert detect_encoding("你好".encode("utf-8")[:4]) == ("utf-8", 0)
+    assert detect_encoding("你好,世界".encode("gb18030")) == ("gb18030", 0)
+    assert detect_encoding(codecs.BOM_UTF8 + b"abc") == ("utf-8", 3)
+    assert detect_encoding(codecs.BOM_UTF16_LE + "ab".encode("utf-16-le")) == ("utf-16-le", 2)
+    with pytest.raises(ValueError):
+        detect_encoding(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+
+def test_head_tail_and_range_windows(tmp_path, use_mmap):
+    """测试开头、结尾和字节范围窗口,窗口边界落在多字节字符中间时不产生乱码"""
+    path = tmp_path / "log.txt"
+    lines = [f"第{i}行 日志内容" for i in range(1000)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    size = path.stat().st_size
+
+    head = read_window(str(path), length=100)
+    assert head.start == 0
+    assert head.text.startswith("第0行")
+    assert "�" not in head.text
+    assert head.end <= 100
+
+    # 接着上一次的 end 继续读取,内容首尾相接
+    following = read_window(str(path), offset=head.end, length=100)
+    assert following.start == head.end
+    assert "�" not in following.text
+    assert (head.text + following.text) == path.read_bytes()[: following.end].decode("utf-8")
+
+    # 从中间的任意字节开始
+    middle = read_window(str(path), offset=size // 2 + 1, length=64)
+    assert "�" not in middle.text
+    assert middle.end - middle.start <= 64
+
+    # 从末尾倒数时去掉不完整的第一行
+    tail = read_window(str(path), offset=-100)
+    assert tail.end == size
+    assert tail.text.endswith("第999行 日志内容\n")
+    assert tail.text.split("\n")[0] in lines
+
+
+def test_gb18030_and_utf16(tmp_path, use_mmap):
+    """测试 GB18030 和带 BOM 的 UTF-16 文件"""
+    gbk = tmp_path / "gbk.txt"
+    gbk.write_bytes("\n".join(f"中文第{i}行" for i in range(200)).encode("gb18030"))
+    window = read_window(str(gbk), offset=301, length=200)
+    assert window.encoding == "gb18030"
+    assert window.text.startswith("中文第")
+    assert read_window(str(gbk), grep="第199行").text == "200: 中文第199行"
+
+    utf16 = tmp_path / "utf16.txt"
+    utf16.write_bytes(codecs.BOM_UTF16_LE + "你好\n世界\n".encode("utf-16-le"))
+    assert read_window(str(utf16)).text == "你好\n世界\n"
+    # 起始位置落在字符中间时对齐到下一个字符,末尾不完整的字符留给下一次
+    window = read_window(str(utf16), offset=3, length=4)
+    assert (window.text, window.start, window.end) == ("好", 4, 6)
+    assert read_window(str(utf16), grep="世").text == "2: 世界"
+    assert read_window(str(utf16), offset=8, grep="世").text == "2: 世界"
+
+
+def test_grep_streams_and_continues(tmp_path, use_mmap, monkeypatch):
+    """测试逐行过滤: 返回行号,匹配过多时给出继续搜索的位置"""
+    monkeypatch.setattr(config, "FILE_GREP_MAX_MATCHES", 3)
+    path = tmp_path / "app.log"
+    path.write_text(
+        "".join(
+            f"{i} {'ERROR 连接失败' if i % 10 == 0 else 'INFO 正常'}\r\n" for i in range(1, 101)
+        ),
+        encoding="utf-8",
+    )
+
+    first = read_window(str(path), grep="error")
+    assert first.text == "10: 10 ERROR 连接失败\n20: 20 ERROR 连接失败\n30: 30 ERROR 连接失败"
+    assert first.truncated
+
+    second = read_window(str(path), offset=first.end, grep="error")
+    # 行号从文件开头算起,与起始位置无关
+    assert second.text.splitlines()[0] == "40: 40 ERROR 连接失败"
+    middle = read_window(str(path), offset=first.end + 5, length=200, grep="error")
+    assert middle.text == "40: 40 ERROR 连接失败"
+
+    # 正则表达式与普通文本的结果一致
+    regex = read_window(str(path), grep=r"^\d+0 error")
+    assert (regex.text, regex.end) == (first.text, first.end)
+
+    # 不是合法正则表达式时按普通文本匹配
+    assert read_window(str(path), grep="连接失败(").matches == 0
+
+
+def test_memory_does_not_depend_on_file_size(tmp_path):
+    """测试读取大文件的结尾和过滤时内存占用不随文件大小增长"""
+    import tracemalloc
+
+    def peak_memory(blocks):
+        path = tmp_path / f"{blocks}.log"
+        block = ("INFO 一切正常\n" * 4000).encode("utf-8")
+        with open(path, "wb") as f:
+            for _ in range(blocks):
+                f.write(block)
+            f.write("ERROR 最后一行\n".encode("utf-8"))
+
+        tracemalloc.start()
+        tail = read_window(str(path), offset=-30)
+        found = read_window(str(path), grep="ERROR")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert tail.text == "ERROR 最后一行\n"
+        assert found.text == f"{blocks * 4000 + 1}: ERROR 最后一行"
+        return peak, path.stat().st_size
+
+    small, _ = peak_memory(5)
+    large, size = peak_memory(40)
+    assert large < small * 1.5
+    assert large < size / 2
+
+
+def test_file_controller_read_file(tmp_path, monkeypatch):
+    """测试 read_file 的输出: 小文件保持原格式,大文件提示继续读取的 offset"""
+    monkeypatch.setattr(config, "SAFE_DIRECTORIES", [str(tmp_path)])
+    controller = FileController()
+    small = tmp_path / "note.txt"
+    small.write_text("这是一个测试文件", encoding="utf-8")
+    assert controller.read_file(str(small)) == f"文件内容 ({small}):\n这是一个测试文件"
+
+    big = tmp_path / "big.txt"
+    big.write_text("a" * 10000, encoding="utf-8")
+    result = controller.read_file(str(big), length=100)
+    assert result.startswith(f"文件内容 ({big}, 第 0-100 字节, 共 10000 字节, 编码 utf-8):")
+    assert result.endswith("(后面还有 9900 字节,可用 offset=100 继续读取)")
+
+    assert controller.read_file(str(big), grep="b").startswith("未在")
+    binary = tmp_path / "image.png"
+    binary.write_bytes(b"\x89PNG\x00\x00\x00")
+    assert "二进制" in controller.read_file(str(binary))
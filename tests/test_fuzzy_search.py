@@ -0,0 +1,106 @@
+"""
+模糊搜索测试
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.controllers.music_controller import MusicController
+from src.fuzzy_search import FuzzyIndex, ngrams, substring_distance, text_forms
+from src.music_library import MusicLibrary
+
+NAMES = ["青花瓷", "晴天", "东风破", "Amani (Live)", "海阔天空", "光辉岁月"]
+
+
+def search(index, query, **kwargs):
+    """搜索结果的名称"""
+    return [NAMES[key] for key, _ in index.search(query, **kwargs)]
+
+
+def test_substring_distance_and_ngrams():
+    """测试子串编辑距离和 n-gram 提取"""
+    assert substring_distance("晴天", "告白晴天版") == 0
+    assert substring_distance("青花词", "青花瓷") == 1
+    assert substring_distance("abc", "") == 3
+    assert ngrams("青花瓷", 2) == ["青花", "花瓷"]
+    assert ngrams("晴", 2) == ["晴"]
+    assert ngrams("", 2) == []
+
+
+def test_character_matching_without_pinyin():
+    """测试按汉字和字母匹配,忽略大小写、空白和标点"""
+    index = FuzzyIndex(enumerate(NAMES))
+
+    assert search(index, "海阔天空") == ["海阔天空"]
+    assert search(index, "amani live") == ["Amani (Live)"]
+    assert search(index, "光辉岁") == ["光辉岁月"]
+    assert search(index, "完全无关的歌") == []
+
+
+def test_homophones_pinyin_and_initials():
+    """测试同音错字、全拼和首字母都能找到曲目"""
+    pytest.importorskip("pypinyin")
+    assert text_forms("青花瓷 Live") == {
+        "chars": "青花瓷live",
+        "pinyin": "qinghuacilive",
+        "initials": "qhcl",
+    }
+    index = FuzzyIndex(enumerate(NAMES))
+
+    assert search(index, "青花词")[0] == "青花瓷"
+    assert search(index, "东风迫")[0] == "东风破"
+    assert search(index, "qinghuaci")[0] == "青花瓷"
+    assert search(index, "dongfengpo")[0] == "东风破"
+    assert search(index, "hktk")[0] == "海阔天空"
+
+
+def test_search_music_falls_back_to_fuzzy(tmp_path, monkeypatch):
+    """测试没有完全匹配时 search_music 返回相近的结果"""
+    pytest.importorskip("pypinyin")
+    root = tmp_path / "music"
+    root.mkdir()
+    (root / "青花瓷.mp3").write_bytes(b"")
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(root))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_WATCH", False)
+
+    result = MusicController().search_music("青花词")
+
+    assert result.startswith("未找到包含 '青花词' 的音乐文件,以下是 1 个相近的结果")
+    assert "青花瓷.mp3" in result
+
+
+def test_library_rebuilds_fuzzy_index_in_background(tmp_path):
+    """测试音乐库变化后查询仍立即返回旧的索引,后台重建完成后再换成新的索引"""
+    root = tmp_path / "music"
+    root.mkdir()
+    (root / "青花瓷.mp3").write_bytes(b"")
+    library = MusicLibrary(str(root), path=":memory:")
+    library.refresh()
+    old = library.fuzzy_index()
+
+    # 让后台重建停在建立索引之前
+    release = threading.Event()
+    build = library._build_fuzzy
+    library._build_fuzzy = lambda rows: release.wait(5) and build(rows)
+
+    (root / "晴天.mp3").write_bytes(b"")
+    library.apply_changes(changed=[str(root / "晴天.mp3")])
+    assert library.fuzzy_index() is old
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while library.fuzzy_index() is old and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(library.fuzzy_index()) == 2
+    assert [os.path.basename(p) for p in library.fuzzy_search("qingtian")] == ["晴天.mp3"]
+    library.close()
@@ -0,0 +1,66 @@
+"""
+本地意图匹配测试
+"""
+
+import os
+import sys
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.intent_matcher import IntentMatcher, parse_number
+
+LIBRARY = {"晴天", "周杰伦"}
+
+
+def test_common_commands_match_locally():
+    """测试常见指令在本地命中"""
+    matcher = IntentMatcher(has_music=lambda keyword: keyword in LIBRARY)
+
+    cases = {
+        "暂停音乐": ("play_music", {"action": "pause"}),
+        "继续播放。": ("play_music", {"action": "resume"}),
+        "音量调大一点": ("system_control", {"action": "volume_up"}),
+        "音量调小20": ("system_control", {"action": "volume_down", "value": 20}),
+        "把音量调到五十": ("system_control", {"action": "set_volume", "value": 50}),
+        "截图": ("system_control", {"action": "screenshot"}),
+        "帮我打开浏览器吧": ("open_application", {"app_name": "浏览器"}),
+        "下一首": ("music_queue", {"action": "next"}),
+        "播放上一首歌": ("music_queue", {"action": "previous"}),
+        "打开随机播放": ("music_queue", {"action": "shuffle"}),
+        "播放晴天": ("find_and_play", {"keyword": "晴天"}),
+        "我想听周杰伦的歌": ("find_and_play", {"keyword": "周杰伦"}),
+    }
+
+    for text, (name, arguments) in cases.items():
+        assert matcher.match(text) == {"name": name, "arguments": arguments}, text
+
+
+def test_uncertain_commands_fall_back():
+    """测试不确定的指令交给大模型"""
+    matcher = IntentMatcher(has_music=lambda keyword: keyword in LIBRARY)
+
+    assert matcher.match("打开百度搜索天气") is None
+    assert matcher.match("把音量调到两百") is None
+    assert matcher.match("帮我写一篇关于春天的文章") is None
+    assert matcher.match("播放音乐") is None
+    assert matcher.match("播放第二首") is None
+
+    # 复合指令、描述性的说法和音乐库中没有的关键词
+    assert matcher.match("播放周杰伦的晴天然后把音量调到50") is None
+    assert matcher.match("播放音乐并把音量调大") is None
+    assert matcher.match("我想听点安静的") is None
+    assert matcher.match("播放我的歌单") is None
+    assert matcher.match("播放七里香") is None
+    # 没有提供音乐库时搜索并播放一律交给大模型
+    assert IntentMatcher().match("播放晴天") is None
+
+
+def test_parse_number():
+    """测试数字解析"""
+    assert parse_number("35") == 35
+    assert parse_number("十") == 10
+    assert parse_number("二十五") == 25
+    assert parse_number("一百") == 100
+    assert parse_number("百百") is None
@@ -0,0 +1,150 @@
+"""
+音乐库索引测试
+"""
+
+import os
+import shutil
+import sys
+import threading
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.controllers.music_controller import MusicController
+from src.music_library import MusicLibrary
+
+
+def make_tree(root):
+    """生成一个小音乐目录"""
+    for relative in [
+        "周杰伦/叶惠美/晴天.mp3",
+        "周杰伦/魔杰座/稻香.flac",
+        "Beyond/Amani (Live).ogg",
+        "Beyond/海阔天空.mp3",
+        "notes.txt",
+    ]:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+
+
+def test_search_short_and_long_keywords(tmp_path):
+    """测试短关键词(LIKE)和长关键词(FTS)都能按文件名匹配,且不区分大小写"""
+    make_tree(tmp_path / "music")
+    library = MusicLibrary(str(tmp_path / "music"), path=":memory:")
+    stats = library.refresh()
+
+    assert len(library) == 4
+    assert stats["added"] == 4
+    assert [os.path.basename(p) for p in library.search("晴天")] == ["晴天.mp3"]
+    assert [os.path.basename(p) for p in library.search("amani")] == ["Amani (Live).ogg"]
+    assert [os.path.basename(p) for p in library.search("海阔天空")] == ["海阔天空.mp3"]
+    assert library.count("天") == 2
+    assert library.search("txt") == []
+    assert library.search("100%") == []
+
+
+def test_incremental_refresh_only_lists_changed_dirs(tmp_path):
+    """测试增量刷新只重新列出修改时间变化的目录,并且索引在重新打开后仍然有效"""
+    root = tmp_path / "music"
+    make_tree(root)
+    index = str(tmp_path / "library.db")
+    MusicLibrary(str(root), path=index).refresh()
+
+    library = MusicLibrary(str(root), path=index)
+    stats = library.refresh()
+    assert stats["dirs"] == 5
+    assert stats["listed"] == 0
+    assert len(library) == 4
+
+    (root / "周杰伦" / "魔杰座" / "给我一首歌的时间.mp3").write_bytes(b"")
+    shutil.rmtree(root / "Beyond")
+    stats = library.refresh()
+
+    assert stats["added"] == 1
+    assert stats["removed"] == 2
+    assert library.search("海阔") == []
+    assert [os.path.basename(p) for p in library.search("一首歌")] == ["给我一首歌的时间.mp3"]
+
+
+def test_search_ranks_by_relevance(tmp_path):
+    """测试搜索结果按相关程度排序: 完全相同、以关键词开头、其他包含关键词的"""
+    root = tmp_path / "music"
+    root.mkdir()
+    for name in ["不是晴天", "晴天 (Live)", "晴天", "Sunny Day", "Sunny Day Real"]:
+        (root / f"{name}.mp3").write_bytes(b"")
+    library = MusicLibrary(str(root), path=":memory:")
+    library.refresh()
+
+    names = [os.path.basename(p) for p in library.search("晴天")]
+    assert names == ["晴天.mp3", "晴天 (Live).mp3", "不是晴天.mp3"]
+    # 长关键词走全文索引,同样先取完全相同的
+    assert os.path.basename(library.search("sunny day")[0]) == "Sunny Day.mp3"
+
+
+def test_refresh_detects_files_edited_in_place(tmp_path):
+    """测试原地修改的文件(目录修改时间不变)也会被刷新"""
+    root = tmp_path / "music"
+    make_tree(root)
+    library = MusicLibrary(str(root), path=":memory:")
+    library.refresh()
+
+    song = root / "周杰伦" / "叶惠美" / "晴天.mp3"
+    directory_mtime = os.stat(song.parent).st_mtime_ns
+    song.write_bytes(b"retagged")
+    os.utime(song.parent, ns=(directory_mtime, directory_mtime))
+
+    stats = library.refresh()
+    assert (stats["listed"], stats["updated"]) == (0, 1)
+    assert library.refresh()["updated"] == 0
+
+
+def test_search_music_uses_library(tmp_path, monkeypatch):
+    """测试 search_music 通过索引查询并保持原有的结果格式"""
+    make_tree(tmp_path / "music")
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(tmp_path / "music"))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_DIR", str(tmp_path / "index"))
+
+    controller = MusicController()
+    result = controller.search_music("稻香")
+
+    assert result.startswith("找到 1 个匹配的音乐文件")
+    assert "稻香.flac" in result
+    assert controller.search_music("七里香") == "未找到包含 '七里香' 的音乐文件"
+
+
+def test_has_music_does_not_wait_for_first_scan(tmp_path, monkeypatch):
+    """测试首次扫描在锁外进行: 扫描期间 has_music 立即返回False,搜索等待扫描完成"""
+    make_tree(tmp_path / "music")
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(tmp_path / "music"))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_WATCH", False)
+    scanning, release = threading.Event(), threading.Event()
+    refresh = MusicLibrary.refresh
+
+    def slow_refresh(library):
+        scanning.set()
+        release.wait(5)
+        return refresh(library)
+
+    monkeypatch.setattr(MusicLibrary, "refresh", slow_refresh)
+    controller = MusicController()
+    try:
+        assert scanning.wait(5)
+        assert controller.has_music("稻香") is False
+
+        results = []
+        searcher = threading.Thread(target=lambda: results.append(controller.search_music("稻香")))
+        searcher.start()
+        searcher.join(timeout=0.2)
+        assert searcher.is_alive()
+
+        release.set()
+        searcher.join(timeout=5)
+        assert results[0].startswith("找到 1 个匹配的音乐文件")
+        assert controller.has_music("稻香") is True
+        assert controller.has_music("七里香") is False
+    finally:
+        release.set()
+        controller.close()
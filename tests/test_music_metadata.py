@@ -0,0 +1,129 @@
+"""
+音乐标签读取测试
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("mutagen")
+
+from mutagen.easyid3 import EasyID3
+
+from src.music_library import MusicLibrary
+from src.music_metadata import MetadataExtractor, read_metadata
+
+# 约1秒的最小 MPEG 音频帧序列
+FRAMES = (bytes.fromhex("fffb9064") + b"\x00" * 413) * 40
+
+
+def make_mp3(path, **tags):
+    """生成带 ID3 标签的 mp3 文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(FRAMES)
+    if tags:
+        id3 = EasyID3()
+        for key, value in tags.items():
+            id3[key] = value
+        id3.save(str(path))
+
+
+def test_read_metadata(tmp_path):
+    """测试读取标签和时长,无法解析的文件返回None"""
+    make_mp3(tmp_path / "a.mp3", artist="周杰伦", album="叶惠美", title="晴天")
+    (tmp_path / "broken.mp3").write_bytes(b"not audio")
+
+    metadata = read_metadata(str(tmp_path / "a.mp3"))
+    assert metadata["artist"] == "周杰伦"
+    assert metadata["album"] == "叶惠美"
+    assert metadata["title"] == "晴天"
+    assert metadata["duration"] == pytest.approx(1.0, abs=0.1)
+    assert read_metadata(str(tmp_path / "broken.mp3")) is None
+
+
+def test_extractor_process_pool_matches_inline(tmp_path):
+    """测试进程池分块读取与在当前进程读取的结果一致"""
+    paths = []
+    for i in range(6):
+        make_mp3(tmp_path / f"{i}.mp3", artist=f"歌手{i}")
+        paths.append(str(tmp_path / f"{i}.mp3"))
+
+    inline = [
+        item
+        for chunk in MetadataExtractor(workers=1, chunk_size=2).extract(paths)
+        for item in chunk
+    ]
+    pooled = list(MetadataExtractor(workers=2, chunk_size=2).extract(paths))
+
+    assert len(pooled) == 3
+    assert [item for chunk in pooled for item in chunk] == inline
+    assert [metadata["artist"] for _, metadata in inline] == [f"歌手{i}" for i in range(6)]
+
+
+def test_library_searches_tags_and_skips_unchanged(tmp_path):
+    """测试索引记录标签后可按歌手、专辑搜索,未修改的文件不再读取"""
+    root = tmp_path / "music"
+    make_mp3(root / "01.mp3", artist="周杰伦", album="叶惠美", title="晴天")
+    make_mp3(root / "02.mp3", artist="Beyond", album="乐与怒", title="海阔天空")
+    make_mp3(root / "03.mp3")
+    library = MusicLibrary(str(root), path=":memory:")
+    library.refresh()
+
+    extractor = MetadataExtractor(workers=1)
+    stats = library.update_metadata(extractor)
+    assert stats["files"] == 3
+    assert stats["tagged"] == 2
+    assert stats["files_per_second"] > 0
+
+    assert [os.path.basename(p) for p in library.search("周杰伦")] == ["01.mp3"]
+    assert [os.path.basename(p) for p in library.search("叶惠美")] == ["01.mp3"]
+    assert [os.path.basename(p) for p in library.search("beyond")] == ["02.mp3"]
+    assert [os.path.basename(p) for p in library.search("晴")] == ["01.mp3"]
+    assert library.metadata(str(root / "01.mp3"))["title"] == "晴天"
+
+    assert library.update_metadata(extractor)["files"] == 0
+
+    # 修改标签后只重新读取这一个文件
+    id3 = EasyID3(str(root / "02.mp3"))
+    id3["artist"] = "黄家驹"
+    id3.save()
+    os.utime(root / "02.mp3", ns=(0, 10**18))
+    library.apply_changes(changed=[str(root / "02.mp3")])
+    assert library.update_metadata(extractor)["files"] == 1
+    assert library.search("beyond") == []
+    assert [os.path.basename(p) for p in library.search("黄家驹")] == ["02.mp3"]
+
+
+def test_old_index_is_migrated(tmp_path):
+    """测试旧版本的索引文件打开时补上标签列并重建全文索引"""
+    root = tmp_path / "music"
+    make_mp3(root / "晴天.mp3", artist="周杰伦")
+    index = str(tmp_path / "library.db")
+
+    conn = sqlite3.connect(index)
+    conn.executescript("""
+        CREATE TABLE tracks (
+            id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, dir TEXT NOT NULL,
+            name TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL
+        );
+        CREATE VIRTUAL TABLE tracks_fts USING fts5(
+            name, content='tracks', content_rowid='id', tokenize='trigram'
+        );
+        """)
+    conn.execute(
+        "INSERT INTO tracks(path, dir, name, mtime_ns, size) VALUES (?, ?, ?, 0, 0)",
+        (str(root / "晴天.mp3"), str(root), "晴天"),
+    )
+    conn.commit()
+    conn.close()
+
+    library = MusicLibrary(str(root), path=index)
+    assert [os.path.basename(p) for p in library.search("晴天")] == ["晴天.mp3"]
+    library.update_metadata(MetadataExtractor(workers=1))
+    assert [os.path.basename(p) for p in library.search("周杰伦")] == ["晴天.mp3"]
@@ -0,0 +1,195 @@
+"""
+播放列表测试
+"""
+
+import os
+import sys
+import time
+import wave
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.controllers.music_controller import MusicController
+
+
+def make_wav(path, seconds):
+    """生成一段静音 wav"""
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(22050)
+        f.writeframes(b"\x00\x00" * int(22050 * seconds))
+    return str(path)
+
+
+def wait_for(condition, timeout=5.0):
+    """等待条件成立"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def make_controller(monkeypatch):
+    """不启用音乐库索引的控制器"""
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_ENABLED", False)
+    return MusicController()
+
+
+def test_queue_plays_through_with_preloading(tmp_path, monkeypatch):
+    """测试播放列表预载下一首,监视线程依次切换到最后一首"""
+    controller = make_controller(monkeypatch)
+    tracks = [make_wav(tmp_path / f"{i}.wav", 0.3) for i in range(3)]
+    missing = str(tmp_path / "missing.wav")
+
+    try:
+        result = controller.play_queue(tracks + [missing])
+        assert result.startswith("正在播放: 0.wav (播放列表共 3 首)")
+        assert "已跳过 1 个文件" in result
+        assert controller._queued == tracks[1]
+
+        assert wait_for(lambda: controller.position == 1)
+        assert controller.current_music == tracks[1]
+        assert controller._queued == tracks[2]
+        assert wait_for(lambda: not controller.is_playing)
+        assert controller.position == 2
+        assert controller.current_music is None
+    finally:
+        controller.close()
+
+
+def test_pause_is_not_mistaken_for_end_of_track(tmp_path, monkeypatch):
+    """测试暂停与监视线程互斥: 暂停后 get_busy() 为 False,不能被当作播放结束切到下一首"""
+    import threading
+
+    import pygame
+
+    controller = make_controller(monkeypatch)
+    tracks = [make_wav(tmp_path / f"{i}.wav", 5) for i in range(2)]
+    pause = pygame.mixer.music.pause
+
+    def check():
+        with controller._play_lock:
+            controller._check_playback()
+
+    def pause_then_check():
+        # 在 mixer 已暂停、状态尚未更新时运行一次监视线程的检查
+        pause()
+        checker = threading.Thread(target=check)
+        checker.start()
+        checker.join(timeout=0.2)
+        pause_then_check.checker = checker
+
+    try:
+        controller.play_queue(tracks)
+        monkeypatch.setattr(pygame.mixer.music, "pause", pause_then_check)
+        assert controller.pause() == "音乐已暂停"
+        pause_then_check.checker.join(timeout=2)
+        assert controller.position == 0
+        assert controller.is_playing and controller.is_paused
+        assert controller.resume() == "继续播放音乐"
+    finally:
+        controller.close()
+
+
+def test_next_previous_and_shuffle(tmp_path, monkeypatch):
+    """测试上一首、下一首和随机播放(正在播放的一首保持不变)"""
+    controller = make_controller(monkeypatch)
+    tracks = [make_wav(tmp_path / f"{i}.wav", 5) for i in range(6)]
+
+    try:
+        controller.play_queue(tracks)
+        assert controller.previous_track() == "已经是第一首"
+        assert controller.next_track() == "下一首: 1.wav"
+        assert controller.next_track() == "下一首: 2.wav"
+        assert controller.previous_track() == "上一首: 1.wav"
+
+        controller.set_shuffle(True)
+        assert controller.current_music == tracks[1]
+        assert controller.playlist[controller.position] == tracks[1]
+        assert sorted(controller.playlist) == sorted(tracks)
+        assert controller._queued == controller.playlist[controller.position + 1]
+
+        controller.set_shuffle(False)
+        assert controller.playlist == tracks
+        assert controller.position == 1
+        assert "播放列表第 2/6 首" in controller.get_status()
+
+        assert controller.enqueue([tracks[0]]) == "已添加 1 首到播放列表,共 7 首"
+        assert controller.stop() == "音乐已停止"
+        time.sleep(0.1)
+        assert controller.position == 1
+    finally:
+        controller.close()
+
+
+def test_queue_by_keyword(tmp_path, monkeypatch):
+    """测试按关键词把匹配的音乐全部加入播放列表"""
+    controller = make_controller(monkeypatch)
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(tmp_path))
+    make_wav(tmp_path / "晴天.wav", 5)
+    make_wav(tmp_path / "晴天 (Live).wav", 5)
+    make_wav(tmp_path / "稻香.wav", 5)
+
+    try:
+        # 与关键词相同的排在最前
+        assert controller.play_queue(keyword="晴天").startswith("正在播放: 晴天.wav")
+        assert len(controller.playlist) == 2
+        assert controller.play_queue(keyword="七里香") == "未找到包含 '七里香' 的音乐文件"
+    finally:
+        controller.close()
+
+
+def test_find_and_play(tmp_path, monkeypatch):
+    """测试搜索并播放在一次调用中完成,可以指定序号或把全部结果作为播放列表"""
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(tmp_path / "music"))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_WATCH", False)
+    (tmp_path / "music").mkdir()
+    for name in ["晴天", "晴天 (Live)", "稻香"]:
+        make_wav(tmp_path / "music" / f"{name}.wav", 5)
+    controller = MusicController()
+
+    try:
+        assert controller.find_and_play("晴天") == "正在播放: 晴天.wav (共找到 2 首)"
+        result = controller.find_and_play("晴天", index=2)
+        assert result == "正在播放: 晴天 (Live).wav (共找到 2 首)"
+        assert controller.find_and_play("晴天", index=3).startswith("错误")
+        assert controller.find_and_play("晴天", play_all=True).endswith("(播放列表共 2 首)")
+        assert controller.find_and_play("七里香") == "未找到包含 '七里香' 的音乐文件"
+    finally:
+        controller.close()
+
+
+def test_search_results_are_structured(tmp_path, monkeypatch):
+    """测试 search_music 工具返回带序号的结构化结果,play_music 可按序号播放"""
+    import json
+
+    from src.task_executor import TaskExecutor
+
+    # 写作控制器会创建 OpenAI 客户端,没有 API key 时(如 CI)初始化失败
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(config, "DEFAULT_MUSIC_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "MUSIC_LIBRARY_ENABLED", False)
+    make_wav(tmp_path / "晴天.wav", 5)
+    make_wav(tmp_path / "稻香.wav", 5)
+    executor = TaskExecutor()
+
+    try:
+        found = json.loads(executor.execute("search_music", {"keyword": "稻香"}))
+        assert found == {
+            "keyword": "稻香",
+            "total": 1,
+            "fuzzy": False,
+            "results": [{"index": 1, "name": "稻香.wav"}],
+        }
+        result = executor.execute("play_music", {"action": "play", "index": 1})
+        assert result == "正在播放: 稻香.wav"
+        assert executor.execute("play_music", {"action": "play", "index": 5}).startswith("错误")
+    finally:
+        executor.shutdown()
@@ -0,0 +1,104 @@
+"""
+音乐目录监视测试
+"""
+
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.music_library import MusicLibrary
+from src.music_watcher import LibraryWatcher
+
+
+def make_library(tmp_path):
+    """生成一个小音乐目录并建立索引"""
+    root = tmp_path / "music"
+    for relative in ["周杰伦/晴天.mp3", "周杰伦/稻香.mp3", "Beyond/海阔天空.mp3"]:
+        (root / relative).parent.mkdir(parents=True, exist_ok=True)
+        (root / relative).write_bytes(b"")
+    library = MusicLibrary(str(root), path=str(tmp_path / "library.db"))
+    library.refresh()
+    return root, library
+
+
+def names(library, keyword):
+    """搜索结果的文件名"""
+    return sorted(os.path.basename(p) for p in library.search(keyword))
+
+
+def wait_for(condition, timeout=5.0):
+    """等待条件成立"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_apply_changes_updates_index_without_rescan(tmp_path):
+    """测试增量写入新建、移动、删除的文件和目录,之后的刷新不必重新列出目录"""
+    root, library = make_library(tmp_path)
+
+    (root / "周杰伦" / "七里香.mp3").write_bytes(b"")
+    (root / "陈奕迅" / "十年").mkdir(parents=True)
+    (root / "陈奕迅" / "十年" / "十年.flac").write_bytes(b"")
+    os.rename(root / "周杰伦" / "稻香.mp3", root / "周杰伦" / "稻香 live.mp3")
+    shutil.rmtree(root / "Beyond")
+
+    stats = library.apply_changes(
+        changed=[
+            str(root / "周杰伦" / "七里香.mp3"),
+            str(root / "陈奕迅"),
+            str(root / "周杰伦" / "稻香 live.mp3"),
+        ],
+        deleted=[str(root / "周杰伦" / "稻香.mp3"), str(root / "Beyond"), "/elsewhere/a.mp3"],
+    )
+
+    assert stats == {"added": 3, "updated": 0, "removed": 2}
+    assert names(library, "香") == ["七里香.mp3", "稻香 live.mp3"]
+    assert names(library, "十年") == ["十年.flac"]
+    assert names(library, "海阔") == []
+    assert library.refresh()["listed"] == 0
+
+
+def test_polling_fallback_refreshes_periodically(tmp_path):
+    """测试无法监听事件时定时增量刷新"""
+    root, library = make_library(tmp_path)
+    watcher = LibraryWatcher(library, poll_interval=0.1, use_events=False)
+    watcher.start()
+    try:
+        (root / "周杰伦" / "七里香.mp3").write_bytes(b"")
+        assert wait_for(lambda: names(library, "七里香") == ["七里香.mp3"])
+    finally:
+        watcher.stop()
+    assert watcher.mode == "polling"
+
+
+def test_filesystem_events_are_debounced_into_batches(tmp_path):
+    """测试文件系统事件合并为一批写入索引"""
+    pytest.importorskip("watchdog")
+    root, library = make_library(tmp_path)
+    watcher = LibraryWatcher(library, debounce=0.3)
+    watcher.start()
+    try:
+        album = root / "新专辑"
+        album.mkdir()
+        for i in range(10):
+            (album / f"新歌{i}.mp3").write_bytes(b"")
+        (root / "周杰伦" / "晴天.mp3").unlink()
+
+        assert wait_for(lambda: len(library.search("新歌")) == 10 and not library.search("晴天"))
+    finally:
+        watcher.stop()
+
+    assert watcher.mode == "events"
+    assert watcher.batches <= 2
+    assert library.refresh()["listed"] == 0
@@ -0,0 +1,109 @@
+"""
+环境噪音校准测试
+"""
+
+import os
+import sys
+
+import numpy as np
+import speech_recognition as sr
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from benchmarks.harness import SAMPLE_RATE, PcmSource, generate_wav
+from src.noise_calibration import AdaptiveNoiseFloor, CalibrationStore
+from src.speech_recognition_module import SpeechRecognizer
+from src.stt_backends import STTBackend
+from src.vad import VoiceActivityDetector
+
+
+class NoSpeechBackend(STTBackend):
+    """总是识别不出内容的后端"""
+
+    name = "no-speech"
+
+    def recognize(self, audio):
+        raise sr.UnknownValueError()
+
+
+def test_calibration_store_round_trip_and_expiry(tmp_path):
+    """测试按设备保存校准结果,过期后失效"""
+    path = str(tmp_path / "calibration.json")
+    CalibrationStore(path).put("mic:USB:16000", 420.0)
+
+    assert CalibrationStore(path).get("mic:USB:16000") == 420.0
+    assert CalibrationStore(path).get("mic:other:16000") is None
+    assert CalibrationStore(path, max_age=-1).get("mic:USB:16000") is None
+
+
+def test_adaptive_noise_floor_tracks_environment():
+    """测试噪音基线随环境变化,阈值不低于下限"""
+    floor = AdaptiveNoiseFloor(300, rate=0.1, ratio=1.5, min_threshold=50)
+
+    louder = floor.update([600] * 100)
+    assert 850 < louder <= 900
+
+    quieter = floor.update([0] * 200)
+    assert quieter == 50
+
+
+def test_saved_calibration_skips_blocking_step(tmp_path, monkeypatch):
+    """测试已有校准结果时启动不再采集环境噪音,没有时校准并保存"""
+    monkeypatch.setattr(config, "CALIBRATION_FILE", str(tmp_path / "calibration.json"))
+    wav = generate_wav(str(tmp_path / "a.wav"))
+
+    first = SpeechRecognizer(microphone=sr.AudioFile(wav), backends=[NoSpeechBackend()])
+    saved = CalibrationStore().get(first.device)
+    assert saved == first.recognizer.energy_threshold
+
+    def fail(*args, **kwargs):
+        raise AssertionError("不应重新校准")
+
+    monkeypatch.setattr(sr.Recognizer, "adjust_for_ambient_noise", fail)
+    CalibrationStore().put(first.device, 777.0)
+    second = SpeechRecognizer(microphone=sr.AudioFile(wav), backends=[NoSpeechBackend()])
+    assert second.recognizer.energy_threshold == 777.0
+    assert second.stats["startup_ms"] >= 0
+
+
+def test_false_trigger_raises_threshold(tmp_path, monkeypatch):
+    """测试误触发计入统计并抬高能量阈值"""
+    monkeypatch.setattr(config, "VAD_ENABLED", True)
+    monkeypatch.setattr(config, "NOISE_ADAPTIVE", True)
+    recognizer = SpeechRecognizer(
+        microphone=sr.AudioFile(__file__), calibrate=False, backends=[NoSpeechBackend()]
+    )
+    recognizer.recognizer.energy_threshold = 300
+    recognizer.vad.noise_floor = AdaptiveNoiseFloor(300)
+
+    noise = np.random.default_rng(0).normal(0, 2000, 16000).astype(np.int16).tobytes()
+    assert recognizer._recognize_safely(sr.AudioData(noise, 16000, 2)) == ""
+
+    assert recognizer.stats["false_triggers"] == 1
+    assert recognizer.stats["false_trigger_rate"] == 1.0
+    assert recognizer.recognizer.energy_threshold > 1000
+
+
+def test_noise_floor_follows_louder_room():
+    """测试环境噪音逐渐变大超过初始阈值时,阈值随之升高,说完后仍能结束录音"""
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(200, 400, SAMPLE_RATE * 6)
+    tone = 8000 * np.sin(2 * np.pi * 440 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)
+    pcm = np.concatenate(
+        [
+            rng.normal(0, 1, len(ramp)) * ramp,
+            rng.normal(0, 400, SAMPLE_RATE),
+            tone + rng.normal(0, 400, SAMPLE_RATE),
+            rng.normal(0, 400, SAMPLE_RATE * 12),
+        ]
+    )
+    pcm = pcm.astype(np.int16).tobytes()
+
+    vad = VoiceActivityDetector(energy_threshold=300, noise_floor=AdaptiveNoiseFloor(300))
+    audio = vad.listen(PcmSource(pcm), timeout=10, phrase_time_limit=10)
+    seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    assert 1.0 <= seconds < 1.6
+    assert vad.energy_threshold > 400
@@ -0,0 +1,33 @@
+"""
+共享 OpenAI 客户端测试
+"""
+
+import os
+import sys
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.controllers.writing_controller import WritingController
+from src.llm_client import LLMClient
+from src.openai_client import get_openai_client, warm_up
+from tests.mock_openai_server import MockOpenAIServer
+
+
+def test_components_share_one_client(monkeypatch):
+    """测试所有组件共用同一个客户端"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    assert LLMClient().client is get_openai_client()
+    assert WritingController().client is get_openai_client()
+
+
+def test_warm_up_against_local_server(monkeypatch):
+    """测试连接预热"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+        assert warm_up() is not None
+        assert server.requests == []  # 预热不消耗脚本回复
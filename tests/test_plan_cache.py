@@ -0,0 +1,107 @@
+"""
+规划缓存测试
+"""
+
+import os
+import sys
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm_client import LLMClient
+from src.plan_cache import PlanCache
+from src.tool_loop import ToolLoop
+from tests.mock_openai_server import MockOpenAIServer
+
+VOLUME_PLAN = [{"name": "system_control", "arguments": {"action": "set_volume", "value": 50}}]
+
+
+def test_exact_and_fuzzy_lookup(tmp_path):
+    """测试精确命中、相近说法命中以及数字不同时不命中"""
+    cache = PlanCache(path=str(tmp_path / "cache.json"), max_entries=10, ttl=60, similarity=0.6)
+    cache.put("把音量调到50", "fp", VOLUME_PLAN)
+
+    assert cache.get("把音量调到50。", "fp") == VOLUME_PLAN
+    assert cache.get("请把音量调到50", "fp") == VOLUME_PLAN
+    assert cache.get("把音量调到60", "fp") is None
+    assert cache.get("把音量调到50", "other-schema") is None
+    assert cache.stats == {"entries": 1, "hits": 2, "fuzzy_hits": 1, "misses": 2}
+
+
+def test_lru_ttl_and_persistence(tmp_path):
+    """测试 LRU 淘汰、过期和磁盘持久化"""
+    path = str(tmp_path / "cache.json")
+    cache = PlanCache(path=path, max_entries=2, ttl=60, similarity=1.0)
+    cache.put("截图", "fp", [{"name": "system_control", "arguments": {"action": "screenshot"}}])
+    cache.put("暂停音乐", "fp", [{"name": "play_music", "arguments": {"action": "pause"}}])
+    cache.get("截图", "fp")
+    cache.put(
+        "打开浏览器", "fp", [{"name": "open_application", "arguments": {"app_name": "浏览器"}}]
+    )
+
+    reloaded = PlanCache(path=path, max_entries=2, ttl=60, similarity=1.0)
+    assert reloaded.get("截图", "fp") is not None
+    assert reloaded.get("暂停音乐", "fp") is None
+
+    expired = PlanCache(path=path, max_entries=2, ttl=-1, similarity=1.0)
+    assert expired.get("截图", "fp") is None
+
+
+def test_tool_loop_uses_cache(monkeypatch, tmp_path):
+    """测试第二次说同样的话时跳过大模型"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(tool_calls=VOLUME_PLAN)
+        server.add_reply(content="音量已调到50%。")
+
+        class Executor:
+            def execute_batch(self, function_calls):
+                return ["音量已设置为 50%" for _ in function_calls]
+
+        cache = PlanCache(path=str(tmp_path / "cache.json"))
+        loop = ToolLoop(LLMClient(), Executor(), plan_cache=cache)
+
+        first = loop.run("把音量调到50")
+        second = loop.run("把音量调到50")
+
+        assert first.stop_reason == "final"
+        assert second.stop_reason == "cache"
+        assert second.text == "音量已设置为 50%"
+        assert len(server.requests) == 2
+
+
+def test_tool_loop_skips_failed_and_context_dependent_plans(monkeypatch, tmp_path):
+    """测试执行失败、用到搜索结果序号或指代的文件时不缓存计划"""
+    plans = {
+        "播放第二个": [{"name": "play_music", "arguments": {"action": "play", "index": 2}}],
+        "播放它": [
+            {"name": "play_music", "arguments": {"action": "play", "file_path": "/m/晴天.mp3"}}
+        ],
+        "打开浏览器": [{"name": "open_application", "arguments": {"app_name": "浏览器"}}],
+        "播放晴天": [
+            {"name": "play_music", "arguments": {"action": "play", "file_path": "/m/晴天.mp3"}}
+        ],
+    }
+    outputs = {"打开浏览器": "打开应用程序时出错: 未找到"}
+
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+        class Executor:
+            def execute_batch(self, function_calls):
+                return [outputs.get(utterance, "正在播放: 晴天.mp3") for _ in function_calls]
+
+        cache = PlanCache(path=str(tmp_path / "cache.json"), similarity=1.0)
+        loop = ToolLoop(LLMClient(), Executor(), plan_cache=cache)
+        for utterance, plan in plans.items():
+            server.add_reply(tool_calls=plan)
+            server.add_reply(content="好的")
+            loop.run(utterance)
+
+        assert cache.get("播放第二个", loop.fingerprint) is None
+        assert cache.get("播放它", loop.fingerprint) is None
+        assert cache.get("打开浏览器", loop.fingerprint) is None
+        assert cache.get("播放晴天", loop.fingerprint) is not None
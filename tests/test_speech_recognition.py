@@ -0,0 +1,128 @@
+"""
+语音识别模块测试
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import SAMPLE_RATE, PcmSource, generate_wav
+from src.speech_recognition_module import SpeechRecognizer
+
+
+class CountingRecognizer(SpeechRecognizer):
+    """按顺序给每句话编号的识别器"""
+
+    def __init__(self, source, release: threading.Event = None):
+        super().__init__(microphone=source, calibrate=False)
+        self.release = release
+        self.count = 0
+
+    def recognize(self, audio):
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        self.count += 1
+        return f"第{self.count}句"
+
+
+def test_background_listening_splits_utterances(tmp_path):
+    """测试持续监听把输入流切分成多句并逐句识别"""
+    wav = generate_wav(str(tmp_path / "three.wav"), silence_seconds=2.0, phrases=3)
+    recognizer = CountingRecognizer(sr.AudioFile(wav))
+
+    recognizer.start_background()
+    try:
+        transcripts = [recognizer.listen() for _ in range(3)]
+    finally:
+        recognizer.stop_background()
+
+    assert transcripts == ["第1句", "第2句", "第3句"]
+    assert not recognizer.listening
+
+
+def test_capture_continues_while_recognition_is_busy(tmp_path):
+    """测试识别阻塞时录音继续进行,队列满后丢弃最早的语句"""
+    wav = generate_wav(str(tmp_path / "three.wav"), silence_seconds=2.0, phrases=3)
+    release = threading.Event()
+    recognizer = CountingRecognizer(sr.AudioFile(wav), release=release)
+    recognizer._audio_queue.maxsize = 1
+
+    recognizer.start_background()
+    try:
+        # 识别线程被卡住时录音线程照常读完三句,放不下的语句被丢弃
+        recognizer._threads[0].join(timeout=5)
+        assert not recognizer._threads[0].is_alive()
+        release.set()
+        transcripts = []
+        while True:
+            text = recognizer.get_transcript(timeout=1)
+            if not text:
+                break
+            transcripts.append(text)
+    finally:
+        recognizer.stop_background()
+
+    assert recognizer.dropped >= 1
+    assert len(transcripts) + recognizer.dropped == 3
+
+
+class FixedRecognizer(SpeechRecognizer):
+    """识别结果固定、并记录收到的音频的识别器"""
+
+    def __init__(self, source):
+        super().__init__(microphone=source, calibrate=False)
+        self.audio = []
+
+    def recognize(self, audio):
+        self.audio.append(audio)
+        return "暂停音乐"
+
+
+def speech_pcm(silence: float, speech: float, tail: float) -> bytes:
+    """静音 + 正弦音 + 静音"""
+    t = np.arange(int(SAMPLE_RATE * speech)) / SAMPLE_RATE
+    tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    return np.concatenate(
+        [
+            np.zeros(int(SAMPLE_RATE * silence), np.int16),
+            tone,
+            np.zeros(int(SAMPLE_RATE * tail), np.int16),
+        ]
+    ).tobytes()
+
+
+def test_barge_in_interrupts_speech_and_recognizes_utterance():
+    """测试朗读期间用户开口时立即打断朗读,并把已读入的语音一起交给识别"""
+    recognizer = FixedRecognizer(PcmSource(speech_pcm(0.3, 0.6, 1.0), realtime=True))
+    speaking = threading.Event()
+    speaking.set()
+    interrupted = []
+
+    def interrupt():
+        interrupted.append(time.perf_counter())
+        speaking.clear()
+
+    text = recognizer.barge_in(speaking.is_set, interrupt)
+
+    assert text == "暂停音乐"
+    assert len(interrupted) == 1
+    assert recognizer.last_barge_in < 0.3
+    audio = recognizer.audio[0]
+    assert len(audio.frame_data) / (SAMPLE_RATE * 2) >= 0.6
+
+
+def test_barge_in_returns_none_when_speech_finishes_first():
+    """测试朗读结束前没有人说话时不打断"""
+    recognizer = FixedRecognizer(PcmSource(speech_pcm(1.0, 0.5, 0.5), realtime=True))
+    deadline = time.perf_counter() + 0.2
+
+    assert recognizer.barge_in(lambda: time.perf_counter() < deadline, lambda: None) is None
+    assert recognizer.audio == []
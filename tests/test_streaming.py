@@ -0,0 +1,116 @@
+"""
+流式输出测试
+"""
+
+import os
+import sys
+
+import pytest
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm_client import BaseLLMClient, LLMClient
+from src.streaming import SentenceSplitter
+from tests.mock_openai_server import MockOpenAIServer
+
+
+def test_sentence_splitter():
+    """测试中英文分句"""
+    splitter = SentenceSplitter()
+
+    sentences = []
+    for piece in ["好的,音乐", "已经开始播放。还需要", "别的吗?Version 3.5 is out", ". Bye"]:
+        sentences.extend(splitter.feed(piece))
+
+    assert sentences == ["好的,音乐已经开始播放。", "还需要别的吗?", "Version 3.5 is out."]
+    assert splitter.flush() == "Bye"
+    assert splitter.flush() is None
+
+
+def test_chat_stream_speaks_sentences(monkeypatch):
+    """测试流式回复逐句回调"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(content="你好!我是语音助手。有什么可以帮你的吗?")
+
+        client = LLMClient()
+        spoken = []
+        text, function_calls = client.chat("你好", on_sentence=spoken.append)
+
+        assert text == "你好!我是语音助手。有什么可以帮你的吗?"
+        assert function_calls is None
+        assert spoken == ["你好!", "我是语音助手。", "有什么可以帮你的吗?"]
+        assert server.requests[0]["stream"] is True
+
+
+def test_chat_stream_tool_calls(monkeypatch):
+    """测试流式拼接工具调用并继续函数调用流程"""
+    with MockOpenAIServer(chunk_size=3) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(
+            tool_calls=[
+                {"name": "system_control", "arguments": {"action": "set_volume", "value": 50}},
+                {"name": "play_music", "arguments": {"action": "pause"}},
+            ]
+        )
+        server.add_reply(content="音量已调好。")
+        server.add_reply(content="音量已调到50%。")
+
+        client = LLMClient()
+        spoken = []
+        _, function_calls = client.chat("音量调到50并暂停音乐", on_sentence=spoken.append)
+
+        assert [call["name"] for call in function_calls] == ["system_control", "play_music"]
+        assert function_calls[0]["arguments"] == {"action": "set_volume", "value": 50}
+        assert client.conversation_history[-1]["tool_calls"][1]["id"] == "call_1"
+
+        client.add_function_result("call_0", "system_control", "音量已设置为 50%")
+        assert "stream" not in server.requests[-1]
+
+        reply = client.add_function_result(
+            "call_1", "play_music", "音乐已暂停", on_sentence=spoken.append
+        )
+        assert reply == "音量已调到50%。"
+        assert spoken == ["音量已调到50%。"]
+
+
+def test_add_function_results_single_round_trip(monkeypatch):
+    """测试多个工具结果只触发一次后续请求"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(
+            tool_calls=[
+                {"name": "open_application", "arguments": {"app_name": "浏览器"}},
+                {"name": "system_control", "arguments": {"action": "screenshot"}},
+            ]
+        )
+        server.add_reply(content="已打开浏览器并截图。")
+
+        client = LLMClient()
+        _, function_calls = client.chat("打开浏览器然后截图")
+        results = [
+            {"id": call["id"], "name": call["name"], "result": "完成"} for call in function_calls
+        ]
+        reply, more_calls = client.add_function_results(results)
+
+        assert reply == "已打开浏览器并截图。"
+        assert more_calls is None
+        assert len(server.requests) == 2
+        tool_messages = [m for m in server.requests[1]["messages"] if m["role"] == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_0", "call_1"]
+
+
+def test_client_without_send_fails_at_construction():
+    """测试没有实现发送请求的子类在创建时就报错,而不是在请求中途"""
+
+    class IncompleteClient(BaseLLMClient):
+        def _send(self, request):
+            return None
+
+    with pytest.raises(TypeError, match="_send_stream"):
+        IncompleteClient()
@@ -0,0 +1,77 @@
+"""
+语音识别后端测试
+"""
+
+import os
+import sys
+
+import pytest
+import speech_recognition as sr
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.speech_recognition_module import SpeechRecognizer
+from src.stt_backends import GoogleBackend, STTBackend, create_backends
+
+
+class FakeBackend(STTBackend):
+    """返回固定结果或抛出指定异常的后端"""
+
+    def __init__(self, name, result=None, error=None):
+        self.name = name
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+AUDIO = sr.AudioData(b"\x00\x00" * 1600, 16000, 2)
+
+
+def make_recognizer(backends):
+    return SpeechRecognizer(microphone=sr.AudioFile(__file__), calibrate=False, backends=backends)
+
+
+def test_falls_back_when_backend_unavailable():
+    """测试主后端出错时这一句改用备用后端"""
+    remote = FakeBackend("remote", error=sr.RequestError("网络不可用"))
+    local = FakeBackend("local", result="打开浏览器")
+    recognizer = make_recognizer([remote, local])
+
+    assert recognizer.recognize(AUDIO) == "打开浏览器"
+    assert remote.calls == 1 and local.calls == 1
+
+
+def test_unknown_speech_does_not_fall_back():
+    """测试没有识别出内容时不再尝试其他后端"""
+    remote = FakeBackend("remote", error=sr.UnknownValueError())
+    local = FakeBackend("local", result="不应被调用")
+    recognizer = make_recognizer([remote, local])
+
+    assert recognizer._recognize_safely(AUDIO) == ""
+    assert local.calls == 0
+
+
+def test_all_backends_failing_raises_request_error():
+    """测试全部后端出错时抛出最后一个错误"""
+    recognizer = make_recognizer([FakeBackend("a", error=sr.RequestError("a 出错"))])
+    with pytest.raises(sr.RequestError):
+        recognizer.recognize(AUDIO)
+
+
+def test_create_backends_skips_unavailable(tmp_path, monkeypatch):
+    """测试不可用或未知的后端被跳过"""
+    import config
+
+    monkeypatch.setattr(config, "VOSK_MODEL_PATH", str(tmp_path / "missing-model"))
+    backends = create_backends(["vosk", "unknown", "google"])
+
+    assert [backend.name for backend in backends] == ["google"]
+    assert isinstance(backends[0], GoogleBackend)
@@ -0,0 +1,51 @@
+"""
+任务执行引擎测试
+"""
+
+import os
+import sys
+import threading
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.task_executor import TaskExecutor
+
+
+def test_execute_batch_order_and_concurrency(monkeypatch):
+    """测试批量执行: 不同控制器并发,同一控制器保序,结果按原顺序返回"""
+    # 写作控制器会创建 OpenAI 客户端,没有 API key 时(如 CI)初始化失败
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    executor = TaskExecutor()
+    log = []
+    lock = threading.Lock()
+
+    def fake_execute(function_name, arguments):
+        with lock:
+            log.append(("start", function_name, arguments.get("action")))
+        time.sleep(0.2 if function_name == "write_article" else 0.05)
+        with lock:
+            log.append(("end", function_name, arguments.get("action")))
+        return f"{function_name}:{arguments.get('action', '')}"
+
+    executor.execute = fake_execute
+
+    calls = [
+        {"name": "write_article", "arguments": {"topic": "测试"}},
+        {"name": "play_music", "arguments": {"action": "play"}},
+        {"name": "play_music", "arguments": {"action": "pause"}},
+        {"name": "open_application", "arguments": {"app_name": "浏览器"}},
+    ]
+
+    started = time.perf_counter()
+    results = executor.execute_batch(calls)
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    assert results == ["write_article:", "play_music:play", "play_music:pause", "open_application:"]
+    # 音乐控制器上的调用保持顺序: play 结束后 pause 才开始
+    assert log.index(("end", "play_music", "play")) < log.index(("start", "play_music", "pause"))
+    # 慢速写作不阻塞其他调用,总耗时接近最慢的一组
+    assert elapsed < 0.3
@@ -0,0 +1,73 @@
+"""
+工具调用循环测试
+"""
+
+import os
+import sys
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm_client import LLMClient
+from src.tool_loop import ToolLoop
+from tests.mock_openai_server import MockOpenAIServer
+
+
+class RecordingExecutor:
+    """记录调用的执行引擎替身"""
+
+    def __init__(self):
+        self.calls = []
+
+    def execute_batch(self, function_calls):
+        self.calls.extend(call["name"] for call in function_calls)
+        return [f"{call['name']} 完成" for call in function_calls]
+
+
+def test_tool_loop_runs_until_final_answer(monkeypatch):
+    """测试多轮工具调用一直执行到最终回复"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        server.add_reply(tool_calls=[{"name": "write_article", "arguments": {"topic": "春天"}}])
+        server.add_reply(
+            tool_calls=[{"name": "open_application", "arguments": {"app_name": "记事本"}}]
+        )
+        server.add_reply(content="文章已写好,记事本也打开了。")
+
+        executor = RecordingExecutor()
+        result = ToolLoop(LLMClient(), executor, max_steps=5, deadline=30).run(
+            "写篇文章再打开记事本"
+        )
+
+        assert result.text == "文章已写好,记事本也打开了。"
+        assert result.steps == 2
+        assert result.stop_reason == "final"
+        assert executor.calls == ["write_article", "open_application"]
+        assert [(t.step, t.stage) for t in result.timings] == [
+            (0, "llm"),
+            (1, "tools"),
+            (1, "llm"),
+            (2, "tools"),
+            (2, "llm"),
+        ]
+
+
+def test_tool_loop_step_budget(monkeypatch):
+    """测试超出步数预算时停止执行并补全历史"""
+    with MockOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        for _ in range(3):
+            server.add_reply(tool_calls=[{"name": "search_music", "arguments": {"keyword": "a"}}])
+
+        client = LLMClient()
+        executor = RecordingExecutor()
+        result = ToolLoop(client, executor, max_steps=1, deadline=30).run("一直搜索")
+
+        assert result.stop_reason == "max_steps"
+        assert executor.calls == ["search_music"]
+        assert len(server.requests) == 2
+        # 未执行的调用也有对应的 tool 消息
+        assert client.conversation_history[-1]["role"] == "tool"
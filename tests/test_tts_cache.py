@@ -0,0 +1,133 @@
+"""
+语音合成缓存测试
+"""
+
+import os
+import sys
+import wave
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_to_speech import TextToSpeech
+from src.tts_cache import PhraseCache, phrase_key
+
+
+class FakeEngine:
+    """模拟 pyttsx3 引擎: save_to_file 写出一小段静音 WAV"""
+
+    def __init__(self):
+        self.properties = {"rate": 200, "volume": 1.0, "voice": "zh", "voices": []}
+        self.said = []
+        self.rendered = []
+        self._pending = []
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def say(self, text):
+        self.said.append(text)
+
+    def save_to_file(self, text, path):
+        self._pending.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self._pending:
+            with wave.open(path, "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(16000)
+                f.writeframes(b"\x00\x00" * 160)
+            self.rendered.append(text)
+        self._pending.clear()
+
+    def stop(self):
+        pass
+
+
+def test_phrase_cache_lru_and_reload(tmp_path):
+    """测试 LRU 淘汰,以及重启后从目录恢复缓存"""
+    engine = FakeEngine()
+    cache = PhraseCache(directory=str(tmp_path), max_entries=2, phrases=["很长的固定短语"])
+
+    keys = [phrase_key(text, "zh", 200, 1.0) for text in ["一", "二", "三"]]
+    cache.render(engine, "一", keys[0])
+    cache.render(engine, "二", keys[1])
+    assert cache.get(keys[0]) is not None
+    cache.render(engine, "三", keys[2])
+
+    assert cache.get(keys[1]) is None
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{k}.wav" for k in [keys[0], keys[2]])
+
+    reloaded = PhraseCache(directory=str(tmp_path), max_entries=2, phrases=[])
+    assert reloaded.get(keys[0]) is not None
+    assert reloaded.stats == {"entries": 2, "hits": 1, "misses": 0}
+
+    # 只缓存固定短语,一次性的短句不缓存
+    assert cache.cacheable("很长的固定短语")
+    assert not cache.cacheable("短句")
+
+
+def test_phrase_key_depends_on_voice_settings():
+    """测试语音、语速、音量变化后缓存键不同"""
+    base = phrase_key("再见!", "zh", 150, 0.9)
+    assert base == phrase_key("再见!", "zh", 150, 0.9)
+    assert base != phrase_key("再见!", "en", 150, 0.9)
+    assert base != phrase_key("再见!", "zh", 180, 0.9)
+    assert base != phrase_key("再见!", "zh", 150, 0.5)
+
+
+def test_speak_plays_cached_phrase_without_engine(tmp_path, monkeypatch):
+    """测试固定短语在空闲时预先合成(初始化不等待合成),之后朗读时直接播放,不再调用合成引擎"""
+    monkeypatch.setattr("config.TTS_CACHE_PHRASES", ["再见!"])
+    engine = FakeEngine()
+    cache = PhraseCache(directory=str(tmp_path), max_entries=10, phrases=["再见!"])
+    tts = TextToSpeech(engine=engine, cache=cache)
+    assert engine.rendered == []
+    assert tts.render_pending() == 1
+    assert engine.rendered == ["再见!"]
+
+    # 已缓存的短语下次启动时不再合成
+    assert TextToSpeech(engine=engine, cache=cache).render_pending() == 0
+
+    played = []
+    monkeypatch.setattr(tts, "_play", lambda path: played.append(path) or True)
+
+    tts.speak("再见!")
+    tts.speak("再见!")
+    assert engine.rendered == ["再见!"]
+    assert engine.said == []
+    assert len(played) == 2
+
+    # 不是固定短语的文本直接朗读,不缓存
+    tts.speak("好的")
+    assert engine.said == ["好的"]
+    assert tts.render_pending() == 0
+
+    # 修改语速后未命中: 先直接朗读,空闲时再重新合成
+    engine.setProperty("rate", 100)
+    tts.speak("再见!")
+    assert engine.said == ["好的", "再见!"]
+    assert engine.rendered == ["再见!"]
+    assert tts.render_pending() == 1
+    assert engine.rendered == ["再见!", "再见!"]
+    tts.speak("再见!")
+    assert len(played) == 3
+
+
+def test_speak_falls_back_to_engine_when_playback_fails(tmp_path, monkeypatch):
+    """测试播放缓存音频失败时改用合成引擎朗读"""
+    monkeypatch.setattr("config.TTS_CACHE_PHRASES", ["音乐已暂停"])
+    engine = FakeEngine()
+    cache = PhraseCache(directory=str(tmp_path), phrases=["音乐已暂停"])
+    tts = TextToSpeech(engine=engine, cache=cache)
+    tts.render_pending()
+    assert tts.cache.stats["entries"] == 1
+    monkeypatch.setattr(tts, "_play", lambda path: False)
+
+    tts.speak("音乐已暂停")
+    assert engine.said == ["音乐已暂停"]
@@ -0,0 +1,92 @@
+"""
+语音合成工作线程测试
+"""
+
+import os
+import sys
+import threading
+import time
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.metrics import LatencyRecorder
+from src.tts_worker import SpeechWorker
+
+
+class InterruptibleTTS:
+    """每句朗读一段时间、可被 stop 打断的语音合成替身"""
+
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.spoken = []
+        self.threads = set()
+        self._stopped = threading.Event()
+
+    def speak(self, text):
+        self._stopped.clear()
+        self.threads.add(threading.get_ident())
+        if not self._stopped.wait(self.seconds):
+            self.spoken.append(text)
+
+    def stop(self):
+        self._stopped.set()
+
+
+def test_worker_speaks_in_order_without_blocking():
+    """测试排队立即返回,在同一工作线程上按顺序朗读,并记录朗读耗时"""
+    tts = InterruptibleTTS()
+    metrics = LatencyRecorder()
+    worker = SpeechWorker(tts, metrics=metrics)
+
+    started = time.perf_counter()
+    futures = [worker.say(text) for text in ["一", "二", "三"]]
+    assert time.perf_counter() - started < 0.03
+    assert worker.speaking
+
+    assert [f.result(timeout=2) for f in futures] == [True, True, True]
+    assert worker.wait(timeout=1)
+    assert not worker.speaking
+    assert tts.spoken == ["一", "二", "三"]
+    assert len(tts.threads) == 1
+    assert tts.threads != {threading.get_ident()}
+    assert metrics.summary()["tts"]["count"] == 3
+    worker.close()
+
+
+def test_cancel_interrupts_current_and_flushes_queue():
+    """测试取消时打断正在朗读的一句,排队的内容不再朗读"""
+    tts = InterruptibleTTS(seconds=5)
+    worker = SpeechWorker(tts)
+
+    futures = [worker.say(text) for text in ["很长的回答", "第二句", "第三句"]]
+    time.sleep(0.05)
+    assert worker.cancel() == 3
+
+    assert futures[0].result(timeout=1) is False
+    assert futures[1].cancelled() and futures[2].cancelled()
+    assert worker.wait(timeout=1)
+    assert worker.stats == {"queued": 0, "spoken": 0, "cancelled": 3}
+
+    # 取消后仍可继续使用
+    tts.seconds = 0.01
+    assert worker.say("再见!").result(timeout=1) is True
+    assert tts.spoken == ["再见!"]
+    worker.close()
+
+
+def test_pending_phrases_render_when_idle(monkeypatch):
+    """测试未命中缓存的短语在朗读线程空闲时合成,不占用朗读的时间"""
+    monkeypatch.setattr("config.TTS_CACHE_RENDER_IDLE", 0.05)
+    tts = InterruptibleTTS(seconds=0.01)
+    rendered = []
+    tts.render_pending = lambda should_stop: rendered.append(threading.get_ident())
+    worker = SpeechWorker(tts)
+
+    worker.say("一").result(timeout=2)
+    assert rendered == []
+    time.sleep(0.3)
+    assert len(rendered) == 1
+    assert set(rendered) == tts.threads
+    worker.close()
@@ -0,0 +1,93 @@
+"""
+语音端点检测测试
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import SAMPLE_RATE, PcmSource, generate_wav
+from src.vad import VoiceActivityDetector, frame_features
+
+
+def make_vad():
+    return VoiceActivityDetector(
+        energy_threshold=300, frame_ms=30, hangover_ms=300, speech_start_ms=90, padding_ms=60
+    )
+
+
+def test_frame_features_separate_tone_noise_and_silence():
+    """测试能量和过零率特征"""
+    rng = np.random.default_rng(0)
+    silence = np.zeros(480, dtype=np.int16)
+    tone = (8000 * np.sin(2 * np.pi * 440 * np.arange(480) / SAMPLE_RATE)).astype(np.int16)
+    hiss = rng.integers(-400, 400, 480).astype(np.int16)
+    pcm = np.concatenate([silence, tone, hiss]).tobytes()
+
+    rms, zcr = frame_features(pcm, 2, 480)
+    assert rms[0] == 0 and rms[1] > 5000
+    assert zcr[1] < 0.1 < zcr[2]
+
+    assert make_vad().classify(pcm, SAMPLE_RATE, 2).tolist() == [False, True, True]
+
+
+def test_trim_removes_leading_and_trailing_silence(tmp_path):
+    """测试裁掉首尾静音,只保留 padding"""
+    wav = generate_wav(str(tmp_path / "a.wav"), speech_seconds=0.6, silence_seconds=1.0)
+    with sr.AudioFile(wav) as source:
+        audio = sr.Recognizer().record(source)
+
+    trimmed = make_vad().trim(audio)
+    seconds = len(trimmed.frame_data) / (trimmed.sample_rate * trimmed.sample_width)
+    assert 0.6 <= seconds <= 0.6 + 2 * 0.06 + 0.03
+
+
+def test_listen_cuts_each_utterance_at_end_of_speech(tmp_path):
+    """测试说完后按 hangover 立即切分,拖尾静音不进入录音"""
+    wav = generate_wav(
+        str(tmp_path / "two.wav"), speech_seconds=0.6, silence_seconds=1.0, phrases=2
+    )
+    vad = make_vad()
+
+    with sr.AudioFile(wav) as source:
+        first = vad.listen(source, timeout=5)
+        assert vad.last_stats["hangover_seconds"] == pytest.approx(0.3)
+        second = vad.listen(source, timeout=5)
+        rest = vad.listen(source, timeout=5)
+
+    for audio in (first, second):
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        assert 0.6 <= seconds <= 0.6 + 2 * 0.06 + 0.03
+    assert rest.frame_data == b""
+    assert vad.metrics.summary()["vad_decision"]["count"] == 2
+
+
+def test_listen_ends_utterance_in_steady_noise():
+    """测试稳定的宽带噪音中说完后仍能按 hangover 结束,噪音不会被当作清辅音一直延续"""
+    rng = np.random.default_rng(0)
+    noise = lambda seconds: rng.normal(0, 200, int(SAMPLE_RATE * seconds))  # noqa: E731
+    tone = 8000 * np.sin(2 * np.pi * 440 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)
+    pcm = np.concatenate([noise(1), tone + noise(1), noise(12)]).astype(np.int16).tobytes()
+
+    # 阈值约为噪音 RMS 的 1.5 倍(与校准结果相当),噪音的过零率约为 0.5
+    vad = VoiceActivityDetector(energy_threshold=300)
+    assert not vad.classify(pcm[: SAMPLE_RATE * 2], SAMPLE_RATE, 2).any()
+
+    audio = vad.listen(PcmSource(pcm), timeout=5, phrase_time_limit=10)
+    seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    assert 1.0 <= seconds < 1.6
+
+
+def test_listen_times_out_without_speech(tmp_path):
+    """测试超时仍未检测到语音时抛出 WaitTimeoutError"""
+    wav = generate_wav(str(tmp_path / "quiet.wav"), amplitude=0.0, silence_seconds=1.0)
+    with sr.AudioFile(wav) as source:
+        with pytest.raises(sr.WaitTimeoutError):
+            make_vad().listen(source, timeout=0.5)
@@ -0,0 +1,115 @@
+"""
+唤醒词检测测试
+"""
+
+import os
+import sys
+
+import numpy as np
+import speech_recognition as sr
+
+# isort: skip_file
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import SAMPLE_RATE, PcmSource
+from src.speech_recognition_module import SpeechRecognizer
+from src.stt_backends import STTBackend
+from src.wake_word import WakeWordSpotter, dtw_distance, mfcc
+
+WAKE = [400, 900, 600]
+CHATTER = [1500, 700, 1200]
+
+
+def tones(frequencies, seconds=0.25, seed=0):
+    """由若干段正弦音组成的“词”,叠加少量噪声"""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    signal = np.concatenate([8000 * np.sin(2 * np.pi * f * t) for f in frequencies])
+    noise = np.random.default_rng(seed).normal(0, 100, len(signal))
+    return (signal + noise).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(SAMPLE_RATE * seconds), dtype=np.int16)
+
+
+def make_spotter():
+    spotter = WakeWordSpotter(threshold=8.0, hop_ms=90)
+    spotter.enroll(sr.AudioData(tones(WAKE, seed=1).tobytes(), SAMPLE_RATE, 2))
+    return spotter
+
+
+class CountingBackend(STTBackend):
+    """记录被识别的音频时长"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.durations = []
+
+    def recognize(self, audio):
+        self.durations.append(len(audio.frame_data) / (audio.sample_rate * audio.sample_width))
+        return "打开浏览器"
+
+
+def test_dtw_separates_wake_word_from_other_sounds():
+    """测试唤醒词与其他声音的 DTW 距离差距明显"""
+    template = mfcc(tones(WAKE, seed=1).astype(np.float32), SAMPLE_RATE)
+
+    same = dtw_distance(mfcc(tones(WAKE, seed=2).astype(np.float32), SAMPLE_RATE), template)
+    other = dtw_distance(mfcc(tones(CHATTER, seed=2).astype(np.float32), SAMPLE_RATE), template)
+    assert same < 8.0 < other
+
+
+def test_spotter_ignores_chatter_and_wakes_on_wake_word():
+    """测试只有唤醒词能唤醒,唤醒位置紧跟唤醒词结束"""
+    pcm = np.concatenate([silence(0.3), tones(CHATTER), silence(1.0), tones(WAKE), silence(1.0)])
+    source = PcmSource(pcm.tobytes())
+    spotter = make_spotter()
+
+    prefix = spotter.wait(source)
+
+    assert prefix is not None
+    wake_end = 0.3 + 0.75 + 1.0 + 0.75
+    position = source.stream._position / (2 * SAMPLE_RATE) - len(prefix) / (2 * SAMPLE_RATE)
+    assert abs(position - wake_end) < 0.2
+
+
+def test_recognition_runs_only_after_wake_word():
+    """测试唤醒前的声音不送去识别,唤醒后紧跟的指令完整送去识别"""
+    command = tones([300, 500], seconds=0.3, seed=3)
+    pcm = np.concatenate(
+        [
+            silence(0.3),
+            tones(CHATTER),
+            silence(1.0),
+            tones(WAKE),
+            silence(0.05),
+            command,
+            silence(1.0),
+        ]
+    )
+    backend = CountingBackend()
+    recognizer = SpeechRecognizer(
+        microphone=PcmSource(pcm.tobytes()), calibrate=False, backends=[backend]
+    )
+    recognizer.wake_word = make_spotter()
+
+    assert recognizer.listen() == "打开浏览器"
+    assert len(backend.durations) == 1
+    # 指令 0.6 秒,前后各留少量静音
+    assert 0.6 <= backend.durations[0] <= 1.0
+
+
+def test_no_recognition_when_stream_ends_before_wake_word():
+    """测试等到输入流结束也没有唤醒时不识别,也不计为误触发"""
+    pcm = np.concatenate([silence(0.3), tones(CHATTER), silence(0.5)])
+    backend = CountingBackend()
+    recognizer = SpeechRecognizer(
+        microphone=PcmSource(pcm.tobytes()), calibrate=False, backends=[backend]
+    )
+    recognizer.wake_word = make_spotter()
+
+    assert recognizer.listen() == ""
+    assert backend.durations == []
+    assert (recognizer.utterances, recognizer.false_triggers) == (0, 0)